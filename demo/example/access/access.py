@@ -1,7 +1,9 @@
 import grpc
 
-import access_pb2_grpc
-import access_pb2
+from example.registry.registry import lazyImport
+
+access_pb2_grpc = lazyImport('access_pb2_grpc')
+access_pb2 = lazyImport('access_pb2')
 
 
 class AccessSvc:
@@ -29,6 +31,14 @@ class AccessSvc:
       print(f'Cannot add access groups: {e}')
       raise
 
+  def addMulti(self, deviceIDs, groups):
+    try:
+      response = self.stub.AddMulti(access_pb2.AddMultiRequest(deviceIDs=deviceIDs, groups=groups))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot add access groups multi: {e}')
+      raise
+
   def delete(self, deviceID, groupIDs):
     try:
       self.stub.Delete(access_pb2.DeleteRequest(deviceID=deviceID, groupIDs=groupIDs))
@@ -36,6 +46,14 @@ class AccessSvc:
       print(f'Cannot delete access groups: {e}')
       raise
 
+  def deleteMulti(self, deviceIDs, groupIDs):
+    try:
+      response = self.stub.DeleteMulti(access_pb2.DeleteMultiRequest(deviceIDs=deviceIDs, groupIDs=groupIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete access groups multi: {e}')
+      raise
+
   def deleteAll(self, deviceID):
     try:
       self.stub.DeleteAll(access_pb2.DeleteAllRequest(deviceID=deviceID))
@@ -43,6 +61,14 @@ class AccessSvc:
       print(f'Cannot delete all the access groups: {e}')
       raise
 
+  def deleteAllMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllMulti(access_pb2.DeleteAllMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all the access groups multi: {e}')
+      raise
+
   def getLevelList(self, deviceID):
     try:
       response = self.stub.GetLevelList(access_pb2.GetLevelListRequest(deviceID=deviceID))
@@ -58,6 +84,14 @@ class AccessSvc:
       print(f'Cannot add access levels: {e}')
       raise
 
+  def addLevelMulti(self, deviceIDs, levels):
+    try:
+      response = self.stub.AddLevelMulti(access_pb2.AddLevelMultiRequest(deviceIDs=deviceIDs, levels=levels))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot add access levels multi: {e}')
+      raise
+
   def deleteLevel(self, deviceID, levelIDs):
     try:
       self.stub.DeleteLevel(access_pb2.DeleteLevelRequest(deviceID=deviceID, levelIDs=levelIDs))
@@ -65,6 +99,14 @@ class AccessSvc:
       print(f'Cannot delete access levels: {e}')
       raise
 
+  def deleteLevelMulti(self, deviceIDs, levelIDs):
+    try:
+      response = self.stub.DeleteLevelMulti(access_pb2.DeleteLevelMultiRequest(deviceIDs=deviceIDs, levelIDs=levelIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete access levels multi: {e}')
+      raise
+
   def deleteAllLevel(self, deviceID):
     try:
       self.stub.DeleteAllLevel(access_pb2.DeleteAllLevelRequest(deviceID=deviceID))
@@ -72,6 +114,14 @@ class AccessSvc:
       print(f'Cannot delete all the access levels: {e}')
       raise
 
+  def deleteAllLevelMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllLevelMulti(access_pb2.DeleteAllLevelMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all the access levels multi: {e}')
+      raise
+
   def getFloorLevelList(self, deviceID):
     try:
       response = self.stub.GetFloorLevelList(access_pb2.GetFloorLevelListRequest(deviceID=deviceID))
@@ -87,6 +137,14 @@ class AccessSvc:
       print(f'Cannot add floor levels: {e}')
       raise
 
+  def addFloorLevelMulti(self, deviceIDs, levels):
+    try:
+      response = self.stub.AddFloorLevelMulti(access_pb2.AddFloorLevelMultiRequest(deviceIDs=deviceIDs, levels=levels))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot add floor levels multi: {e}')
+      raise
+
   def deleteFloorLevel(self, deviceID, levelIDs):
     try:
       self.stub.DeleteFloorLevel(access_pb2.DeleteFloorLevelRequest(deviceID=deviceID, levelIDs=levelIDs))
@@ -94,9 +152,25 @@ class AccessSvc:
       print(f'Cannot delete floor levels: {e}')
       raise
 
+  def deleteFloorLevelMulti(self, deviceIDs, levelIDs):
+    try:
+      response = self.stub.DeleteFloorLevelMulti(access_pb2.DeleteFloorLevelMultiRequest(deviceIDs=deviceIDs, levelIDs=levelIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete floor levels multi: {e}')
+      raise
+
   def deleteAllFloorLevel(self, deviceID):
     try:
       self.stub.DeleteAllFloorLevel(access_pb2.DeleteAllFloorLevelRequest(deviceID=deviceID))
     except grpc.RpcError as e:
       print(f'Cannot delete all the floor levels: {e}')
       raise
+
+  def deleteAllFloorLevelMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllFloorLevelMulti(access_pb2.DeleteAllFloorLevelMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all the floor levels multi: {e}')
+      raise
@@ -1,7 +1,9 @@
 import grpc
 
-import action_pb2_grpc
-import action_pb2
+from example.registry.registry import lazyImport
+
+action_pb2_grpc = lazyImport('action_pb2_grpc')
+action_pb2 = lazyImport('action_pb2')
 
 
 class ActionSvc:
@@ -29,6 +31,14 @@ class ActionSvc:
       print(f'Cannot set the action config: {e}')
       raise
 
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(action_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the action config multi: {e}')
+      raise
+
   def runAction(self, deviceID, action):
     try:
       self.stub.RunAction(action_pb2.RunActionRequest(deviceID=deviceID, action=action))
@@ -1,7 +1,9 @@
 import grpc
 
-import admin_pb2_grpc
-import admin_pb2
+from example.registry.registry import lazyImport
+
+admin_pb2_grpc = lazyImport('admin_pb2_grpc')
+admin_pb2 = lazyImport('admin_pb2')
 
 
 class AdminSvc:
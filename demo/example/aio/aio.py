@@ -0,0 +1,89 @@
+import sys
+import types
+
+import grpc
+
+from google.protobuf import message_factory
+
+from example.registry.registry import LazyModule, getService, getServiceNames
+
+
+def getModuleName(value):
+  if isinstance(value, LazyModule):
+    return value.__dict__['_name']
+  if isinstance(value, types.ModuleType):
+    return value.__name__
+  return None
+
+
+def getServiceName(svcClass):
+  """
+  Full name of the gRPC service of a wrapper class, found from the *_pb2_grpc module its
+  module imports. Subclasses defined elsewhere (e.g. CachedDeviceSvc) use their base class.
+  """
+  services = {getService(name).grpcName: name for name in getServiceNames()}
+  for cls in svcClass.__mro__:
+    module = sys.modules.get(cls.__module__)
+    if module is None:
+      continue
+    for value in vars(module).values():
+      name = getModuleName(value)
+      if name in services:
+        return services[name]
+  return None
+
+
+class AsyncSvc:
+  """
+  grpc.aio client of a G-SDK service. Every RPC of the service is an attribute with the name
+  of the RPC, taking the request message or its fields:
+
+    userSvc = AsyncSvc('User', client.getChannel())
+    response = await userSvc.GetList(deviceID=deviceID)
+    results = await asyncio.gather(*[userSvc.GetList(deviceID=devID) for devID in deviceIDs], return_exceptions=True)
+
+  Unary-response RPCs are coroutines returning the response. Server-streaming RPCs
+  (SubscribeRealtimeLog, SubscribeStatus, ...) return the grpc.aio call, read with 'async for'.
+  """
+
+  def __init__(self, service, aioChannel):
+    self.service = getService(service)
+    self.stub = self.service.getStub(aioChannel)
+    self.descriptor = self.service.pb2.DESCRIPTOR.services_by_name[self.service.name.rsplit('.', 1)[1]]
+
+  def __getattr__(self, name):
+    method = self.descriptor.methods_by_name.get(name)
+    if method is None:
+      raise AttributeError(f'{self.service.name} has no RPC {name}')
+
+    rpc = getattr(self.stub, name)
+    requestClass = message_factory.GetMessageClass(method.input_type)
+
+    def makeRequest(request, fields):
+      return request if request is not None else requestClass(**fields)
+
+    if method.server_streaming:
+      def call(request=None, **fields):
+        return rpc(makeRequest(request, fields))
+    else:
+      async def call(request=None, **fields):
+        try:
+          return await rpc(makeRequest(request, fields))
+        except grpc.RpcError as e:
+          print(f'Cannot {self.service.name}/{name}: {e}', flush=True)
+          raise
+
+    # Later lookups find it directly instead of going through __getattr__
+    self.__dict__[name] = call
+    return call
+
+  def __repr__(self):
+    return f'AsyncSvc({self.service.name})'
+
+
+def makeAsyncSvc(svcClass, aioChannel):
+  """AsyncSvc of the service of a sync wrapper class, e.g. makeAsyncSvc(UserSvc, client.getChannel())"""
+  service = getServiceName(svcClass)
+  if service is None:
+    raise ValueError(f'{svcClass.__name__} does not use a known gRPC service')
+  return AsyncSvc(service, aioChannel)
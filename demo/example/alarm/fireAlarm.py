@@ -1,7 +1,9 @@
 import grpc
 
-import fire_zone_pb2_grpc
-import fire_zone_pb2
+from example.registry.registry import lazyImport
+
+fire_zone_pb2_grpc = lazyImport('fire_zone_pb2_grpc')
+fire_zone_pb2 = lazyImport('fire_zone_pb2')
 
 
 class FireAlarmZoneSvc:
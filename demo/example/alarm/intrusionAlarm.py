@@ -1,7 +1,9 @@
 import grpc
 
-import intrusion_zone_pb2_grpc
-import intrusion_zone_pb2
+from example.registry.registry import lazyImport
+
+intrusion_zone_pb2_grpc = lazyImport('intrusion_zone_pb2_grpc')
+intrusion_zone_pb2 = lazyImport('intrusion_zone_pb2')
 
 
 class IntrusionAlarmZoneSvc:
@@ -1,7 +1,9 @@
 import grpc
 
-import apb_zone_pb2_grpc
-import apb_zone_pb2
+from example.registry.registry import lazyImport
+
+apb_zone_pb2_grpc = lazyImport('apb_zone_pb2_grpc')
+apb_zone_pb2 = lazyImport('apb_zone_pb2')
 
 
 class APBZoneSvc:
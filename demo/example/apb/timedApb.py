@@ -1,7 +1,9 @@
 import grpc
 
-import timed_apb_zone_pb2_grpc
-import timed_apb_zone_pb2
+from example.registry.registry import lazyImport
+
+timed_apb_zone_pb2_grpc = lazyImport('timed_apb_zone_pb2_grpc')
+timed_apb_zone_pb2 = lazyImport('timed_apb_zone_pb2')
 
 
 class TimedAPBZoneSvc:
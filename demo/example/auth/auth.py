@@ -1,7 +1,9 @@
 import grpc
 
-import auth_pb2_grpc
-import auth_pb2
+from example.registry.registry import lazyImport
+
+auth_pb2_grpc = lazyImport('auth_pb2_grpc')
+auth_pb2 = lazyImport('auth_pb2')
 
 
 class AuthSvc:
@@ -28,3 +30,11 @@ class AuthSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the auth config: {e}')
       raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(auth_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the auth config multi: {e}')
+      raise
@@ -1,7 +1,9 @@
 import grpc
 
-import card_pb2_grpc
-import card_pb2
+from example.registry.registry import lazyImport
+
+card_pb2_grpc = lazyImport('card_pb2_grpc')
+card_pb2 = lazyImport('card_pb2')
 
 
 class CardSvc:
@@ -51,6 +53,14 @@ class CardSvc:
       print(f'Cannot add the cards to the blacklist: {e}')
       raise
 
+  def addBlacklistMulti(self, deviceIDs, cardInfos):
+    try:
+      response = self.stub.AddBlacklistMulti(card_pb2.AddBlacklistMultiRequest(deviceIDs=deviceIDs, cardInfos=cardInfos))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot add the cards to the blacklist multi: {e}')
+      raise
+
   def deleteBlacklist(self, deviceID, cardInfos):
     try:
       self.stub.DeleteBlacklist(card_pb2.DeleteBlacklistRequest(deviceID=deviceID, cardInfos=cardInfos))
@@ -58,6 +68,14 @@ class CardSvc:
       print(f'Cannot delete the cards from the blacklist: {e}')
       raise
 
+  def deleteBlacklistMulti(self, deviceIDs, cardInfos):
+    try:
+      response = self.stub.DeleteBlacklistMulti(card_pb2.DeleteBlacklistMultiRequest(deviceIDs=deviceIDs, cardInfos=cardInfos))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete the cards from the blacklist multi: {e}')
+      raise
+
   def deleteAllBlacklist(self, deviceID):
     try:
       self.stub.DeleteAllBlacklist(card_pb2.DeleteAllBlacklistRequest(deviceID=deviceID))
@@ -65,6 +83,14 @@ class CardSvc:
       print(f'Cannot delete all cards from the blacklist: {e}')
       raise
 
+  def deleteAllBlacklistMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllBlacklistMulti(card_pb2.DeleteAllBlacklistMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all cards from the blacklist multi: {e}')
+      raise
+
   def getConfig(self, deviceID):
     try:
       response = self.stub.GetConfig(card_pb2.GetConfigRequest(deviceID=deviceID))
@@ -80,6 +106,14 @@ class CardSvc:
       print(f'Cannot set the Card config: {e}')
       raise
 
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(card_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the Card config multi: {e}')
+      raise
+
   def get1xConfig(self, deviceID):
     try:
       response = self.stub.Get1XConfig(card_pb2.Get1XConfigRequest(deviceID=deviceID))
@@ -95,6 +129,14 @@ class CardSvc:
       print(f'Cannot set the Card1x config: {e}')
       raise
 
+  def set1xConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.Set1XConfigMulti(card_pb2.Set1XConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the Card1x config multi: {e}')
+      raise
+
   def getQRConfig(self, deviceID):
     try:
       response = self.stub.GetQRConfig(card_pb2.GetQRConfigRequest(deviceID=deviceID))
@@ -110,6 +152,14 @@ class CardSvc:
       print(f'Cannot set the QR config: {e}')
       raise
 
+  def setQRConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetQRConfigMulti(card_pb2.SetQRConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the QR config multi: {e}')
+      raise
+
   def getCustomConfig(self, deviceID):
     try:
       response = self.stub.GetCustomConfig(card_pb2.GetCustomConfigRequest(deviceID=deviceID))
@@ -125,6 +175,14 @@ class CardSvc:
       print(f'Cannot set the Custom config: {e}')
       raise
 
+  def setCustomConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetCustomConfigMulti(card_pb2.SetCustomConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the Custom config multi: {e}')
+      raise
+
   def getFacilityCodeConfig(self, deviceID):
     try:
       response = self.stub.GetFacilityCodeConfig(card_pb2.GetFacilityCodeConfigRequest(deviceID=deviceID))
@@ -139,3 +197,11 @@ class CardSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the facility code config: {e}')
       raise
+
+  def setFacilityCodeConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetFacilityCodeConfigMulti(card_pb2.SetFacilityCodeConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the facility code config multi: {e}')
+      raise
@@ -0,0 +1,295 @@
+import itertools
+import threading
+import time
+
+import grpc
+
+from example.client.retry import RetryInterceptor, RetryPolicy
+
+# Keepalive pings keep idle connections alive behind NATs and detect dead gateways. The
+# gateway is a Go gRPC server, whose default enforcement policy (MinTime 5 minutes, no pings
+# without active streams) answers more frequent pings with GOAWAY too_many_pings and drops
+# the subscription streams. Shorter intervals or permitWithoutCalls need a matching
+# keepalive.EnforcementPolicy on the gateway.
+KEEPALIVE_TIME_MS = 5 * 60 * 1000
+KEEPALIVE_TIMEOUT_MS = 20000
+# Face templates, slide images and firmware images are larger than the 4MB default
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# Deadline in seconds of the unary RPCs, looked up by '/package.Service/Method', then
+# '/package.Service', then DEFAULT_DEADLINE. None means no deadline. Server-streaming RPCs
+# (SubscribeRealtimeLog, SubscribeStatus, ...) are long-lived and never get a deadline.
+DEFAULT_DEADLINE = 60.0
+DEFAULT_DEADLINES = {
+  # Wait for the user to place a card, a finger or a face
+  '/gsdk.card.Card/Scan': 120.0,
+  '/gsdk.finger.Finger/Scan': 120.0,
+  '/gsdk.face.Face/Scan': 120.0,
+  '/gsdk.connect.Connect/SearchDevice': 120.0,
+  '/gsdk.connect_master.ConnectMaster/SearchDevice': 120.0,
+  '/gsdk.device.Device/UpgradeFirmware': 900.0,
+  '/gsdk.device.Device/UpgradeFirmwareMulti': 900.0,
+  '/gsdk.device.Device/FactoryReset': 300.0,
+  '/gsdk.device.Device/FactoryResetMulti': 300.0,
+  '/gsdk.device.Device/ClearDB': 300.0,
+  '/gsdk.device.Device/ClearDBMulti': 300.0,
+  '/gsdk.display.Display': 300.0,
+}
+
+
+def makeChannelOptions(keepaliveTimeMs=KEEPALIVE_TIME_MS, keepaliveTimeoutMs=KEEPALIVE_TIMEOUT_MS, maxMessageSize=MAX_MESSAGE_SIZE, options=None,
+                       permitWithoutCalls=False):
+  """permitWithoutCalls also pings idle connections; the gateway has to set PermitWithoutStream for it"""
+  channelOptions = {
+    'grpc.keepalive_time_ms': keepaliveTimeMs,
+    'grpc.keepalive_timeout_ms': keepaliveTimeoutMs,
+    'grpc.keepalive_permit_without_calls': 1 if permitWithoutCalls else 0,
+    'grpc.max_send_message_length': maxMessageSize,
+    'grpc.max_receive_message_length': maxMessageSize,
+  }
+  channelOptions.update(options or {})
+  return list(channelOptions.items())
+
+
+class DeadlinePolicy:
+  def __init__(self, deadlines=None, defaultDeadline=DEFAULT_DEADLINE):
+    self.deadlines = dict(DEFAULT_DEADLINES)
+    self.deadlines.update(deadlines or {})
+    self.defaultDeadline = defaultDeadline
+
+  def getDeadline(self, method):
+    if method in self.deadlines:
+      return self.deadlines[method]
+    service = method.rsplit('/', 1)[0]
+    return self.deadlines.get(service, self.defaultDeadline)
+
+  def apply(self, clientCallDetails):
+    if clientCallDetails.timeout is not None:
+      return clientCallDetails
+
+    method = clientCallDetails.method
+    if isinstance(method, bytes):
+      method = method.decode()
+
+    timeout = self.getDeadline(method)
+    if timeout is None:
+      return clientCallDetails
+    return clientCallDetails._replace(timeout=timeout)
+
+
+class CallDetails(grpc.ClientCallDetails):
+  def __init__(self, method, timeout, metadata, credentials, wait_for_ready, compression):
+    self.method = method
+    self.timeout = timeout
+    self.metadata = metadata
+    self.credentials = credentials
+    self.wait_for_ready = wait_for_ready
+    self.compression = compression
+
+  def _replace(self, **kwargs):
+    fields = dict(vars(self))
+    fields.update(kwargs)
+    return CallDetails(**fields)
+
+
+def copyCallDetails(clientCallDetails):
+  return CallDetails(clientCallDetails.method, clientCallDetails.timeout, clientCallDetails.metadata, clientCallDetails.credentials,
+                     getattr(clientCallDetails, 'wait_for_ready', None), getattr(clientCallDetails, 'compression', None))
+
+
+class DeadlineInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.StreamUnaryClientInterceptor):
+  """Sets the default deadline of the method on every unary call made without a timeout"""
+
+  def __init__(self, policy):
+    self.policy = policy
+
+  def intercept_unary_unary(self, continuation, client_call_details, request):
+    return continuation(self.policy.apply(copyCallDetails(client_call_details)), request)
+
+  def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+    return continuation(self.policy.apply(copyCallDetails(client_call_details)), request_iterator)
+
+
+class AioDeadlineInterceptor(grpc.aio.UnaryUnaryClientInterceptor):
+  def __init__(self, policy):
+    self.policy = policy
+
+  async def intercept_unary_unary(self, continuation, client_call_details, request):
+    return await continuation(self.policy.apply(copyCallDetails(client_call_details)), request)
+
+
+class ChannelHealth:
+  """Connectivity state of a channel as reported by grpc, with the time of the last change"""
+
+  def __init__(self, channel):
+    self.channel = channel
+    self.state = grpc.ChannelConnectivity.IDLE
+    self.since = time.time()
+    self.transitions = 0
+    self.failures = 0
+    self.lock = threading.Lock()
+    channel.subscribe(self.update, try_to_connect=False)
+
+  def close(self):
+    # A channel still having subscribers can hang when it is closed or collected
+    self.channel.unsubscribe(self.update)
+
+  def update(self, state):
+    with self.lock:
+      if state == self.state:
+        return
+      if state == grpc.ChannelConnectivity.TRANSIENT_FAILURE:
+        self.failures += 1
+      self.state = state
+      self.since = time.time()
+      self.transitions += 1
+
+  def getReport(self):
+    with self.lock:
+      return {'state': self.state.name, 'since': self.since, 'transitions': self.transitions, 'failures': self.failures}
+
+
+class RoundRobinCallable:
+  """Multi-callable which sends every call over the next channel of the pool"""
+
+  def __init__(self, pool, callables):
+    self.pool = pool
+    self.callables = callables
+
+  def next(self):
+    return self.callables[self.pool.nextIndex()]
+
+  def __call__(self, *args, **kwargs):
+    return self.next()(*args, **kwargs)
+
+  def with_call(self, *args, **kwargs):
+    return self.next().with_call(*args, **kwargs)
+
+  def future(self, *args, **kwargs):
+    return self.next().future(*args, **kwargs)
+
+
+class PooledChannel(grpc.Channel):
+  """
+  grpc.Channel spreading the calls round-robin over several channels, each with its own
+  connection to the gateway. Can be used wherever a channel is expected (the *Svc wrappers).
+  """
+
+  def __init__(self, channels):
+    self.channels = channels
+    self.counter = itertools.count()
+
+  def nextIndex(self):
+    return next(self.counter) % len(self.channels)
+
+  def makeCallable(self, factory, method, args, kwargs):
+    return RoundRobinCallable(self, [getattr(channel, factory)(method, *args, **kwargs) for channel in self.channels])
+
+  def unary_unary(self, method, *args, **kwargs):
+    return self.makeCallable('unary_unary', method, args, kwargs)
+
+  def unary_stream(self, method, *args, **kwargs):
+    return self.makeCallable('unary_stream', method, args, kwargs)
+
+  def stream_unary(self, method, *args, **kwargs):
+    return self.makeCallable('stream_unary', method, args, kwargs)
+
+  def stream_stream(self, method, *args, **kwargs):
+    return self.makeCallable('stream_stream', method, args, kwargs)
+
+  def subscribe(self, callback, try_to_connect=False):
+    for channel in self.channels:
+      channel.subscribe(callback, try_to_connect)
+
+  def unsubscribe(self, callback):
+    for channel in self.channels:
+      channel.unsubscribe(callback)
+
+  def close(self):
+    for channel in self.channels:
+      channel.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_val, exc_tb):
+    self.close()
+    return False
+
+
+class ChannelManager:
+  """
+  Creates the channel of a client: keepalive and message size options, default deadlines
+  per service and method, retries of the reads, and optionally a pool of poolSize
+  connections used round-robin for high call rates. getHealth() reports the connectivity
+  state of every connection and getRetryMetrics() what the retry policy did.
+  """
+
+  def __init__(self, target, creds=None, poolSize=1, options=None, deadlines=None, defaultDeadline=DEFAULT_DEADLINE, retryPolicy=None, interceptors=None):
+    """
+    retryPolicy: retry.RetryPolicy of the unary reads, RetryPolicy(maxAttempts=1) disables the retries
+    interceptors: extra interceptors of the sync channels, called before the retry and deadline ones
+    """
+    self.target = target
+    self.creds = creds
+    self.poolSize = max(1, poolSize)
+    self.options = makeChannelOptions(options=options)
+    self.policy = DeadlinePolicy(deadlines, defaultDeadline)
+    self.retryInterceptor = RetryInterceptor(retryPolicy or RetryPolicy())
+    self.interceptors = list(interceptors or [])
+
+    self.rawChannels = []
+    self.health = []
+    self.channel = None
+
+  def openChannel(self, options):
+    if self.creds is None:
+      return grpc.insecure_channel(self.target, options=options)
+    return grpc.secure_channel(self.target, self.creds, options=options)
+
+  def getChannel(self):
+    if self.channel is not None:
+      return self.channel
+
+    options = self.options
+    if self.poolSize > 1:
+      # Without a local subchannel pool, channels to the same target share one connection
+      options = options + [('grpc.use_local_subchannel_pool', 1)]
+
+    channels = []
+    for _ in range(self.poolSize):
+      rawChannel = self.openChannel(options)
+      self.rawChannels.append(rawChannel)
+      self.health.append(ChannelHealth(rawChannel))
+      # The retry interceptor comes first, so every attempt gets its own deadline
+      channels.append(grpc.intercept_channel(rawChannel, *self.interceptors, self.retryInterceptor, DeadlineInterceptor(self.policy)))
+
+    self.channel = channels[0] if self.poolSize == 1 else PooledChannel(channels)
+    return self.channel
+
+  def getAioChannel(self):
+    interceptors = [AioDeadlineInterceptor(self.policy)]
+    if self.creds is None:
+      return grpc.aio.insecure_channel(self.target, options=self.options, interceptors=interceptors)
+    return grpc.aio.secure_channel(self.target, self.creds, options=self.options, interceptors=interceptors)
+
+  def getHealth(self):
+    """[{state, since, transitions, failures}] of every connection of the pool"""
+    return [health.getReport() for health in self.health]
+
+  def getRetryMetrics(self):
+    """{method: {calls, retries, hedges, hedgeWins, failures}} of the unary calls"""
+    return self.retryInterceptor.metrics.snapshot()
+
+  def isHealthy(self):
+    return any(health.state == grpc.ChannelConnectivity.READY for health in self.health)
+
+  def close(self):
+    for health in self.health:
+      health.close()
+    for rawChannel in self.rawChannels:
+      rawChannel.close()
+    self.retryInterceptor.close()
+    self.rawChannels = []
+    self.health = []
+    self.channel = None
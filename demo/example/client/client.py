@@ -1,16 +1,54 @@
 import grpc
 
+from example.client.channel import ChannelManager
+
 class GatewayClient:
   channel = None
+  channelMgr = None
 
-  def __init__(self, ipAddr, port, caFile):
+  def __init__(self, ipAddr, port, caFile, poolSize=1, options=None, deadlines=None, retryPolicy=None):
+    """
+    poolSize: number of connections used round-robin, options: extra grpc channel options,
+    deadlines: {'/package.Service[/Method]': seconds} on top of channel.DEFAULT_DEADLINES,
+    retryPolicy: retry.RetryPolicy of the reads
+    """
     try:
       with open(caFile, 'rb') as f:
         creds = grpc.ssl_channel_credentials(f.read())
-        self.channel = grpc.secure_channel("{}:{}".format(ipAddr, port), creds)
+        self.channelMgr = ChannelManager("{}:{}".format(ipAddr, port), creds, poolSize, options, deadlines, retryPolicy=retryPolicy)
+        self.channel = self.channelMgr.getChannel()
     except grpc.RpcError as e:
       print(f'Cannot create the gateway client: {e}')
       raise
 
   def getChannel(self):
     return self.channel
+
+  def getHealth(self):
+    return self.channelMgr.getHealth()
+
+  def getRetryMetrics(self):
+    return self.channelMgr.getRetryMetrics()
+
+
+class AsyncGatewayClient:
+  """GatewayClient over a grpc.aio channel. Use example.aio.aio.makeAsyncSvc() to create the services."""
+
+  channel = None
+  channelMgr = None
+
+  def __init__(self, ipAddr, port, caFile, options=None, deadlines=None):
+    try:
+      with open(caFile, 'rb') as f:
+        creds = grpc.ssl_channel_credentials(f.read())
+        self.channelMgr = ChannelManager("{}:{}".format(ipAddr, port), creds, options=options, deadlines=deadlines)
+        self.channel = self.channelMgr.getAioChannel()
+    except grpc.RpcError as e:
+      print(f'Cannot create the async gateway client: {e}')
+      raise
+
+  def getChannel(self):
+    return self.channel
+
+  async def close(self):
+    await self.channel.close()
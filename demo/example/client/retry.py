@@ -0,0 +1,173 @@
+import random
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import grpc
+
+MAX_ATTEMPTS = 4
+INITIAL_BACKOFF = 0.1
+MAX_BACKOFF = 2.0
+BACKOFF_MULTIPLIER = 2.0
+RETRYABLE_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+# Only reads are retried: Get*, e.g. GetConfig, GetList, GetLog, GetCapability
+IDEMPOTENT_PREFIXES = ('Get',)
+
+HEDGING_DELAY = 0.05
+MAX_HEDGED_ATTEMPTS = 2
+
+
+class RetryPolicy:
+  """
+  Which unary RPCs are retried or hedged and how.
+
+  retryable: RPCs retried on retryableCodes with exponential backoff and jitter. By default
+  every method starting with one of IDEMPOTENT_PREFIXES; mutations are never retried.
+  hedged: '/package.Service/Method' names of latency-sensitive reads. A second attempt is
+  sent if the first one has not completed after hedgingDelay, and the first reply wins.
+  """
+
+  def __init__(self, maxAttempts=MAX_ATTEMPTS, initialBackoff=INITIAL_BACKOFF, maxBackoff=MAX_BACKOFF, multiplier=BACKOFF_MULTIPLIER,
+               retryableCodes=RETRYABLE_CODES, idempotentPrefixes=IDEMPOTENT_PREFIXES, retryable=None, notRetryable=None,
+               hedged=None, hedgingDelay=HEDGING_DELAY, maxHedgedAttempts=MAX_HEDGED_ATTEMPTS):
+    self.maxAttempts = max(1, maxAttempts)
+    self.initialBackoff = initialBackoff
+    self.maxBackoff = maxBackoff
+    self.multiplier = multiplier
+    self.retryableCodes = frozenset(retryableCodes)
+    self.idempotentPrefixes = tuple(idempotentPrefixes)
+    self.retryable = frozenset(retryable or [])
+    self.notRetryable = frozenset(notRetryable or [])
+    self.hedged = frozenset(hedged or [])
+    self.hedgingDelay = hedgingDelay
+    self.maxHedgedAttempts = max(1, maxHedgedAttempts)
+
+  def isRetryable(self, method):
+    if method in self.notRetryable:
+      return False
+    if method in self.retryable:
+      return True
+    return method.rsplit('/', 1)[-1].startswith(self.idempotentPrefixes)
+
+  def isHedged(self, method):
+    return method in self.hedged
+
+  def getBackoff(self, attempt):
+    # Full jitter: a random delay up to the exponential backoff of the attempt
+    return random.uniform(0, min(self.maxBackoff, self.initialBackoff * (self.multiplier ** (attempt - 1))))
+
+
+class MethodMetrics:
+  calls = 0
+  retries = 0
+  hedges = 0
+  hedgeWins = 0
+  failures = 0
+
+  def snapshot(self):
+    return {'calls': self.calls, 'retries': self.retries, 'hedges': self.hedges, 'hedgeWins': self.hedgeWins, 'failures': self.failures}
+
+
+class RetryMetrics:
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.methods = {}
+
+  def add(self, method, **counts):
+    with self.lock:
+      metrics = self.methods.get(method)
+      if metrics is None:
+        metrics = MethodMetrics()
+        self.methods[method] = metrics
+      for name, count in counts.items():
+        setattr(metrics, name, getattr(metrics, name) + count)
+
+  def snapshot(self):
+    """{method: {calls, retries, hedges, hedgeWins, failures}}"""
+    with self.lock:
+      return {method: metrics.snapshot() for method, metrics in self.methods.items()}
+
+
+def getCode(outcome):
+  # The continuation returns an outcome which is both a grpc.Call and a grpc.Future
+  return outcome.code() if outcome.exception() is not None else grpc.StatusCode.OK
+
+
+class RetryInterceptor(grpc.UnaryUnaryClientInterceptor):
+  """Applies a RetryPolicy to the unary calls of a channel and counts what it does in RetryMetrics"""
+
+  def __init__(self, policy=None, metrics=None):
+    self.policy = policy or RetryPolicy()
+    self.metrics = metrics or RetryMetrics()
+    self.executor = None
+    self.lock = threading.Lock()
+
+  def intercept_unary_unary(self, continuation, client_call_details, request):
+    method = client_call_details.method
+    if isinstance(method, bytes):
+      method = method.decode()
+
+    self.metrics.add(method, calls=1)
+
+    if self.policy.isHedged(method):
+      outcome = self.callHedged(continuation, client_call_details, request, method)
+    elif self.policy.isRetryable(method):
+      outcome = self.callWithRetry(continuation, client_call_details, request, method)
+    else:
+      outcome = continuation(client_call_details, request)
+
+    if outcome.exception() is not None:
+      self.metrics.add(method, failures=1)
+    return outcome
+
+  def callWithRetry(self, continuation, client_call_details, request, method):
+    attempt = 1
+    while True:
+      outcome = continuation(client_call_details, request)
+      if attempt >= self.policy.maxAttempts or getCode(outcome) not in self.policy.retryableCodes:
+        return outcome
+
+      time.sleep(self.policy.getBackoff(attempt))
+      attempt += 1
+      self.metrics.add(method, retries=1)
+
+  def getExecutor(self):
+    with self.lock:
+      if self.executor is None:
+        self.executor = ThreadPoolExecutor(thread_name_prefix='hedge')
+      return self.executor
+
+  def callHedged(self, continuation, client_call_details, request, method):
+    executor = self.getExecutor()
+    first = executor.submit(self.callWithRetry, continuation, client_call_details, request, method)
+    pending = {first}
+    launched = 1
+    outcome = None
+
+    while len(pending) > 0:
+      timeout = self.policy.hedgingDelay if launched < self.policy.maxHedgedAttempts else None
+      done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+      for future in done:
+        outcome = future.result()
+        if outcome.exception() is None:
+          # The first success wins. The other attempts complete in the background and are ignored.
+          if future is not first:
+            self.metrics.add(method, hedgeWins=1)
+          return outcome
+
+      if len(done) == 0:
+        launched += 1
+        self.metrics.add(method, hedges=1)
+        pending.add(executor.submit(self.callWithRetry, continuation, client_call_details, request, method))
+
+    # Every attempt failed
+    return outcome
+
+  def close(self):
+    with self.lock:
+      if self.executor is not None:
+        self.executor.shutdown(wait=False)
+        self.executor = None
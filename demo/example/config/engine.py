@@ -0,0 +1,343 @@
+import base64
+import hashlib
+import json
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+from google.protobuf import json_format
+
+from example.action.action import ActionSvc
+from example.auth.auth import AuthSvc
+from example.card.card import CardSvc
+from example.display.display import DisplaySvc
+from example.face.face import FaceSvc
+from example.finger.finger import FingerSvc
+from example.input.input import InputSvc
+from example.multi.multi import fanOut
+from example.network.network import NetworkSvc
+from example.registry.registry import lazyImport
+from example.rs485.rs485 import RS485Svc
+from example.rtsp.rtsp import RtspSvc
+from example.status.status import StatusSvc
+from example.system.system import SystemSvc
+from example.thermal.thermal import ThermalSvc
+from example.time.time import TimeSvc
+from example.tna.tna import TNASvc
+from example.voip.voip import VoipSvc
+from example.wiegand.wiegand import WiegandSvc
+
+MAX_WORKERS = 16
+HASH_SIZE = 16
+
+
+class ConfigType:
+  """A config message read and written whole by a pair of service wrapper methods"""
+
+  def __init__(self, name, svcClass, pb2Name, messageName, getMethod='getConfig', setMethod='setConfig'):
+    self.name = name
+    self.svcClass = svcClass
+    self.pb2Name = pb2Name
+    self.messageName = messageName
+    self.getMethod = getMethod
+    self.setMethod = setMethod
+
+  def getMessageClass(self):
+    return getattr(lazyImport(self.pb2Name), self.messageName)
+
+
+CONFIG_TYPES = {configType.name: configType for configType in [
+  ConfigType('action', ActionSvc, 'action_pb2', 'TriggerActionConfig'),
+  ConfigType('auth', AuthSvc, 'auth_pb2', 'AuthConfig'),
+  ConfigType('card', CardSvc, 'card_pb2', 'CardConfig'),
+  ConfigType('display', DisplaySvc, 'display_pb2', 'DisplayConfig'),
+  ConfigType('face', FaceSvc, 'face_pb2', 'FaceConfig'),
+  ConfigType('finger', FingerSvc, 'finger_pb2', 'FingerConfig'),
+  ConfigType('input', InputSvc, 'input_pb2', 'InputConfig'),
+  ConfigType('rs485', RS485Svc, 'rs485_pb2', 'RS485Config'),
+  ConfigType('rtsp', RtspSvc, 'rtsp_pb2', 'RTSPConfig'),
+  ConfigType('status', StatusSvc, 'status_pb2', 'StatusConfig'),
+  ConfigType('system', SystemSvc, 'system_pb2', 'SystemConfig'),
+  ConfigType('thermal', ThermalSvc, 'thermal_pb2', 'ThermalConfig'),
+  ConfigType('time', TimeSvc, 'time_pb2', 'TimeConfig'),
+  ConfigType('tna', TNASvc, 'tna_pb2', 'TNAConfig'),
+  ConfigType('voip', VoipSvc, 'voip_pb2', 'VOIPConfig'),
+  ConfigType('wiegand', WiegandSvc, 'wiegand_pb2', 'WiegandConfig'),
+  ConfigType('ip', NetworkSvc, 'network_pb2', 'IPConfig', 'getIPConfig', 'setIPConfig'),
+  ConfigType('wlan', NetworkSvc, 'network_pb2', 'WLANConfig', 'getWLANConfig', 'setWLANConfig'),
+]}
+
+# Writing these can drop the connection or restart the device, so they are only handled when asked for
+DEFAULT_TYPES = [name for name in CONFIG_TYPES if name not in ('ip', 'wlan', 'system')]
+
+
+def serializeConfig(config):
+  # Deterministic, so equal configs have equal bytes and hashes
+  return config.SerializeToString(deterministic=True)
+
+
+def hashConfig(data):
+  return hashlib.blake2b(data, digest_size=HASH_SIZE).hexdigest()
+
+
+def isRepeated(field):
+  # FieldDescriptor.label is gone in newer protobuf releases
+  if hasattr(field, 'is_repeated'):
+    return field.is_repeated
+  return field.label == field.LABEL_REPEATED
+
+
+def diffMessages(current, desired, prefix=''):
+  """[(field path, current value, desired value)] of the fields which differ"""
+  changes = []
+  for field in desired.DESCRIPTOR.fields:
+    path = prefix + field.name
+    old = getattr(current, field.name)
+    new = getattr(desired, field.name)
+
+    if isRepeated(field):
+      if field.message_type is not None and field.message_type.GetOptions().map_entry:
+        old, new = dict(old), dict(new)
+      else:
+        old, new = list(old), list(new)
+      if old != new:
+        changes.append((path, old, new))
+    elif field.message_type is not None:
+      changes += diffMessages(old, new, path + '.')
+    elif old != new:
+      changes.append((path, old, new))
+  return changes
+
+
+class ConfigSnapshot:
+  """
+  Configs of a fleet at a point in time. Every distinct config is kept once as serialized
+  bytes, and each device refers to it by hash, so a fleet sharing a few configs stays small
+  and drift is found by comparing hashes without parsing anything.
+  """
+
+  def __init__(self, timestamp=None):
+    self.timestamp = time.time() if timestamp is None else timestamp
+    self.blobs = {}
+    # {deviceID: {config type: hash}}
+    self.hashes = {}
+    # {deviceID: {config type: error}}
+    self.errors = {}
+
+  def add(self, deviceID, typeName, config):
+    data = serializeConfig(config)
+    configHash = hashConfig(data)
+    self.blobs.setdefault(configHash, data)
+    self.hashes.setdefault(deviceID, {})[typeName] = configHash
+    return configHash
+
+  def addError(self, deviceID, typeName, error):
+    self.errors.setdefault(deviceID, {})[typeName] = error
+
+  def getDeviceIDs(self):
+    return sorted(self.hashes.keys())
+
+  def getHash(self, deviceID, typeName):
+    return self.hashes.get(deviceID, {}).get(typeName)
+
+  def getConfig(self, deviceID, typeName):
+    configHash = self.getHash(deviceID, typeName)
+    if configHash is None:
+      return None
+    return CONFIG_TYPES[typeName].getMessageClass().FromString(self.blobs[configHash])
+
+  def getDrift(self, baseline):
+    """{deviceID: [config types]} whose config differs from the baseline snapshot"""
+    drift = {}
+    for deviceID, hashes in self.hashes.items():
+      baseHashes = baseline.hashes.get(deviceID, {})
+      changed = [typeName for typeName, configHash in hashes.items() if typeName in baseHashes and baseHashes[typeName] != configHash]
+      if len(changed) > 0:
+        drift[deviceID] = sorted(changed)
+    return drift
+
+  def save(self, filename):
+    snapshot = {
+      'timestamp': self.timestamp,
+      'blobs': {configHash: base64.b64encode(data).decode() for configHash, data in self.blobs.items()},
+      'hashes': {str(deviceID): hashes for deviceID, hashes in self.hashes.items()},
+      'errors': {str(deviceID): errors for deviceID, errors in self.errors.items()},
+    }
+    tmpFile = filename + '.tmp'
+    with open(tmpFile, 'w') as f:
+      json.dump(snapshot, f)
+    os.replace(tmpFile, filename)
+
+  @classmethod
+  def load(cls, filename):
+    with open(filename) as f:
+      snapshot = json.load(f)
+
+    configSnapshot = cls(snapshot['timestamp'])
+    configSnapshot.blobs = {configHash: base64.b64decode(data) for configHash, data in snapshot['blobs'].items()}
+    configSnapshot.hashes = {int(deviceID): hashes for deviceID, hashes in snapshot['hashes'].items()}
+    configSnapshot.errors = {int(deviceID): errors for deviceID, errors in snapshot.get('errors', {}).items()}
+    return configSnapshot
+
+
+class ConfigPlan:
+  """
+  What apply() will write: the field changes of every device and config type that differs
+  from the desired state, grouped into batches of devices getting the same config.
+  """
+
+  def __init__(self):
+    # {(deviceID, config type): [(field path, current value, desired value)]}
+    self.changes = {}
+    # [(config type, config, [deviceIDs])]
+    self.batches = []
+
+  def isEmpty(self):
+    return len(self.batches) == 0
+
+  def getDeviceIDs(self):
+    return sorted({deviceID for deviceID, _ in self.changes})
+
+  def __repr__(self):
+    lines = [f'{len(self.changes)} configs of {len(self.getDeviceIDs())} devices in {len(self.batches)} batches']
+    for (deviceID, typeName), changes in sorted(self.changes.items()):
+      for path, old, new in changes:
+        lines.append(f'  {deviceID} {typeName}.{path}: {old} -> {new}')
+    return '\n'.join(lines)
+
+
+class ConfigEngine:
+  """
+  Reads the configs of many devices in parallel, compares them with a desired state field by
+  field and writes only the devices and config types that differ, one SetConfigMulti per
+  distinct config (per device SetConfig calls for services without a Multi RPC).
+
+    engine = ConfigEngine(channel)
+    snapshot = engine.snapshot(deviceIDs, ['auth', 'display'])
+    plan = engine.diff(snapshot, {'auth': {'authTimeout': 10}, 'display': displayConfig})
+    results = engine.apply(plan)
+
+  A desired config is either a whole message, which replaces the config of every device, or a
+  dict of fields in the JSON form of the message, which is merged into the config each device
+  already has, e.g. {'authTimeout': 10} keeps the other auth settings of every device.
+  """
+
+  def __init__(self, channel, maxWorkers=MAX_WORKERS):
+    self.channel = channel
+    self.maxWorkers = maxWorkers
+    self.svcs = {}
+
+  def getSvc(self, configType):
+    svc = self.svcs.get(configType.svcClass)
+    if svc is None:
+      svc = configType.svcClass(self.channel)
+      self.svcs[configType.svcClass] = svc
+    return svc
+
+  def getConfigType(self, typeName):
+    configType = CONFIG_TYPES.get(typeName)
+    if configType is None:
+      raise KeyError(f'Unknown config type: {typeName}')
+    return configType
+
+  def readConfig(self, deviceID, typeName):
+    configType = self.getConfigType(typeName)
+    return getattr(self.getSvc(configType), configType.getMethod)(deviceID)
+
+  def snapshot(self, deviceIDs, types=None):
+    """ConfigSnapshot of the config types (DEFAULT_TYPES by default) of all the devices"""
+    types = DEFAULT_TYPES if types is None else types
+    configSnapshot = ConfigSnapshot()
+    # Resolve the services before the threads start
+    for typeName in types:
+      self.getSvc(self.getConfigType(typeName))
+
+    def read(key):
+      deviceID, typeName = key
+      try:
+        return key, self.readConfig(deviceID, typeName), None
+      except grpc.RpcError as e:
+        return key, None, f'{e.code()}: {e.details()}'
+
+    keys = [(deviceID, typeName) for deviceID in deviceIDs for typeName in types]
+    with ThreadPoolExecutor(max_workers=max(1, min(self.maxWorkers, len(keys)))) as executor:
+      for (deviceID, typeName), config, error in executor.map(read, keys):
+        if error is None:
+          configSnapshot.add(deviceID, typeName, config)
+        else:
+          configSnapshot.addError(deviceID, typeName, error)
+
+    return configSnapshot
+
+  def getDesiredConfig(self, current, desired):
+    if isinstance(desired, dict):
+      config = type(current)()
+      config.CopyFrom(current)
+      json_format.ParseDict(desired, config)
+      return config
+    return desired
+
+  def diff(self, configSnapshot, desired, overrides=None):
+    """
+    ConfigPlan taking the devices of the snapshot to the desired state.
+    desired: {config type: message or dict of fields} for every device
+    overrides: {deviceID: {config type: message or dict of fields}} replacing desired for some devices
+    """
+    overrides = overrides or {}
+    plan = ConfigPlan()
+    batches = {}
+
+    for deviceID in configSnapshot.getDeviceIDs():
+      deviceDesired = dict(desired)
+      deviceDesired.update(overrides.get(deviceID, {}))
+
+      for typeName, target in deviceDesired.items():
+        currentHash = configSnapshot.getHash(deviceID, typeName)
+        if currentHash is None:
+          # Not read, see configSnapshot.errors
+          continue
+
+        # Whole configs are compared by hash first; the fleet usually matches already
+        if not isinstance(target, dict) and hashConfig(serializeConfig(target)) == currentHash:
+          continue
+
+        current = configSnapshot.getConfig(deviceID, typeName)
+        config = self.getDesiredConfig(current, target)
+        changes = diffMessages(current, config)
+        if len(changes) == 0:
+          continue
+
+        plan.changes[(deviceID, typeName)] = changes
+        data = serializeConfig(config)
+        batch = batches.get((typeName, data))
+        if batch is None:
+          batch = (typeName, config, [])
+          batches[(typeName, data)] = batch
+          plan.batches.append(batch)
+        batch[2].append(deviceID)
+
+    return plan
+
+  def apply(self, plan):
+    """Writes the batches of the plan and returns [(config type, multi.MultiResult)]"""
+    results = []
+    for typeName, config, deviceIDs in plan.batches:
+      configType = self.getConfigType(typeName)
+      result = fanOut(self.getSvc(configType), configType.setMethod, deviceIDs, config, maxWorkers=self.maxWorkers)
+      if not result.isOK():
+        print(f'Cannot set the {typeName} config of {result.getFailedIDs()}', flush=True)
+      results.append((typeName, result))
+    return results
+
+  def sync(self, deviceIDs, desired, overrides=None):
+    """Snapshot, diff and apply in one go. Returns the plan and the results of apply()."""
+    types = set(desired)
+    for deviceDesired in (overrides or {}).values():
+      types.update(deviceDesired)
+
+    configSnapshot = self.snapshot(deviceIDs, sorted(types))
+    plan = self.diff(configSnapshot, desired, overrides)
+    return plan, self.apply(plan)
@@ -1,7 +1,9 @@
 import grpc
 
-import connect_pb2_grpc
-import connect_pb2
+from example.registry.registry import lazyImport
+
+connect_pb2_grpc = lazyImport('connect_pb2_grpc')
+connect_pb2 = lazyImport('connect_pb2')
 
 
 class ConnectSvc:
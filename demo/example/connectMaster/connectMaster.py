@@ -1,7 +1,9 @@
 import grpc
 
-import connect_master_pb2_grpc
-import connect_master_pb2
+from example.registry.registry import lazyImport
+
+connect_master_pb2_grpc = lazyImport('connect_master_pb2_grpc')
+connect_master_pb2 = lazyImport('connect_master_pb2')
 
 
 class ConnectMasterSvc:
@@ -1,12 +1,7 @@
 import enum
-import input_pb2
-import device_pb2
-import rs485_pb2
-import card_pb2
-import user_pb2
-import auth_pb2
 from typing import List, Optional
 
+from example.registry.registry import lazyImport
 from example.connect.connect import ConnectSvc
 from example.device.device import DeviceSvc
 from example.rs485.rs485 import RS485Svc
@@ -14,6 +9,13 @@ from example.input.input import InputSvc
 from example.card.card import CardSvc
 from example.user.user import UserSvc
 
+input_pb2 = lazyImport('input_pb2')
+device_pb2 = lazyImport('device_pb2')
+rs485_pb2 = lazyImport('rs485_pb2')
+card_pb2 = lazyImport('card_pb2')
+user_pb2 = lazyImport('user_pb2')
+auth_pb2 = lazyImport('auth_pb2')
+
 def printFields(pb_obj):
     from google.protobuf.descriptor import FieldDescriptor
 
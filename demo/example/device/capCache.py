@@ -0,0 +1,334 @@
+import base64
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+from example.registry.registry import lazyImport
+from example.device.device import DeviceSvc
+from example.multi.multi import MultiResult
+
+device_pb2 = lazyImport('device_pb2')
+
+MAX_WORKERS = 8
+STATUS_QUEUE_SIZE = 16
+# Lookups filling the cache are written to the cache file at most once per FLUSH_DELAY seconds
+FLUSH_DELAY = 1.0
+
+# Cached fields of a device and their message types
+FIELDS = {'info': 'FactoryInfo', 'capability': 'DeviceCapability', 'capInfo': 'CapabilityInfo'}
+
+_stores = {}
+_storesLock = threading.Lock()
+
+
+class DeviceEntry:
+  """Cached GetInfo, GetCapability and GetCapabilityInfo of a device running firmwareVersion"""
+
+  info = None
+  capability = None
+  capInfo = None
+  updated = None
+
+  def __init__(self, deviceID, firmwareVersion):
+    self.deviceID = deviceID
+    self.firmwareVersion = firmwareVersion
+    # Checked against the device in this session. Entries read from the cache file are not.
+    self.verified = False
+    # Set by invalidate(): checked again even by caches which trust the cache file
+    self.invalidated = False
+
+  def toJSON(self):
+    entry = {'firmwareVersion': self.firmwareVersion, 'updated': self.updated}
+    for field in FIELDS:
+      message = getattr(self, field)
+      entry[field] = None if message is None else base64.b64encode(message.SerializeToString()).decode()
+    return entry
+
+  @classmethod
+  def fromJSON(cls, deviceID, entry):
+    deviceEntry = cls(deviceID, entry['firmwareVersion'])
+    deviceEntry.updated = entry.get('updated')
+    for field, messageType in FIELDS.items():
+      if entry.get(field) is not None:
+        setattr(deviceEntry, field, getattr(device_pb2, messageType).FromString(base64.b64decode(entry[field])))
+    return deviceEntry
+
+
+class CacheStore:
+  """Device entries shared by the CapabilityCaches of a cache file, and their persistence"""
+
+  def __init__(self, cacheFile=None):
+    self.cacheFile = cacheFile
+
+    self.lock = threading.RLock()
+    # Held from serializing to the rename, so an older snapshot never replaces a newer one
+    self.writeLock = threading.Lock()
+    self.entries = {}
+    self.dirty = False
+    self.flushTimer = None
+
+    self.loadCache()
+
+  def loadCache(self):
+    if self.cacheFile is None:
+      return
+    try:
+      with open(self.cacheFile) as f:
+        cache = json.load(f)
+      for deviceID, entry in cache.items():
+        deviceEntry = DeviceEntry.fromJSON(int(deviceID), entry)
+        self.entries[deviceEntry.deviceID] = deviceEntry
+    except FileNotFoundError:
+      pass
+    except:
+      e = sys.exc_info()[0]
+      print(f'Cannot read the device cache: {e}')
+
+  def save(self):
+    """Writes the entries to the cache file if they changed since the last write"""
+    with self.lock:
+      if self.flushTimer is not None:
+        self.flushTimer.cancel()
+        self.flushTimer = None
+
+    if self.cacheFile is None:
+      return
+
+    # Written to a temporary file and renamed over the cache, like sync/config.py
+    try:
+      with self.writeLock:
+        with self.lock:
+          if not self.dirty:
+            return
+          data = json.dumps({str(deviceID): entry.toJSON() for deviceID, entry in self.entries.items()}, indent='\t')
+          self.dirty = False
+
+        dirName = os.path.dirname(os.path.abspath(self.cacheFile))
+        fd, tmpFile = tempfile.mkstemp(prefix='.device_cache.', dir=dirName)
+        try:
+          with os.fdopen(fd, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+          os.replace(tmpFile, self.cacheFile)
+        except:
+          os.remove(tmpFile)
+          raise
+    except:
+      e = sys.exc_info()[0]
+      print(f'Cannot write the device cache: {e}')
+
+  def markDirty(self):
+    # Called with the lock held. Coalesces the writes of many lookups into one.
+    self.dirty = True
+    if self.cacheFile is not None and self.flushTimer is None:
+      self.flushTimer = threading.Timer(FLUSH_DELAY, self.save)
+      self.flushTimer.daemon = True
+      self.flushTimer.start()
+
+  def invalidate(self, deviceID):
+    with self.lock:
+      entry = self.entries.get(deviceID)
+      if entry is not None:
+        entry.verified = False
+        entry.invalidated = True
+
+  def remove(self, deviceID):
+    with self.lock:
+      if self.entries.pop(deviceID, None) is None:
+        return
+      self.dirty = True
+    self.save()
+
+  def clear(self):
+    with self.lock:
+      self.entries = {}
+      self.dirty = True
+    self.save()
+
+
+class CapabilityCache:
+  """
+  Device info and capabilities cached by device ID and firmware version, so a suite running
+  many tests against the same devices asks for them once.
+
+  The first lookup of a device in a session calls GetInfo and keeps the capabilities cached
+  for the same firmware version, in memory and in cacheFile if given. Later lookups are local
+  until the entry is invalidated: invalidate() when the device reconnects (see watch()) and
+  remove() after a firmware upgrade. With verify=False, entries of the cache file are trusted
+  without the GetInfo check. The file is written at the end of loadAll(), on remove() and
+  clear(), and otherwise at most once per FLUSH_DELAY; call save() before exiting.
+
+  The entries live in a CacheStore, which getCapabilityCache() shares between the caches of
+  the same file. Each cache calls its own deviceSvc, so use one cache file per gateway, and
+  has its own verify setting: a verify=False cache uses the file entries a verify=True cache
+  of the same file still checks.
+
+    capCache = getCapabilityCache(DeviceSvc(channel), 'device_cache.json')
+    capCache.loadAll(connectedIDs)
+    if capCache.getCapability(deviceID).fingerprintInputSupported:
+      ...
+  """
+
+  def __init__(self, deviceSvc, cacheFile=None, verify=True, maxWorkers=MAX_WORKERS, store=None):
+    self.deviceSvc = deviceSvc
+    self.verify = verify
+    self.maxWorkers = maxWorkers
+    self.store = CacheStore(cacheFile) if store is None else store
+    self.statusCh = None
+
+  def save(self):
+    self.store.save()
+
+  def isTrusted(self, entry):
+    if entry.verified:
+      return True
+    return not self.verify and not entry.invalidated
+
+  def getEntry(self, deviceID):
+    with self.store.lock:
+      entry = self.store.entries.get(deviceID)
+      if entry is not None and self.isTrusted(entry):
+        return entry
+
+    info = self.deviceSvc.getInfo(deviceID)
+
+    with self.store.lock:
+      entry = self.store.entries.get(deviceID)
+      if entry is None or entry.firmwareVersion != info.firmwareVersion:
+        # New device or new firmware: the capabilities are read again
+        entry = DeviceEntry(deviceID, info.firmwareVersion)
+        self.store.entries[deviceID] = entry
+      entry.info = info
+      entry.verified = True
+      entry.invalidated = False
+      entry.updated = time.time()
+      self.store.markDirty()
+      return entry
+
+  def getField(self, deviceID, field, read):
+    entry = self.getEntry(deviceID)
+    message = getattr(entry, field)
+    if message is not None:
+      return message
+
+    message = read(deviceID)
+    with self.store.lock:
+      setattr(entry, field, message)
+      self.store.markDirty()
+    return message
+
+  def getInfo(self, deviceID):
+    return self.getEntry(deviceID).info
+
+  def getCapability(self, deviceID):
+    return self.getField(deviceID, 'capability', self.deviceSvc.getCapability)
+
+  def getCapInfo(self, deviceID):
+    return self.getField(deviceID, 'capInfo', self.deviceSvc.getCapInfo)
+
+  def getFirmwareVersion(self, deviceID):
+    return self.getEntry(deviceID).firmwareVersion
+
+  def loadAll(self, deviceIDs, capInfo=True):
+    """Fills the cache for all the devices concurrently and returns a multi.MultiResult of the failures"""
+    result = MultiResult(deviceIDs)
+
+    def load(deviceID):
+      try:
+        self.getCapability(deviceID)
+        if capInfo:
+          self.getCapInfo(deviceID)
+      except grpc.RpcError as e:
+        result.addRpcError([deviceID], e)
+
+    with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+      list(executor.map(load, result.deviceIDs))
+    self.save()
+    return result
+
+  def invalidate(self, deviceID):
+    """Checks the firmware version again on the next lookup. The capabilities are kept if it did not change."""
+    self.store.invalidate(deviceID)
+
+  def remove(self, deviceID):
+    self.store.remove(deviceID)
+
+  def clear(self):
+    self.store.clear()
+
+  def handleStatus(self, status):
+    # A device which disconnected or reconnected may have been rebooted into another firmware
+    self.invalidate(status.deviceID)
+
+  def watch(self, connectSvc):
+    """Invalidates the devices on every connection status change until stop()"""
+    self.statusCh = connectSvc.subscribe(STATUS_QUEUE_SIZE)
+    statusThread = threading.Thread(target=self.receiveStatus, args=(self.statusCh,), daemon=True)
+    statusThread.start()
+
+  def receiveStatus(self, statusCh):
+    try:
+      for status in statusCh:
+        self.handleStatus(status)
+    except grpc.RpcError as e:
+      if e.code() != grpc.StatusCode.CANCELLED:
+        print(f'Cannot get the device status: {e}', flush=True)
+
+  def stop(self):
+    if self.statusCh is not None:
+      self.statusCh.cancel()
+      self.statusCh = None
+    self.save()
+
+
+def getCapabilityCache(deviceSvc, cacheFile=None, verify=True):
+  """A CapabilityCache calling deviceSvc, with the entries shared by the whole process for a cache file"""
+  key = None if cacheFile is None else os.path.abspath(cacheFile)
+  with _storesLock:
+    store = _stores.get(key)
+    if store is None:
+      store = CacheStore(cacheFile)
+      _stores[key] = store
+  return CapabilityCache(deviceSvc, verify=verify, store=store)
+
+
+class CachedDeviceSvc(DeviceSvc):
+  """
+  DeviceSvc answering getInfo, getCapability and getCapInfo from the entries shared for
+  cacheFile. Cache misses are read through its own channel. Firmware upgrades through it
+  remove the upgraded devices from the cache.
+  """
+
+  def __init__(self, channel, cacheFile=None, verify=True):
+    super().__init__(channel)
+    self.capCache = getCapabilityCache(DeviceSvc(channel), cacheFile, verify)
+
+  def getInfo(self, deviceID):
+    return self.capCache.getInfo(deviceID)
+
+  def getCapability(self, deviceID):
+    return self.capCache.getCapability(deviceID)
+
+  def getCapInfo(self, deviceID):
+    return self.capCache.getCapInfo(deviceID)
+
+  def upgradeFirmware(self, deviceID, firmwareData):
+    try:
+      super().upgradeFirmware(deviceID, firmwareData)
+    finally:
+      self.capCache.remove(deviceID)
+
+  def upgradeFirmwareMulti(self, deviceIDs, firmwareData):
+    try:
+      return super().upgradeFirmwareMulti(deviceIDs, firmwareData)
+    finally:
+      for deviceID in deviceIDs:
+        self.capCache.remove(deviceID)
@@ -1,10 +1,12 @@
 import grpc
 
-import device_pb2_grpc
-import device_pb2
-
 from deprecated import deprecated
 
+from example.registry.registry import lazyImport
+
+device_pb2_grpc = lazyImport('device_pb2_grpc')
+device_pb2 = lazyImport('device_pb2')
+
 class DeviceSvc:
   stub = None
 
@@ -61,6 +63,14 @@ class DeviceSvc:
       print(f'Cannot lock the device: {e}')
       raise
 
+  def lockDeviceMulti(self, deviceIDs):
+    try:
+      response = self.stub.LockMulti(device_pb2.LockMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot lock the device multi: {e}')
+      raise
+
   def unlockDevice(self, deviceID):
     try:
       self.stub.Unlock(device_pb2.UnlockRequest(deviceID=deviceID))
@@ -68,6 +78,14 @@ class DeviceSvc:
       print(f'Cannot unlock the device: {e}')
       raise
 
+  def unlockDeviceMulti(self, deviceIDs):
+    try:
+      response = self.stub.UnlockMulti(device_pb2.UnlockMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot unlock the device multi: {e}')
+      raise
+
   def rebootDevice(self, deviceID):
     try:
       self.stub.Reboot(device_pb2.RebootRequest(deviceID=deviceID))
@@ -75,6 +93,14 @@ class DeviceSvc:
       print(f'Cannot reboot the device: {e}')
       raise
 
+  def rebootDeviceMulti(self, deviceIDs):
+    try:
+      response = self.stub.RebootMulti(device_pb2.RebootMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot reboot the device multi: {e}')
+      raise
+
   def resetDevice(self, deviceID):
     try:
       self.stub.FactoryReset(device_pb2.FactoryResetRequest(deviceID=deviceID))
@@ -82,6 +108,14 @@ class DeviceSvc:
       print(f'Cannot reset the device: {e}')
       raise
 
+  def resetDeviceMulti(self, deviceIDs):
+    try:
+      response = self.stub.FactoryResetMulti(device_pb2.FactoryResetMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot reset the device multi: {e}')
+      raise
+
   def resetConfig(self, deviceID, withNetwork=False, withDB=False):
     try:
       self.stub.ResetConfig(device_pb2.ResetConfigRequest(deviceID=deviceID, withNetwork=withNetwork, withDB=withDB))
@@ -89,6 +123,14 @@ class DeviceSvc:
       print(f'Cannot reset the config: {e}')
       raise
 
+  def resetConfigMulti(self, deviceIDs, withNetwork=False, withDB=False):
+    try:
+      response = self.stub.ResetConfigMulti(device_pb2.ResetConfigMultiRequest(deviceIDs=deviceIDs, withNetwork=withNetwork, withDB=withDB))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot reset the config multi: {e}')
+      raise
+
   def clearDatabase(self, deviceID):
     try:
       self.stub.ClearDB(device_pb2.ClearDBRequest(deviceID=deviceID))
@@ -96,9 +138,25 @@ class DeviceSvc:
       print(f'Cannot clear the database: {e}')
       raise
 
+  def clearDatabaseMulti(self, deviceIDs):
+    try:
+      response = self.stub.ClearDBMulti(device_pb2.ClearDBMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot clear the database multi: {e}')
+      raise
+
   def upgradeFirmware(self, deviceID, firmwareData):
     try:
       self.stub.UpgradeFirmware(device_pb2.UpgradeFirmwareRequest(deviceID=deviceID, firmwareData=firmwareData))
     except grpc.RpcError as e:
       print(f'Cannot upgrade firmware: {e}')
       raise
+
+  def upgradeFirmwareMulti(self, deviceIDs, firmwareData):
+    try:
+      response = self.stub.UpgradeFirmwareMulti(device_pb2.UpgradeFirmwareMultiRequest(deviceIDs=deviceIDs, firmwareData=firmwareData))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot upgrade firmware multi: {e}')
+      raise
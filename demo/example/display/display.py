@@ -1,7 +1,9 @@
 import grpc
 
-import display_pb2_grpc
-import display_pb2
+from example.registry.registry import lazyImport
+
+display_pb2_grpc = lazyImport('display_pb2_grpc')
+display_pb2 = lazyImport('display_pb2')
 
 
 class DisplaySvc:
@@ -14,6 +16,81 @@ class DisplaySvc:
       print(f'Cannot get the display stub: {e}')
       raise
 
+  def updateLanguagePack(self, deviceID, data):
+    try:
+      self.stub.UpdateLanguagePack(display_pb2.UpdateLanguagePackRequest(deviceID=deviceID, data=data))
+    except grpc.RpcError as e:
+      print(f'Cannot update the language pack: {e}')
+      raise
+
+  def updateLanguagePackMulti(self, deviceIDs, data):
+    try:
+      response = self.stub.UpdateLanguagePackMulti(display_pb2.UpdateLanguagePackMultiRequest(deviceIDs=deviceIDs, data=data))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot update the language pack multi: {e}')
+      raise
+
+  def updateNotice(self, deviceID, notice):
+    try:
+      self.stub.UpdateNotice(display_pb2.UpdateNoticeRequest(deviceID=deviceID, notice=notice))
+    except grpc.RpcError as e:
+      print(f'Cannot update the notice: {e}')
+      raise
+
+  def updateNoticeMulti(self, deviceIDs, notice):
+    try:
+      response = self.stub.UpdateNoticeMulti(display_pb2.UpdateNoticeMultiRequest(deviceIDs=deviceIDs, notice=notice))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot update the notice multi: {e}')
+      raise
+
+  def updateBackgroundImage(self, deviceID, PNGImage):
+    try:
+      self.stub.UpdateBackgroundImage(display_pb2.UpdateBackgroundImageRequest(deviceID=deviceID, PNGImage=PNGImage))
+    except grpc.RpcError as e:
+      print(f'Cannot update the background image: {e}')
+      raise
+
+  def updateBackgroundImageMulti(self, deviceIDs, PNGImage):
+    try:
+      response = self.stub.UpdateBackgroundImageMulti(display_pb2.UpdateBackgroundImageMultiRequest(deviceIDs=deviceIDs, PNGImage=PNGImage))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot update the background image multi: {e}')
+      raise
+
+  def updateSlideImages(self, deviceID, PNGImages):
+    try:
+      self.stub.UpdateSlideImages(display_pb2.UpdateSlideImagesRequest(deviceID=deviceID, PNGImages=PNGImages))
+    except grpc.RpcError as e:
+      print(f'Cannot update the slide images: {e}')
+      raise
+
+  def updateSlideImagesMulti(self, deviceIDs, PNGImages):
+    try:
+      response = self.stub.UpdateSlideImagesMulti(display_pb2.UpdateSlideImagesMultiRequest(deviceIDs=deviceIDs, PNGImages=PNGImages))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot update the slide images multi: {e}')
+      raise
+
+  def updateSound(self, deviceID, index, waveData):
+    try:
+      self.stub.UpdateSound(display_pb2.UpdateSoundRequest(deviceID=deviceID, index=index, waveData=waveData))
+    except grpc.RpcError as e:
+      print(f'Cannot update the sound: {e}')
+      raise
+
+  def updateSoundMulti(self, deviceIDs, index, waveData):
+    try:
+      response = self.stub.UpdateSoundMulti(display_pb2.UpdateSoundMultiRequest(deviceIDs=deviceIDs, index=index, waveData=waveData))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot update the sound multi: {e}')
+      raise
+
   def getConfig(self, deviceID):
     try:
       response = self.stub.GetConfig(display_pb2.GetConfigRequest(deviceID=deviceID))
@@ -28,3 +105,11 @@ class DisplaySvc:
     except grpc.RpcError as e:
       print(f'Cannot set the Display config: {e}')
       raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(display_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the Display config multi: {e}')
+      raise
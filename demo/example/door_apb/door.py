@@ -1,7 +1,9 @@
 import grpc
 
-import door_pb2_grpc
-import door_pb2
+from example.registry.registry import lazyImport
+
+door_pb2_grpc = lazyImport('door_pb2_grpc')
+door_pb2 = lazyImport('door_pb2')
 
 
 class DoorSvc:
@@ -1,7 +1,9 @@
-import err_pb2
-
 from grpc_status import rpc_status
 
+from example.registry.registry import lazyImport
+
+err_pb2 = lazyImport('err_pb2')
+
 def getMultiError(rpcError):
   status = rpc_status.from_call(rpcError)
   if not (status is None):
@@ -0,0 +1,152 @@
+import heapq
+import queue
+import threading
+import time
+
+import grpc
+
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_NUM_OF_LOG = 16384
+MAX_IN_FLIGHT = 8
+MAX_BUFFERED_PAGES = 2
+
+_END = object()
+
+
+class DeviceProgress:
+  startEventID = 0
+  lastEventID = 0
+  lastTimestamp = 0
+  numOfLog = 0
+  numOfPage = 0
+  done = False
+  error = None
+
+  def __init__(self, deviceID, startEventID):
+    self.deviceID = deviceID
+    self.startEventID = startEventID
+    self.startTime = time.monotonic()
+    self.endTime = None
+
+  def getLag(self):
+    # Seconds between now and the newest event read so far
+    if self.lastTimestamp == 0:
+      return None
+    return max(0, int(time.time()) - self.lastTimestamp)
+
+
+class LogCollector:
+  """
+  Reads the logs of many devices concurrently and merges them into one time-ordered stream.
+
+  Each device is paged sequentially in its own worker (startEventID depends on the previous
+  page), so a device has at most one page in flight. RPCs are gated by a global in-flight
+  limit, so the gateway is never asked for more than maxInFlight pages at once. Pages are handed over through small
+  per-device buffers and merged with a k-way heap merge on (timestamp, deviceID, ID), so the
+  whole collection takes about as long as the slowest device rather than the sum of all.
+
+  readLog has the signature of EventSvc.getLog: (deviceID, startEventID, maxNumOfLog) -> logs.
+  """
+
+  def __init__(self, readLog, maxInFlight=MAX_IN_FLIGHT, maxNumOfLog=MAX_NUM_OF_LOG):
+    self.readLog = readLog
+    self.maxNumOfLog = maxNumOfLog
+
+    self.inFlight = threading.BoundedSemaphore(maxInFlight)
+    self.lock = threading.Lock()
+    self.progress = {}
+
+  def readPage(self, deviceID, startEventID):
+    with self.inFlight:
+      return self.readLog(deviceID, startEventID, self.maxNumOfLog)
+
+  def readDevice(self, progress, pages, stopEvent):
+    try:
+      startEventID = progress.startEventID
+      while not stopEvent.is_set():
+        logs = self.readPage(progress.deviceID, startEventID)
+
+        if len(logs) > 0:
+          last = logs[len(logs) - 1]
+          progress.lastEventID = last.ID
+          progress.lastTimestamp = last.timestamp
+          progress.numOfLog += len(logs)
+          progress.numOfPage += 1
+          startEventID = last.ID + 1
+          self.putPage(pages, logs, stopEvent)
+
+        if len(logs) < self.maxNumOfLog:
+          break
+    except grpc.RpcError as e:
+      print(f'Cannot read the logs of device {progress.deviceID}: {e}', flush=True)
+      progress.error = e
+    except Exception as e:
+      # Anything else would otherwise look like a complete collection
+      print(f'Cannot collect the logs of device {progress.deviceID}: {e}', flush=True)
+      progress.error = e
+    finally:
+      progress.done = True
+      progress.endTime = time.monotonic()
+      self.putPage(pages, _END, stopEvent)
+
+  def putPage(self, pages, logs, stopEvent):
+    # Never block forever on a full buffer once the consumer has gone away
+    while not stopEvent.is_set():
+      try:
+        pages.put(logs, timeout=0.1)
+        return
+      except queue.Full:
+        pass
+
+  def iterDevice(self, pages):
+    while True:
+      logs = pages.get()
+      if logs is _END:
+        return
+      for log in logs:
+        yield (log.timestamp, log.deviceID, log.ID, log)
+
+  def collect(self, deviceIDs, startEventIDs=None):
+    """
+    Generator of logs from all devices in timestamp order.
+    startEventIDs is an optional {deviceID: first event ID to read}.
+    """
+    startEventIDs = startEventIDs or {}
+    stopEvent = threading.Event()
+    streams = []
+
+    with self.lock:
+      self.progress = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, len(deviceIDs))) as executor:
+      try:
+        for deviceID in deviceIDs:
+          progress = DeviceProgress(deviceID, startEventIDs.get(deviceID, 0))
+          self.progress[deviceID] = progress
+
+          pages = queue.Queue(MAX_BUFFERED_PAGES)
+          executor.submit(self.readDevice, progress, pages, stopEvent)
+          streams.append(self.iterDevice(pages))
+
+        for _, _, _, log in heapq.merge(*streams):
+          yield log
+      finally:
+        # Also reached when the consumer stops early: workers exit after their current page
+        stopEvent.set()
+
+  def getReport(self):
+    """Per-device progress: {deviceID: {numOfLog, numOfPage, lastEventID, lag, elapsed, done, error}}"""
+    report = {}
+    for deviceID, progress in list(self.progress.items()):
+      endTime = progress.endTime if progress.endTime is not None else time.monotonic()
+      report[deviceID] = {
+        'numOfLog': progress.numOfLog,
+        'numOfPage': progress.numOfPage,
+        'lastEventID': progress.lastEventID,
+        'lag': progress.getLag(),
+        'elapsed': endTime - progress.startTime,
+        'done': progress.done,
+        'error': None if progress.error is None else str(progress.error),
+      }
+    return report
@@ -2,13 +2,21 @@ import grpc
 import json
 import sys
 
-import event_pb2_grpc
-import event_pb2
+from example.registry.registry import lazyImport
 
+event_pb2_grpc = lazyImport('event_pb2_grpc')
+event_pb2 = lazyImport('event_pb2')
+
+
+# Event codes are 16-bit values
+CODE_TABLE_SIZE = 0x10000
 
 class EventSvc:
   stub = None
   codeMap = None
+  codeTable = None
+  fallbackTable = None
+  fallbackExtra = None
 
   def __init__(self, channel): 
     try:
@@ -48,6 +56,14 @@ class EventSvc:
       print(f'Cannot clear event log: {e}')
       raise
 
+  def clearLogMulti(self, deviceIDs):
+    try:
+      response = self.stub.ClearLogMulti(event_pb2.ClearLogMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot clear event log multi: {e}')
+      raise
+
   def getImageLogFilter(self, deviceID):
     try:
       response = self.stub.GetImageFilter(event_pb2.GetImageFilterRequest(deviceID=deviceID))
@@ -63,6 +79,14 @@ class EventSvc:
       print(f'Cannot set the ImageLog Filter: {e}')
       raise
 
+  def setImageLogFilterMulti(self, deviceIDs, filters):
+    try:
+      response = self.stub.SetImageFilterMulti(event_pb2.SetImageFilterMultiRequest(deviceIDs=deviceIDs, filters=filters))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the ImageLog Filter multi: {e}')
+      raise
+
   def enableMonitoring(self, deviceID):
     try:
       self.stub.EnableMonitoring(event_pb2.EnableMonitoringRequest(deviceID=deviceID))
@@ -70,6 +94,14 @@ class EventSvc:
       print(f'Cannot enable monitoring: {e}')
       raise
 
+  def enableMonitoringMulti(self, deviceIDs):
+    try:
+      response = self.stub.EnableMonitoringMulti(event_pb2.EnableMonitoringMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot enable monitoring multi: {e}')
+      raise
+
   def disableMonitoring(self, deviceID):
     try:
       self.stub.DisableMonitoring(event_pb2.DisableMonitoringRequest(deviceID=deviceID))
@@ -77,9 +109,17 @@ class EventSvc:
       print(f'Cannot disable monitoring: {e}')
       raise
 
-  def subscribe(self, queueSize): 
+  def disableMonitoringMulti(self, deviceIDs):
+    try:
+      response = self.stub.DisableMonitoringMulti(event_pb2.DisableMonitoringMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot disable monitoring multi: {e}')
+      raise
+
+  def subscribe(self, queueSize, deviceIDs=None, eventCodes=None): 
     try:
-      return self.stub.SubscribeRealtimeLog(event_pb2.SubscribeRealtimeLogRequest(queueSize=queueSize))
+      return self.stub.SubscribeRealtimeLog(event_pb2.SubscribeRealtimeLogRequest(queueSize=queueSize, deviceIDs=deviceIDs or [], eventCodes=eventCodes or []))
     except grpc.RpcError as e:
       print(f'Cannot subscribe: {e}')
       raise
@@ -88,22 +128,51 @@ class EventSvc:
     try:
       with open(filename) as f:
         self.codeMap = json.load(f)
+      self.compileCodeMap()
     except:
       e = sys.exc_info()[0]
       print(f'Cannot init the event code map: {e}') 
 
+  def compileCodeMap(self):
+    # (eventCode, subCode) -> desc for the exact match, and a table indexed by the 16-bit
+    # event code for the 'eventCode | subCode' fallback. The first entry wins in both, 
+    # as in the original linear scan.
+    codeTable = {}
+    fallbackTable = [None] * CODE_TABLE_SIZE
+    fallbackExtra = {}
+
+    for entry in self.codeMap['entries']:
+      codeTable.setdefault((entry['event_code'], entry['sub_code']), entry['desc'])
+
+      code = entry['event_code']
+      if 0 <= code < CODE_TABLE_SIZE:
+        if fallbackTable[code] is None:
+          fallbackTable[code] = entry['desc']
+      else:
+        fallbackExtra.setdefault(code, entry['desc'])
+
+    self.codeTable = codeTable
+    self.fallbackTable = fallbackTable
+    self.fallbackExtra = fallbackExtra
+
   def getEventString(self, eventCode, subCode):
     if self.codeMap == None:
       return "No code map(%#X)" % (eventCode | subCode)
-    else:
-      for entry in self.codeMap['entries']:
-        if eventCode == entry['event_code'] and subCode == entry['sub_code']:
-          return entry['desc']
 
-      # The problem is that the main+sub form cannot be found.  by charlie. 2024.07.22
-      for entry in self.codeMap['entries']:
-        if (eventCode | subCode) == entry['event_code']:
-          return entry['desc']
+    if self.codeTable is None:
+      self.compileCodeMap()
+
+    desc = self.codeTable.get((eventCode, subCode))
+    if desc is not None:
+      return desc
 
-      return "Unknown code(%#X)" % (eventCode | subCode)
+    # The problem is that the main+sub form cannot be found.  by charlie. 2024.07.22
+    code = eventCode | subCode
+    if 0 <= code < CODE_TABLE_SIZE:
+      desc = self.fallbackTable[code]
+    else:
+      desc = self.fallbackExtra.get(code)
+    if desc is not None:
+      return desc
 
+    return "Unknown code(%#X)" % (eventCode | subCode)
@@ -0,0 +1,168 @@
+import json
+import os
+import sys
+
+import grpc
+
+MAX_NUM_OF_LOG = 16384
+STATE_FILE = 'export_state.json'
+
+# Columns shared by every log kind. Fields a log kind does not have are written as null.
+COLUMNS = [
+  ('deviceID', 'uint32'),
+  ('ID', 'uint32'),
+  ('timestamp', 'timestamp'),
+  ('userID', 'string'),
+  ('entityID', 'uint32'),
+  ('eventCode', 'uint32'),
+  ('subCode', 'uint32'),
+  ('TNAKey', 'int32'),
+  ('temperature', 'uint32'),
+  ('hasImage', 'bool'),
+  ('changedOnDevice', 'bool'),
+]
+
+
+def loadArrow():
+  try:
+    import pyarrow
+    return pyarrow
+  except ImportError:
+    print('The log exporter requires pyarrow: pip install pyarrow', flush=True)
+    raise
+
+
+def makeSchema(pa):
+  types = {
+    'uint32': pa.uint32(),
+    'int32': pa.int32(),
+    'string': pa.string(),
+    'bool': pa.bool_(),
+    'timestamp': pa.timestamp('s', tz='UTC'),
+  }
+  return pa.schema([(name, types[colType]) for name, colType in COLUMNS])
+
+
+def eventLogReader(eventSvc, filters=None):
+  if filters:
+    return lambda deviceID, startEventID, maxNumOfLog: eventSvc.getLogWithFilter(deviceID, startEventID, maxNumOfLog, filters)
+  return eventSvc.getLog
+
+
+def tnaLogReader(tnaSvc):
+  return tnaSvc.getTNALog
+
+
+def temperatureLogReader(thermalSvc):
+  return thermalSvc.getTemperatureLog
+
+
+class LogExporter:
+  """
+  Pages through the logs of a set of devices and writes them as Parquet (or Arrow IPC) files
+  with the fixed schema in COLUMNS.
+
+  Only one page (maxNumOfLog records) is held in memory at a time. Each page becomes one file
+  under <outDir>/<kind>/<deviceID>/, and the whole <outDir>/<kind> directory can be read as
+  one dataset by pyarrow.dataset, pandas or DuckDB. The last exported event ID of each
+  device is kept in <outDir>/export_state.json, updated after every file, and a later run
+  resumes from there.
+  """
+
+  def __init__(self, outDir, kind, readLog, fileFormat='parquet', maxNumOfLog=MAX_NUM_OF_LOG):
+    self.pa = loadArrow()
+    self.schema = makeSchema(self.pa)
+
+    self.outDir = outDir
+    self.kind = kind
+    self.readLog = readLog
+    self.fileFormat = fileFormat
+    self.maxNumOfLog = maxNumOfLog
+
+    self.statePath = os.path.join(outDir, STATE_FILE)
+    self.state = self.loadState()
+
+  def loadState(self):
+    try:
+      with open(self.statePath) as f:
+        return json.load(f)
+    except FileNotFoundError:
+      return {}
+    except:
+      e = sys.exc_info()[0]
+      print(f'Cannot read the export state: {e}')
+      return {}
+
+  def saveState(self):
+    os.makedirs(self.outDir, exist_ok=True)
+    tmpPath = self.statePath + '.tmp'
+    with open(tmpPath, 'w') as f:
+      json.dump(self.state, f, indent='\t')
+      f.flush()
+      os.fsync(f.fileno())
+    os.replace(tmpPath, self.statePath)
+
+  def getLastEventID(self, deviceID):
+    return self.state.get(self.kind, {}).get(str(deviceID), 0)
+
+  def toRecordBatch(self, logs):
+    columns = []
+    for name, colType in COLUMNS:
+      if len(logs) > 0 and not hasattr(logs[0], name):
+        values = [None] * len(logs)
+      else:
+        values = [getattr(log, name) for log in logs]
+      columns.append(self.pa.array(values, type=self.schema.field(name).type))
+    return self.pa.RecordBatch.from_arrays(columns, schema=self.schema)
+
+  def writeBatch(self, deviceID, batch):
+    dirName = os.path.join(self.outDir, self.kind, str(deviceID))
+    os.makedirs(dirName, exist_ok=True)
+
+    ids = batch.column(1)
+    fileName = f'{ids[0].as_py():010d}-{ids[len(ids) - 1].as_py():010d}.{self.fileFormat}'
+    path = os.path.join(dirName, fileName)
+    tmpPath = path + '.tmp'
+
+    table = self.pa.Table.from_batches([batch])
+    if self.fileFormat == 'parquet':
+      import pyarrow.parquet
+      pyarrow.parquet.write_table(table, tmpPath)
+    else:
+      import pyarrow.feather
+      pyarrow.feather.write_feather(table, tmpPath)
+    os.replace(tmpPath, path)
+    return path
+
+  def exportDevice(self, deviceID):
+    numOfLog = 0
+    lastEventID = self.getLastEventID(deviceID)
+
+    try:
+      while True:
+        logs = self.readLog(deviceID, lastEventID + 1, self.maxNumOfLog)
+        if len(logs) == 0:
+          break
+
+        self.writeBatch(deviceID, self.toRecordBatch(logs))
+
+        lastEventID = logs[len(logs) - 1].ID
+        numOfLog += len(logs)
+        self.state.setdefault(self.kind, {})[str(deviceID)] = lastEventID
+        self.saveState()
+
+        if len(logs) < self.maxNumOfLog:
+          break
+    except grpc.RpcError as e:
+      print(f'Cannot export the {self.kind} logs of device {deviceID}: {e}', flush=True)
+      raise
+
+    return numOfLog
+
+  def export(self, deviceIDs):
+    """Exports every device in turn. Returns {deviceID: number of exported records}."""
+    result = {}
+    for deviceID in deviceIDs:
+      result[deviceID] = self.exportDevice(deviceID)
+      print(f'[{deviceID}] Exported {result[deviceID]} {self.kind} logs up to event {self.getLastEventID(deviceID)}', flush=True)
+    return result
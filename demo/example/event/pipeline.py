@@ -0,0 +1,208 @@
+import asyncio
+import collections
+import time
+
+import grpc
+
+from example.registry.registry import lazyImport
+
+event_pb2_grpc = lazyImport('event_pb2_grpc')
+event_pb2 = lazyImport('event_pb2')
+
+QUEUE_SIZE = 16
+MAX_PENDING_EVENTS = 4096
+MAX_DEVICE_EVENTS = 256
+
+# What the dispatcher does with an event of a device whose queue is full
+OVERFLOW_SPILL = 'spill'
+OVERFLOW_DROP = 'drop'
+
+
+class PipelineMetrics:
+  received = 0
+  handled = 0
+  failed = 0
+  dropped = 0
+  spilled = 0
+  maxQueued = 0
+  blockedCount = 0
+  blockedTime = 0.0
+
+  def __init__(self):
+    self.perDevice = {}
+
+  def snapshot(self, queued):
+    return {
+      'received': self.received,
+      'handled': self.handled,
+      'failed': self.failed,
+      'dropped': self.dropped,
+      'spilled': self.spilled,
+      'queued': queued,
+      'maxQueued': self.maxQueued,
+      'blockedCount': self.blockedCount,
+      'blockedTime': self.blockedTime,
+      'perDevice': dict(self.perDevice),
+    }
+
+
+def runInThread(callback):
+  """Wraps a blocking handler (e.g. UserMgr.syncUser) so it runs in the default executor."""
+  async def handler(event):
+    await asyncio.get_running_loop().run_in_executor(None, callback, event)
+  return handler
+
+
+class EventPipeline:
+  """
+  Asyncio realtime event pipeline over a grpc.aio channel.
+
+  One reader task drains SubscribeRealtimeLog into a queue. A dispatcher routes each event
+  to a per-device queue served by its own worker task, so events of one device are handled
+  in order while different devices are handled in parallel. The dispatcher never waits for
+  a device: when the queue of a device is full, its events are kept in a spill list of that
+  device (OVERFLOW_SPILL) or dropped (OVERFLOW_DROP), so a slow device does not hold up the
+  others. When maxPending events are waiting overall, the reader stops pulling from the
+  stream, which pushes back on the gateway; the time spent blocked is reported in the
+  metrics. With OVERFLOW_SPILL a device which never catches up ends up using that budget.
+  """
+
+  stub = None
+  call = None
+
+  def __init__(self, aioChannel, maxPending=MAX_PENDING_EVENTS, maxDeviceEvents=MAX_DEVICE_EVENTS, overflow=OVERFLOW_SPILL):
+    self.stub = event_pb2_grpc.EventStub(aioChannel)
+    self.maxPending = maxPending
+    self.maxDeviceEvents = maxDeviceEvents
+    self.overflow = overflow
+    self.handlers = []
+    self.metrics = PipelineMetrics()
+
+    self.queue = asyncio.Queue()
+    self.deviceQueues = {}
+    self.spills = {}
+    self.tasks = []
+    self.deviceTasks = {}
+
+    # Events received and not handled or dropped yet
+    self.pending = 0
+    self.slotFree = asyncio.Event()
+
+  def addHandler(self, handler):
+    """handler is an async callable taking an EventLog. Use runInThread() for blocking ones."""
+    self.handlers.append(handler)
+
+  async def start(self, queueSize=QUEUE_SIZE, deviceIDs=None, eventCodes=None):
+    try:
+      request = event_pb2.SubscribeRealtimeLogRequest(queueSize=queueSize, deviceIDs=deviceIDs or [], eventCodes=eventCodes or [])
+      self.call = self.stub.SubscribeRealtimeLog(request)
+    except grpc.RpcError as e:
+      print(f'Cannot subscribe: {e}')
+      raise
+
+    self.tasks = [
+      asyncio.create_task(self.receive()),
+      asyncio.create_task(self.dispatch()),
+    ]
+
+  async def receive(self):
+    try:
+      async for event in self.call:
+        self.metrics.received += 1
+        await self.waitForSlot()
+        self.pending += 1
+        self.queue.put_nowait(event)
+        self.updateQueued()
+    except grpc.RpcError as e:
+      if e.code() == grpc.StatusCode.CANCELLED:
+        print('Monitoring is cancelled', flush=True)
+      else:
+        print(f'Cannot get realtime events: {e}')
+    except asyncio.CancelledError:
+      pass
+
+  async def waitForSlot(self):
+    if self.pending < self.maxPending:
+      return
+
+    self.metrics.blockedCount += 1
+    startTime = time.monotonic()
+    while self.pending >= self.maxPending:
+      self.slotFree.clear()
+      await self.slotFree.wait()
+    self.metrics.blockedTime += time.monotonic() - startTime
+
+  def release(self):
+    self.pending -= 1
+    self.slotFree.set()
+
+  def getQueued(self):
+    return self.queue.qsize() + sum(q.qsize() for q in self.deviceQueues.values()) + sum(len(spill) for spill in self.spills.values())
+
+  def updateQueued(self):
+    queued = self.getQueued()
+    if queued > self.metrics.maxQueued:
+      self.metrics.maxQueued = queued
+
+  async def dispatch(self):
+    while True:
+      event = await self.queue.get()
+      deviceQueue = self.deviceQueues.get(event.deviceID)
+      if deviceQueue is None:
+        deviceQueue = asyncio.Queue(self.maxDeviceEvents)
+        self.deviceQueues[event.deviceID] = deviceQueue
+        self.spills[event.deviceID] = collections.deque()
+        self.deviceTasks[event.deviceID] = asyncio.create_task(self.work(deviceQueue, self.spills[event.deviceID]))
+
+      spill = self.spills[event.deviceID]
+      # Once a device spills, later events go behind the spilled ones to keep the order
+      if len(spill) > 0 or deviceQueue.full():
+        if self.overflow == OVERFLOW_DROP:
+          self.metrics.dropped += 1
+          self.release()
+        else:
+          self.metrics.spilled += 1
+          spill.append(event)
+      else:
+        deviceQueue.put_nowait(event)
+      self.queue.task_done()
+
+  async def work(self, deviceQueue, spill):
+    while True:
+      event = await deviceQueue.get()
+      if len(spill) > 0:
+        # Refill before task_done(), so drain() does not see an empty queue while events are spilled
+        deviceQueue.put_nowait(spill.popleft())
+
+      for handler in self.handlers:
+        try:
+          await handler(event)
+        except Exception as e:
+          self.metrics.failed += 1
+          print(f'Cannot handle event {event.ID} of device {event.deviceID}: {e}', flush=True)
+      self.metrics.handled += 1
+      self.metrics.perDevice[event.deviceID] = self.metrics.perDevice.get(event.deviceID, 0) + 1
+      self.release()
+      deviceQueue.task_done()
+
+  async def drain(self):
+    """Waits until every event received so far has been handled."""
+    await self.queue.join()
+    for deviceQueue in list(self.deviceQueues.values()):
+      await deviceQueue.join()
+
+  async def stop(self, drain=True):
+    if self.call is not None:
+      self.call.cancel()
+    if drain:
+      await self.drain()
+
+    tasks = self.tasks + list(self.deviceTasks.values())
+    for task in tasks:
+      task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    self.tasks = []
+    self.deviceTasks = {}
+
+  def getMetrics(self):
+    return self.metrics.snapshot(self.getQueued())
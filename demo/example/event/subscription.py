@@ -0,0 +1,149 @@
+import bisect
+
+import grpc
+
+from example.registry.registry import lazyImport
+
+event_pb2 = lazyImport('event_pb2')
+
+QUEUE_SIZE = 16
+MAX_NUM_OF_LOG = 16384
+
+# Code ranges up to this size are expanded into exact codes for the gateway
+MAX_EXPANDED_CODES = 256
+# Upper bound on the EventFilter list sent with GetLogWithFilter
+MAX_SERVER_FILTERS = 64
+
+
+def normalizeRanges(eventCodes):
+  """eventCodes: codes and/or (first, last) inclusive ranges -> sorted, merged list of ranges"""
+  ranges = []
+  for code in eventCodes:
+    if isinstance(code, (tuple, list)):
+      ranges.append((code[0], code[1]))
+    else:
+      ranges.append((code, code))
+
+  ranges.sort()
+  merged = []
+  for first, last in ranges:
+    if merged and first <= merged[len(merged) - 1][1] + 1:
+      merged[len(merged) - 1] = (merged[len(merged) - 1][0], max(last, merged[len(merged) - 1][1]))
+    else:
+      merged.append((first, last))
+  return merged
+
+
+class EventSubscription:
+  """
+  Declarative event filter: device set, event-code ranges and user IDs (None = any).
+
+  What the gateway can evaluate is pushed down: deviceIDs/eventCodes on SubscribeRealtimeLog
+  and EventFilter entries on GetLogWithFilter. The full filter is also compiled into one
+  predicate that is applied to everything received, so handlers only see matching events
+  even when a part of the filter could not be pushed down.
+  """
+
+  def __init__(self, deviceIDs=None, eventCodes=None, userIDs=None):
+    self.deviceIDs = None if deviceIDs is None else frozenset(deviceIDs)
+    self.codeRanges = None if eventCodes is None else normalizeRanges(eventCodes)
+    self.userIDs = None if userIDs is None else frozenset(userIDs)
+    self.predicate = self.compile()
+
+  def expandCodes(self):
+    """Exact event codes if the ranges are small enough to send to the gateway, else None"""
+    if self.codeRanges is None:
+      return None
+    if sum(last - first + 1 for first, last in self.codeRanges) > MAX_EXPANDED_CODES:
+      return None
+    return [code for first, last in self.codeRanges for code in range(first, last + 1)]
+
+  def compile(self):
+    deviceIDs = self.deviceIDs
+    userIDs = self.userIDs
+    checks = []
+
+    if deviceIDs is not None:
+      checks.append(lambda event: event.deviceID in deviceIDs)
+
+    if self.codeRanges is not None:
+      exactCodes = self.expandCodes()
+      if exactCodes is not None:
+        codeSet = frozenset(exactCodes)
+        checks.append(lambda event: event.eventCode in codeSet or (event.eventCode | event.subCode) in codeSet)
+      else:
+        firsts = [first for first, _ in self.codeRanges]
+        lasts = [last for _, last in self.codeRanges]
+
+        def inRange(code):
+          i = bisect.bisect_right(firsts, code) - 1
+          return i >= 0 and code <= lasts[i]
+
+        checks.append(lambda event: inRange(event.eventCode) or inRange(event.eventCode | event.subCode))
+
+    if userIDs is not None:
+      checks.append(lambda event: event.userID in userIDs)
+
+    if len(checks) == 0:
+      return lambda event: True
+    if len(checks) == 1:
+      return checks[0]
+    return lambda event: all(check(event) for check in checks)
+
+  def matches(self, event):
+    return self.predicate(event)
+
+  def filterEvents(self, events):
+    predicate = self.predicate
+    return [event for event in events if predicate(event)]
+
+  def subscribe(self, eventSvc, queueSize=QUEUE_SIZE):
+    """SubscribeRealtimeLog with the device set and (small) code set pushed to the gateway"""
+    return eventSvc.subscribe(queueSize, deviceIDs=list(self.deviceIDs or []), eventCodes=self.expandCodes() or [])
+
+  def receive(self, eventCh):
+    """Yields the realtime events of the channel that match the subscription"""
+    predicate = self.predicate
+    for event in eventCh:
+      if predicate(event):
+        yield event
+
+  def makeServerFilters(self, startTime=0, endTime=0):
+    """EventFilter list for GetLogWithFilter, or None if nothing can be pushed down"""
+    codes = self.expandCodes() or [0]
+    userIDs = sorted(self.userIDs) if self.userIDs is not None else ['']
+
+    if len(codes) * len(userIDs) > MAX_SERVER_FILTERS:
+      # Push down the smaller dimension only, the predicate handles the rest
+      if self.userIDs is not None and len(userIDs) <= MAX_SERVER_FILTERS:
+        codes = [0]
+      elif len(codes) <= MAX_SERVER_FILTERS:
+        userIDs = ['']
+      else:
+        codes, userIDs = [0], ['']
+
+    if codes == [0] and userIDs == [''] and startTime == 0 and endTime == 0:
+      return None
+
+    return [event_pb2.EventFilter(userID=userID, eventCode=code, startTime=startTime, endTime=endTime) for code in codes for userID in userIDs]
+
+  def readLog(self, eventSvc, deviceID, startEventID, maxNumOfLog=MAX_NUM_OF_LOG, startTime=0, endTime=0):
+    """
+    Backfill of one device. Returns (matching events, next startEventID or None if done).
+    The next startEventID is based on the raw page, so pages with no match do not stop the paging.
+    """
+    if self.deviceIDs is not None and deviceID not in self.deviceIDs:
+      return [], None
+
+    try:
+      filters = self.makeServerFilters(startTime, endTime)
+      if filters is None:
+        events = eventSvc.getLog(deviceID, startEventID, maxNumOfLog)
+      else:
+        events = eventSvc.getLogWithFilter(deviceID, startEventID, maxNumOfLog, filters)
+    except grpc.RpcError as e:
+      print(f'Cannot read the filtered event log: {e}')
+      raise
+
+    nextEventID = events[len(events) - 1].ID + 1 if len(events) == maxNumOfLog else None
+    return self.filterEvents(events), nextEventID
@@ -1,7 +1,9 @@
 import grpc
 
-import face_pb2_grpc
-import face_pb2
+from example.registry.registry import lazyImport
+
+face_pb2_grpc = lazyImport('face_pb2_grpc')
+face_pb2 = lazyImport('face_pb2')
 
 
 class FaceSvc:
@@ -53,6 +55,14 @@ class FaceSvc:
       print(f'Cannot set the Face config: {e}')
       raise
 
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(face_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the Face config multi: {e}')
+      raise
+
   def getAuthGroup(self, deviceID):
     try:
       response = self.stub.GetAuthGroup(face_pb2.GetAuthGroupRequest(deviceID=deviceID))
@@ -68,6 +78,14 @@ class FaceSvc:
       print(f'Cannot add auth groups: {e}')
       raise
 
+  def addAuthGroupMulti(self, deviceIDs, groups):
+    try:
+      response = self.stub.AddAuthGroupMulti(face_pb2.AddAuthGroupMultiRequest(deviceIDs=deviceIDs, authGroups=groups))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot add auth groups multi: {e}')
+      raise
+
   def deleteAuthGroup(self, deviceID, groupIDs):
     try:
       self.stub.DeleteAuthGroup(face_pb2.DeleteAuthGroupRequest(deviceID=deviceID, groupIDs=groupIDs))
@@ -75,9 +93,25 @@ class FaceSvc:
       print(f'Cannot delete auth groups: {e}')
       raise
 
+  def deleteAuthGroupMulti(self, deviceIDs, groupIDs):
+    try:
+      response = self.stub.DeleteAuthGroupMulti(face_pb2.DeleteAuthGroupMultiRequest(deviceIDs=deviceIDs, groupIDs=groupIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete auth groups multi: {e}')
+      raise
+
   def deleteAllAuthGroup(self, deviceID):
     try:
       self.stub.DeleteAllAuthGroup(face_pb2.DeleteAllAuthGroupRequest(deviceID=deviceID))
     except grpc.RpcError as e:
       print(f'Cannot delete all auth groups: {e}')
       raise
+
+  def deleteAllAuthGroupMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllAuthGroupMulti(face_pb2.DeleteAllAuthGroupMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all auth groups multi: {e}')
+      raise
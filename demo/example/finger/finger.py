@@ -1,7 +1,9 @@
 import grpc
 
-import finger_pb2_grpc
-import finger_pb2
+from example.registry.registry import lazyImport
+
+finger_pb2_grpc = lazyImport('finger_pb2_grpc')
+finger_pb2 = lazyImport('finger_pb2')
 
 
 class FingerSvc:
@@ -52,3 +54,11 @@ class FingerSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the Fingerprint config: {e}')
       raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(finger_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the Fingerprint config multi: {e}')
+      raise
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+from example.multi.multi import fanOut
+
+WAVE_SIZE = 10
+CONCURRENCY = 2
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 5.0
+# Stop starting new waves when more than this ratio of a first-pass wave fails
+MAX_FAILURE_RATIO = 0.5
+
+STATUS_PENDING = 'pending'
+STATUS_UPGRADING = 'upgrading'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class UpgradeError(Exception):
+  """A device which the rollout could not upgrade"""
+
+  def __init__(self, deviceID, error):
+    super().__init__(f'Cannot upgrade device {deviceID}: {error}')
+    self.deviceID = deviceID
+    self.error = error
+
+
+class FirmwareImage:
+  """
+  Firmware file read and hashed once. getData() returns the same bytes object for every
+  request instead of reading the file per device.
+  """
+
+  def __init__(self, path):
+    self.path = path
+    with open(path, 'rb') as f:
+      self.data = f.read()
+    self.size = len(self.data)
+    self.sha256 = hashlib.sha256(self.data).hexdigest()
+
+  def getData(self):
+    return self.data
+
+  def close(self):
+    self.data = None
+
+
+class FirmwareRollout:
+  """
+  Upgrades a fleet with UpgradeFirmwareMulti in waves of waveSize devices, concurrency waves
+  at a time. A device whose upgrade fails is retried in a later wave, up to maxAttempts.
+
+  The status of every device is kept in stateFile, written atomically after every wave. Run
+  again with the same image and state file to resume: devices already upgraded are skipped,
+  and so are the ones which used up maxAttempts (run with a larger maxAttempts to retry them).
+  A state file of another image is ignored. With stateFile=None the state is only kept in
+  memory and every run upgrades all the devices. When more than maxFailureRatio of a
+  first-pass wave fails, no new wave is started.
+
+    image = FirmwareImage(FW_FILE)
+    rollout = FirmwareRollout(DeviceSvc(channel), image, 'rollout_state.json', waveSize=20)
+    report = rollout.run(deviceIDs)
+  """
+
+  def __init__(self, deviceSvc, image, stateFile, waveSize=WAVE_SIZE, concurrency=CONCURRENCY, maxAttempts=MAX_ATTEMPTS,
+               retryDelay=RETRY_DELAY, maxFailureRatio=MAX_FAILURE_RATIO, onProgress=None):
+    self.deviceSvc = deviceSvc
+    self.image = image
+    self.stateFile = stateFile
+    self.waveSize = max(1, waveSize)
+    self.concurrency = max(1, concurrency)
+    self.maxAttempts = max(1, maxAttempts)
+    self.retryDelay = retryDelay
+    self.maxFailureRatio = maxFailureRatio
+    self.onProgress = onProgress
+
+    self.lock = threading.Lock()
+    self.aborted = False
+    self.state = self.loadState()
+
+  def loadState(self):
+    state = None
+    if self.stateFile is None:
+      return self.newState()
+    try:
+      with open(self.stateFile) as f:
+        state = json.load(f)
+    except FileNotFoundError:
+      pass
+    except:
+      e = sys.exc_info()[0]
+      print(f'Cannot read the rollout state: {e}')
+
+    if state is None or state.get('sha256') != self.image.sha256:
+      state = self.newState()
+    return state
+
+  def newState(self):
+    return {'firmware': os.path.basename(self.image.path), 'sha256': self.image.sha256, 'size': self.image.size, 'devices': {}}
+
+  def saveState(self):
+    # Called with the lock held
+    if self.stateFile is None:
+      return
+    tmpFile = self.stateFile + '.tmp'
+    with open(tmpFile, 'w') as f:
+      json.dump(self.state, f, indent='\t')
+      f.flush()
+      os.fsync(f.fileno())
+    os.replace(tmpFile, self.stateFile)
+
+  def getDevice(self, deviceID):
+    # Called with the lock held. JSON keys are strings.
+    return self.state['devices'].setdefault(str(deviceID), {'status': STATUS_PENDING, 'attempts': 0, 'error': None, 'updated': None})
+
+  def setStatus(self, deviceID, status, error=None):
+    with self.lock:
+      device = self.getDevice(deviceID)
+      device['status'] = status
+      device['error'] = error
+      device['updated'] = time.time()
+      if status == STATUS_UPGRADING:
+        device['attempts'] += 1
+
+    if self.onProgress is not None:
+      self.onProgress(deviceID, status, error)
+
+  def getPendingIDs(self, deviceIDs):
+    with self.lock:
+      pendingIDs = []
+      for deviceID in deviceIDs:
+        device = self.getDevice(deviceID)
+        if device['status'] == STATUS_DONE:
+          continue
+        if device['status'] == STATUS_UPGRADING:
+          # Interrupted during the last run
+          device['status'] = STATUS_PENDING
+        if device['attempts'] < self.maxAttempts:
+          pendingIDs.append(deviceID)
+      return pendingIDs
+
+  def upgradeWave(self, deviceIDs, checkFailures=True):
+    if self.aborted:
+      return
+
+    for deviceID in deviceIDs:
+      self.setStatus(deviceID, STATUS_UPGRADING)
+
+    try:
+      result = fanOut(self.deviceSvc, 'upgradeFirmware', deviceIDs, self.image.getData())
+      errors = {deviceID: f'{error.code}: {error.msg}' for deviceID, error in result.errors.items()}
+    except grpc.RpcError as e:
+      errors = {deviceID: str(e.code()) for deviceID in deviceIDs}
+
+    for deviceID in deviceIDs:
+      if deviceID in errors:
+        self.setStatus(deviceID, STATUS_FAILED, errors[deviceID])
+      else:
+        self.setStatus(deviceID, STATUS_DONE)
+
+    with self.lock:
+      self.saveState()
+      if checkFailures and self.maxFailureRatio is not None and len(errors) > len(deviceIDs) * self.maxFailureRatio:
+        print(f'Stopping the rollout: {len(errors)} of {len(deviceIDs)} devices failed in the last wave', flush=True)
+        self.aborted = True
+
+  def run(self, deviceIDs):
+    """Upgrades the devices not upgraded yet and returns getReport()"""
+    deviceIDs = list(deviceIDs)
+    self.aborted = False
+
+    with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+      for attempt in range(self.maxAttempts):
+        pendingIDs = self.getPendingIDs(deviceIDs)
+        if len(pendingIDs) == 0 or self.aborted:
+          break
+
+        if attempt > 0:
+          print(f'Retrying the upgrade of {len(pendingIDs)} devices in {self.retryDelay}s...', flush=True)
+          time.sleep(self.retryDelay)
+
+        waves = [pendingIDs[i:i + self.waveSize] for i in range(0, len(pendingIDs), self.waveSize)]
+        # Retried devices are expected to fail more often, so only the first pass can stop the rollout
+        list(executor.map(self.upgradeWave, waves, [attempt == 0] * len(waves)))
+
+    return self.getReport(deviceIDs)
+
+  def getReport(self, deviceIDs=None):
+    """{'done': n, 'failed': n, 'pending': n, 'devices': {deviceID: {status, attempts, error, updated}}}"""
+    with self.lock:
+      devices = self.state['devices']
+      if deviceIDs is not None:
+        devices = {str(deviceID): devices[str(deviceID)] for deviceID in deviceIDs if str(deviceID) in devices}
+
+      report = {STATUS_DONE: 0, STATUS_FAILED: 0, STATUS_PENDING: 0, STATUS_UPGRADING: 0}
+      for device in devices.values():
+        report[device['status']] += 1
+      report['aborted'] = self.aborted
+      report['devices'] = {deviceID: dict(device) for deviceID, device in devices.items()}
+      return report
@@ -9,6 +9,7 @@ from example.login.login import LoginSvc
 from example.connectMaster.connectMaster import ConnectMasterSvc
 from example.connect.connect import ConnectSvc
 from example.device.device import DeviceSvc
+from example.fwupgrade.rollout import FirmwareImage, FirmwareRollout, STATUS_DONE, UpgradeError
 
 GATEWAY_CA_FILE = 'c:/cert/gateway/ca.crt'
 GATEWAY_ADDR = '192.168.43.108'
@@ -78,13 +79,24 @@ def UpgradeMain():
     print(current_time, "Upgrading Device: ", deviceID)
 
     #device.firmwareUpdate(deviceID, open('bs3-all_v1.1.0_20230414_sign.bin','rb').read())
-    deviceSvc_.upgradeFirmware(deviceID, open(FW_FILE1, 'rb').read())
+    image = FirmwareImage(FW_FILE1)
+    try:
+      # No state file: a test run always upgrades the device instead of resuming an earlier run
+      rollout = FirmwareRollout(deviceSvc_, image, None)
+      report = rollout.run([deviceID])
+    finally:
+      image.close()
 
     t = time.localtime()
     current_time = time.strftime("%H:%M:%S", t)
+    device = report['devices'].get(str(deviceID), {})
+    if device.get('status') != STATUS_DONE:
+      raise UpgradeError(deviceID, device.get('error'))
+
     print(current_time, "Upgrade Device Complete: ", deviceID)
-  except grpc.RpcError as e:
+  except (grpc.RpcError, UpgradeError) as e:
     print(f'Cannot complete upgrade test for device: {e}', flush=True)
+    raise
   finally:
     if MASTER_MODE:
       connectSvc_.disconnectAll(GATEWAY_ID)
@@ -1,7 +1,9 @@
 import grpc
 
-import gateway_pb2_grpc
-import gateway_pb2
+from example.registry.registry import lazyImport
+
+gateway_pb2_grpc = lazyImport('gateway_pb2_grpc')
+gateway_pb2 = lazyImport('gateway_pb2')
 
 
 class GatewaySvc:
@@ -1,7 +1,9 @@
 import grpc
 
-import input_pb2_grpc
-import input_pb2
+from example.registry.registry import lazyImport
+
+input_pb2_grpc = lazyImport('input_pb2_grpc')
+input_pb2 = lazyImport('input_pb2')
 
 
 class InputSvc:
@@ -28,3 +30,11 @@ class InputSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the Input config: {e}')
       raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(input_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the Input config multi: {e}')
+      raise
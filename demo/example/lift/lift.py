@@ -1,7 +1,9 @@
 import grpc
 
-import lift_pb2_grpc
-import lift_pb2
+from example.registry.registry import lazyImport
+
+lift_pb2_grpc = lazyImport('lift_pb2_grpc')
+lift_pb2 = lazyImport('lift_pb2')
 
 
 class LiftSvc:
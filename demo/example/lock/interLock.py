@@ -1,7 +1,9 @@
 import grpc
 
-import interlock_zone_pb2_grpc
-import interlock_zone_pb2
+from example.registry.registry import lazyImport
+
+interlock_zone_pb2_grpc = lazyImport('interlock_zone_pb2_grpc')
+interlock_zone_pb2 = lazyImport('interlock_zone_pb2')
 
 
 class InterlockZoneSvc:
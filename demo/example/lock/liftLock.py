@@ -1,7 +1,9 @@
 import grpc
 
-import lift_zone_pb2_grpc
-import lift_zone_pb2
+from example.registry.registry import lazyImport
+
+lift_zone_pb2_grpc = lazyImport('lift_zone_pb2_grpc')
+lift_zone_pb2 = lazyImport('lift_zone_pb2')
 
 
 class LiftLockZoneSvc:
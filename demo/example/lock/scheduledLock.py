@@ -1,7 +1,9 @@
 import grpc
 
-import lock_zone_pb2_grpc
-import lock_zone_pb2
+from example.registry.registry import lazyImport
+
+lock_zone_pb2_grpc = lazyImport('lock_zone_pb2_grpc')
+lock_zone_pb2 = lazyImport('lock_zone_pb2')
 
 
 class ScheduledLockZoneSvc:
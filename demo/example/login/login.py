@@ -1,7 +1,9 @@
 import grpc
 
-import login_pb2_grpc
-import login_pb2
+from example.registry.registry import lazyImport
+
+login_pb2_grpc = lazyImport('login_pb2_grpc')
+login_pb2 = lazyImport('login_pb2')
 
 ADMIN_TENANT_ID = "administrator"
 
@@ -16,19 +18,25 @@ class LoginSvc:
       raise
 
   def login(self, tenantCertFile):
+    with open(tenantCertFile, 'rb') as cert:
+      return self.loginWithCert(cert.read())
+
+  def loginWithCert(self, tenantCert):
     try:
-      with open(tenantCertFile, 'rb') as cert:
-        response = self.stub.Login(login_pb2.LoginRequest(tenantCert=cert.read()))
-        return response.jwtToken
+      response = self.stub.Login(login_pb2.LoginRequest(tenantCert=tenantCert))
+      return response.jwtToken
     except grpc.RpcError as e:
       print(f'Cannot login: {e}')
       raise
 
   def loginAdmin(self, adminCertFile):
+    with open(adminCertFile, 'rb') as cert:
+      return self.loginAdminWithCert(cert.read())
+
+  def loginAdminWithCert(self, adminCert):
     try:
-      with open(adminCertFile, 'rb') as cert:
-        response = self.stub.LoginAdmin(login_pb2.LoginAdminRequest(adminTenantCert=cert.read(), tenantID=ADMIN_TENANT_ID))
-        return response.jwtToken
+      response = self.stub.LoginAdmin(login_pb2.LoginAdminRequest(adminTenantCert=adminCert, tenantID=ADMIN_TENANT_ID))
+      return response.jwtToken
     except grpc.RpcError as e:
       print(f'Cannot login as an administrator: {e}')
       raise
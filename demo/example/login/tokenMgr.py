@@ -0,0 +1,208 @@
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+import grpc
+
+# Refresh the token this many seconds before it expires
+REFRESH_MARGIN = 300
+# Lifetime assumed for tokens without an 'exp' claim
+DEFAULT_LIFETIME = 3600
+RETRY_INTERVAL = 10
+
+LOGIN_SERVICE = '/gsdk.login.Login/'
+
+_managers = {}
+_managersLock = threading.Lock()
+
+
+def getExpiry(jwtToken):
+  """'exp' claim of a JWT in seconds since the epoch, or None. The signature is not checked."""
+  try:
+    payload = jwtToken.split('.')[1]
+    payload += '=' * (-len(payload) % 4)
+    return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+  except (IndexError, KeyError, TypeError, ValueError):
+    return None
+
+
+class TokenManager:
+  """
+  Logs in once per certificate and keeps the JWT fresh for every client of the process.
+
+  The token is refreshed in the background refreshMargin seconds before its 'exp' claim and
+  pushed to every attached client (anything with setToken(), e.g. MasterClient). With a
+  cacheFile the token and its expiry are also kept on disk (mode 0600), so a process started
+  while the token is still valid skips the Login RPC. The cache is only used by a manager with
+  the same certificate and target (the 'ip:port' of the master). Use getTokenManager() to share
+  one manager per master and certificate.
+  """
+
+  token = None
+  expiry = 0.0
+  timer = None
+
+  def __init__(self, loginSvc, certFile, admin=False, cacheFile=None, refreshMargin=REFRESH_MARGIN, target=None):
+    self.loginSvc = loginSvc
+    self.admin = admin
+    self.target = target
+    self.cacheFile = cacheFile
+    self.refreshMargin = refreshMargin
+
+    with open(certFile, 'rb') as f:
+      self.cert = f.read()
+    self.certHash = hashlib.sha256(self.cert).hexdigest()
+
+    self.lock = threading.RLock()
+    self.clients = []
+    self.closed = False
+
+    self.loadCache()
+
+  def loadCache(self):
+    if self.cacheFile is None:
+      return
+    try:
+      with open(self.cacheFile) as f:
+        cache = json.load(f)
+      # A token of another tenant or master would only fail with UNAUTHENTICATED
+      if cache.get('certHash') != self.certHash or cache.get('target') != self.target or cache['admin'] != self.admin:
+        return
+      if cache['expiry'] - self.refreshMargin > time.time():
+        self.token = cache['token']
+        self.expiry = cache['expiry']
+    except FileNotFoundError:
+      pass
+    except:
+      e = sys.exc_info()[0]
+      print(f'Cannot read the token cache: {e}')
+
+  def saveCache(self):
+    if self.cacheFile is None:
+      return
+    tmpFile = self.cacheFile + '.tmp'
+    fd = os.open(tmpFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+      json.dump({'certHash': self.certHash, 'target': self.target, 'admin': self.admin, 'token': self.token, 'expiry': self.expiry}, f)
+    os.replace(tmpFile, self.cacheFile)
+
+  def attach(self, client):
+    """Sets the current token on the client and every refreshed one after it"""
+    token = self.getToken()
+    with self.lock:
+      self.clients.append(client)
+    client.setToken(token)
+
+  def detach(self, client):
+    with self.lock:
+      if client in self.clients:
+        self.clients.remove(client)
+
+  def getToken(self):
+    with self.lock:
+      if self.token is None or time.time() >= self.expiry - self.refreshMargin:
+        self.refresh()
+      elif self.timer is None:
+        self.schedule(self.expiry - self.refreshMargin - time.time())
+      return self.token
+
+  def refresh(self, staleToken=None):
+    """
+    Logs in again. With staleToken, only if the current token is still that one, so many
+    callers failing with the same token cause a single login.
+    """
+    with self.lock:
+      if staleToken is not None and self.token != staleToken:
+        return self.token
+
+      if self.admin:
+        token = self.loginSvc.loginAdminWithCert(self.cert)
+      else:
+        token = self.loginSvc.loginWithCert(self.cert)
+
+      expiry = getExpiry(token)
+      self.token = token
+      self.expiry = expiry if expiry is not None else time.time() + DEFAULT_LIFETIME
+      self.saveCache()
+
+      for client in self.clients:
+        client.setToken(token)
+
+      self.schedule(self.expiry - self.refreshMargin - time.time())
+      return token
+
+  def schedule(self, delay):
+    # Called with the lock held
+    if self.timer is not None:
+      self.timer.cancel()
+    if self.closed:
+      return
+    self.timer = threading.Timer(max(delay, 1), self.refreshInBackground)
+    self.timer.daemon = True
+    self.timer.start()
+
+  def refreshInBackground(self):
+    # Any error has to reschedule, or the token is never refreshed again in this process
+    try:
+      self.refresh()
+    except Exception as e:
+      print(f'Cannot refresh the token, retrying in {RETRY_INTERVAL}s: {e}', flush=True)
+      with self.lock:
+        if not self.closed:
+          self.schedule(RETRY_INTERVAL)
+
+  def close(self):
+    with self.lock:
+      self.closed = True
+      if self.timer is not None:
+        self.timer.cancel()
+        self.timer = None
+
+
+def getTokenManager(loginSvc, certFile, admin=False, cacheFile=None, target=None):
+  """
+  The TokenManager shared by the whole process for a master and a certificate. The master is
+  the target ('ip:port'), or loginSvc itself when no target is given.
+  """
+  key = (target if target is not None else loginSvc, os.path.abspath(certFile), admin)
+  with _managersLock:
+    manager = _managers.get(key)
+    if manager is None:
+      manager = TokenManager(loginSvc, certFile, admin, cacheFile, target=target)
+      _managers[key] = manager
+    return manager
+
+
+class ReauthInterceptor(grpc.UnaryUnaryClientInterceptor):
+  """Retries a unary call once after refreshing the token when it fails with UNAUTHENTICATED"""
+
+  tokenMgr = None
+
+  def setTokenManager(self, tokenMgr):
+    self.tokenMgr = tokenMgr
+
+  def intercept_unary_unary(self, continuation, client_call_details, request):
+    tokenMgr = self.tokenMgr
+    method = client_call_details.method
+    if isinstance(method, bytes):
+      method = method.decode()
+
+    if tokenMgr is None or method.startswith(LOGIN_SERVICE):
+      return continuation(client_call_details, request)
+
+    staleToken = tokenMgr.token
+    outcome = continuation(client_call_details, request)
+    if outcome.exception() is None or outcome.code() != grpc.StatusCode.UNAUTHENTICATED:
+      return outcome
+
+    try:
+      tokenMgr.refresh(staleToken)
+    except grpc.RpcError as e:
+      print(f'Cannot refresh the token: {e}', flush=True)
+      return outcome
+
+    return continuation(client_call_details, request)
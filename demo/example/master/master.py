@@ -1,5 +1,9 @@
 import grpc
 
+from example.client.channel import ChannelManager
+from example.login.login import LoginSvc
+from example.login.tokenMgr import ReauthInterceptor, getTokenManager
+
 JWT_TOKEN_KEY = 'token'
 
 class JwtCredential(grpc.AuthMetadataPlugin):
@@ -13,16 +17,21 @@ class JwtCredential(grpc.AuthMetadataPlugin):
 
 class MasterClient:
   channel = None
+  channelMgr = None
   jwtCreds = None
+  tokenMgr = None
 
-  def __init__(self, ipAddr, port, caFile, certFile, keyFile):
+  def __init__(self, ipAddr, port, caFile, certFile, keyFile, poolSize=1, options=None, deadlines=None, retryPolicy=None):
     try:
       with open(caFile, 'rb') as ca, open(certFile, 'rb') as cert, open(keyFile, 'rb') as key:
         self.jwtCreds = JwtCredential()
+        self.reauth = ReauthInterceptor()
 
         sslCreds = grpc.ssl_channel_credentials(ca.read(), key.read(), cert.read())
         callCreds = grpc.metadata_call_credentials(self.jwtCreds)
-        self.channel = grpc.secure_channel("{}:{}".format(ipAddr, port), grpc.composite_channel_credentials(sslCreds, callCreds))
+        self.channelMgr = ChannelManager("{}:{}".format(ipAddr, port), grpc.composite_channel_credentials(sslCreds, callCreds), poolSize, options, deadlines,
+                                         retryPolicy=retryPolicy, interceptors=[self.reauth])
+        self.channel = self.channelMgr.getChannel()
     except grpc.RpcError as e:
       print(f'Cannot create the master client: {e}')
       raise
@@ -31,4 +40,55 @@ class MasterClient:
     return self.channel
 
   def setToken(self, jwtToken):
-    self.jwtCreds.setToken(jwtToken)
\ No newline at end of file
+    self.jwtCreds.setToken(jwtToken)
+
+  def login(self, certFile, admin=False, cacheFile=None):
+    """
+    Logs in with the process-wide TokenManager of the master and certificate instead of LoginSvc.login().
+    The token is refreshed before it expires, and a call failing with UNAUTHENTICATED is
+    retried once with a new token.
+    """
+    self.tokenMgr = getTokenManager(LoginSvc(self.channel), certFile, admin, cacheFile, self.channelMgr.target)
+    self.tokenMgr.attach(self)
+    self.reauth.setTokenManager(self.tokenMgr)
+    return self.tokenMgr.token
+
+  def getHealth(self):
+    return self.channelMgr.getHealth()
+
+  def getRetryMetrics(self):
+    return self.channelMgr.getRetryMetrics()
+
+
+class AsyncMasterClient:
+  """MasterClient over a grpc.aio channel. Use example.aio.aio.makeAsyncSvc() to create the services."""
+
+  channel = None
+  channelMgr = None
+  jwtCreds = None
+
+  def __init__(self, ipAddr, port, caFile, certFile, keyFile, options=None, deadlines=None):
+    try:
+      with open(caFile, 'rb') as ca, open(certFile, 'rb') as cert, open(keyFile, 'rb') as key:
+        self.jwtCreds = JwtCredential()
+
+        sslCreds = grpc.ssl_channel_credentials(ca.read(), key.read(), cert.read())
+        callCreds = grpc.metadata_call_credentials(self.jwtCreds)
+        self.channelMgr = ChannelManager("{}:{}".format(ipAddr, port), grpc.composite_channel_credentials(sslCreds, callCreds), options=options, deadlines=deadlines)
+        self.channel = self.channelMgr.getAioChannel()
+    except grpc.RpcError as e:
+      print(f'Cannot create the async master client: {e}')
+      raise
+
+  def getChannel(self):
+    return self.channel
+
+  def setToken(self, jwtToken):
+    self.jwtCreds.setToken(jwtToken)
+
+  def useTokenManager(self, tokenMgr):
+    """Shares the token of a MasterClient.login() or getTokenManager(), refreshed in the background"""
+    tokenMgr.attach(self)
+
+  async def close(self):
+    await self.channel.close()
@@ -0,0 +1,123 @@
+import grpc
+
+from concurrent.futures import ThreadPoolExecutor
+
+from example.registry.registry import lazyImport
+from example.err.err import getMultiError
+
+err_pb2 = lazyImport('err_pb2')
+
+MAX_WORKERS = 8
+
+
+class MultiResult:
+  """
+  Outcome of a fan-out call: the err_pb2.ErrorResponse of every device that failed, and the
+  return value of the wrapper method for every device that succeeded with a single call.
+  The Multi responses of the gateway only carry the errors, so a Multi call has no results.
+  """
+
+  usedMulti = False
+
+  def __init__(self, deviceIDs):
+    self.deviceIDs = list(deviceIDs)
+    self.errors = {}
+    self.results = {}
+
+  def addErrors(self, deviceErrors):
+    for deviceError in deviceErrors:
+      if deviceError.code != 0:
+        self.errors[deviceError.deviceID] = deviceError
+
+  def addRpcError(self, deviceIDs, rpcError):
+    for deviceID in deviceIDs:
+      self.errors[deviceID] = err_pb2.ErrorResponse(deviceID=deviceID, code=rpcError.code().value[0], msg=rpcError.details() or '')
+
+  def addResult(self, deviceID, value):
+    self.results[deviceID] = value
+
+  def getResult(self, deviceID, default=None):
+    return self.results.get(deviceID, default)
+
+  def isOK(self):
+    return len(self.errors) == 0
+
+  def getFailedIDs(self):
+    return [deviceID for deviceID in self.deviceIDs if deviceID in self.errors]
+
+  def getSucceededIDs(self):
+    return [deviceID for deviceID in self.deviceIDs if deviceID not in self.errors]
+
+  def __repr__(self):
+    return f'MultiResult(multi={self.usedMulti}, succeeded={self.getSucceededIDs()}, errors={list(self.errors.values())})'
+
+
+def callMulti(svc, method, deviceIDs, *args):
+  """
+  Calls <method>Multi of the service wrapper once for all the devices.
+  Returns a MultiResult, or None if the wrapper or the gateway has no Multi variant.
+  """
+  multi = getattr(svc, method + 'Multi', None)
+  if multi is None:
+    return None
+
+  result = MultiResult(deviceIDs)
+  result.usedMulti = True
+
+  try:
+    result.addErrors(multi(deviceIDs, *args) or [])
+  except grpc.RpcError as e:
+    if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+      return None
+
+    # Some of the devices failed: the details carry an err_pb2.MultiErrorResponse
+    multiError = getMultiError(e)
+    if multiError is None:
+      result.addRpcError(deviceIDs, e)
+    else:
+      result.addErrors(multiError.deviceErrors)
+
+  return result
+
+
+def callSingle(svc, method, deviceIDs, *args, maxWorkers=MAX_WORKERS):
+  """Calls the single-device method of the service wrapper for every device concurrently"""
+  result = MultiResult(deviceIDs)
+  single = getattr(svc, method)
+
+  def call(deviceID):
+    try:
+      result.addResult(deviceID, single(deviceID, *args))
+    except grpc.RpcError as e:
+      result.addRpcError([deviceID], e)
+
+  with ThreadPoolExecutor(max_workers=max(1, min(maxWorkers, len(deviceIDs)))) as executor:
+    list(executor.map(call, deviceIDs))
+
+  return result
+
+
+def fanOut(svc, method, deviceIDs, *args, maxWorkers=MAX_WORKERS):
+  """
+  Applies a single-device wrapper method (e.g. 'setConfig' of AuthSvc) to many devices.
+
+  The Multi RPC is used when the wrapper exposes <method>Multi and the gateway implements it,
+  so the whole set takes one round trip. Otherwise the single calls run on maxWorkers threads
+  and their return values are kept in MultiResult.results, which is how reads fan out.
+  Either way the per-device errors are returned as a MultiResult instead of being raised.
+
+    result = fanOut(authSvc, 'setConfig', deviceIDs, config)
+    if not result.isOK():
+      print(f'Failed devices: {result.getFailedIDs()}')
+
+    configs = fanOut(authSvc, 'getConfig', deviceIDs).results
+  """
+  deviceIDs = list(deviceIDs)
+  if len(deviceIDs) == 0:
+    return MultiResult(deviceIDs)
+
+  result = callMulti(svc, method, deviceIDs, *args)
+  if result is None:
+    result = callSingle(svc, method, deviceIDs, *args, maxWorkers=maxWorkers)
+
+  return result
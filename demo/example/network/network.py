@@ -1,7 +1,9 @@
 import grpc
 
-import network_pb2_grpc
-import network_pb2
+from example.registry.registry import lazyImport
+
+network_pb2_grpc = lazyImport('network_pb2_grpc')
+network_pb2 = lazyImport('network_pb2')
 
 
 class NetworkSvc:
@@ -29,6 +31,14 @@ class NetworkSvc:
       print(f'Cannot set the IP config: {e}')
       raise
 
+  def setIPConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetIPConfigMulti(network_pb2.SetIPConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the IP config multi: {e}')
+      raise
+
   def getWLANConfig(self, deviceID):
     try:
       response = self.stub.GetWLANConfig(network_pb2.GetWLANConfigRequest(deviceID=deviceID))
@@ -43,3 +53,11 @@ class NetworkSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the WLAN config: {e}')
       raise
+
+  def setWLANConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetWLANConfigMulti(network_pb2.SetWLANConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the WLAN config multi: {e}')
+      raise
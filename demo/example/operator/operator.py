@@ -1,7 +1,9 @@
 import grpc
 
-import operator_pb2_grpc
-import operator_pb2
+from example.registry.registry import lazyImport
+
+operator_pb2_grpc = lazyImport('operator_pb2_grpc')
+operator_pb2 = lazyImport('operator_pb2')
 
 
 class OperatorSvc:
@@ -29,6 +31,14 @@ class OperatorSvc:
       print(f'Cannot add operators: {e}')
       raise
 
+  def addMulti(self, deviceIDs, operators):
+    try:
+      response = self.stub.AddMulti(operator_pb2.AddMultiRequest(deviceIDs=deviceIDs, operators=operators))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot add operators multi: {e}')
+      raise
+
   def delete(self, deviceID, operatorIDs):
     try:
       self.stub.Delete(operator_pb2.DeleteRequest(deviceID=deviceID, operatorIDs=operatorIDs))
@@ -36,9 +46,25 @@ class OperatorSvc:
       print(f'Cannot delete operators: {e}')
       raise
 
+  def deleteMulti(self, deviceIDs, operatorIDs):
+    try:
+      response = self.stub.DeleteMulti(operator_pb2.DeleteMultiRequest(deviceIDs=deviceIDs, operatorIDs=operatorIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete operators multi: {e}')
+      raise
+
   def deleteAll(self, deviceID):
     try:
       self.stub.DeleteAll(operator_pb2.DeleteAllRequest(deviceID=deviceID))
     except grpc.RpcError as e:
       print(f'Cannot delete all the operators: {e}')
       raise
+
+  def deleteAllMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllMulti(operator_pb2.DeleteAllMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all the operators multi: {e}')
+      raise
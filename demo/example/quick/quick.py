@@ -1,8 +1,6 @@
 import grpc
 import logging
 import sys
-
-import tenant_pb2
 import os
 
 from testConnect import testConnect
@@ -15,6 +13,7 @@ from testCard import testCard
 from testUser import testUser
 from testEvent import testEvent
 
+from example.registry.registry import lazyImport
 from example.client.client import GatewayClient
 from example.master.master import MasterClient
 from example.connect.connect import ConnectSvc
@@ -29,6 +28,8 @@ from example.user.user import UserSvc
 from example.event.event import EventSvc
 from example.tenant.tenant import TenantSvc
 
+tenant_pb2 = lazyImport('tenant_pb2')
+
 GATEWAY_CA_FILE = '../cert/gateway/ca.crt'
 GATEWAY_IP = '192.168.43.108'
 GATEWAY_PORT = 4000
@@ -1,5 +1,7 @@
 import grpc
-import card_pb2
+from example.registry.registry import lazyImport
+
+card_pb2 = lazyImport('card_pb2')
 
 NUM_OF_NEW_BLACKLIST = 2
 FIRST_BLACKLISTED_CARD_ID = 100000
@@ -1,5 +1,7 @@
 import grpc
-import connect_pb2
+from example.registry.registry import lazyImport
+
+connect_pb2 = lazyImport('connect_pb2')
 
 def testConnect(connectSvc, ipAddr, port, useSSL):
   try:
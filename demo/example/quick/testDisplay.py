@@ -1,5 +1,7 @@
 import grpc
-import display_pb2
+from example.registry.registry import lazyImport
+
+display_pb2 = lazyImport('display_pb2')
 
 def testDisplay(displaySvc, deviceID):
   try:
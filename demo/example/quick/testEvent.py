@@ -1,5 +1,7 @@
 import grpc
-import event_pb2
+from example.registry.registry import lazyImport
+
+event_pb2 = lazyImport('event_pb2')
 
 MAX_NUM_OF_LOG = 16
 MAX_NUM_OF_IMAGE_LOG = 2
@@ -1,5 +1,7 @@
 import grpc
-import face_pb2
+from example.registry.registry import lazyImport
+
+face_pb2 = lazyImport('face_pb2')
 
 IMAGE_FILENAME = './face.bmp'
 
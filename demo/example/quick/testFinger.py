@@ -1,5 +1,7 @@
 import grpc
-import finger_pb2
+from example.registry.registry import lazyImport
+
+finger_pb2 = lazyImport('finger_pb2')
 
 QUALITY_THRESHOLD = 50
 IMAGE_FILENAME = './finger.bmp'
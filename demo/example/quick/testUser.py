@@ -1,11 +1,12 @@
 import grpc
-import user_pb2
-import finger_pb2
-import face_pb2
+from example.registry.registry import lazyImport
+
+user_pb2 = lazyImport('user_pb2')
+finger_pb2 = lazyImport('finger_pb2')
+face_pb2 = lazyImport('face_pb2')
 
 NUM_OF_NEW_USER = 3
 START_USER_ID = 10000000
-TEMPLATE_FORMAT = finger_pb2.TEMPLATE_FORMAT_SUPREMA
 QUALITY_THRESHOLD = 50
 
 def getNewUserIDs():
@@ -36,13 +37,16 @@ def testSetFinger(userSvc, fingerSvc, deviceID, userID):
 
     print(f'\nUser without fingerprint: \n{users[0]}')
 
+    # Read here rather than at import time, which would load finger_pb2
+    templateFormat = finger_pb2.TEMPLATE_FORMAT_SUPREMA
+
     print('>>> Scan a finger...', flush=True)
 
-    templateData1 = fingerSvc.scan(deviceID, TEMPLATE_FORMAT, QUALITY_THRESHOLD)
+    templateData1 = fingerSvc.scan(deviceID, templateFormat, QUALITY_THRESHOLD)
 
     print('>>> Scan the same finger again...', flush=True)
 
-    templateData2 = fingerSvc.scan(deviceID, TEMPLATE_FORMAT, QUALITY_THRESHOLD)
+    templateData2 = fingerSvc.scan(deviceID, templateFormat, QUALITY_THRESHOLD)
 
     fingerData = finger_pb2.FingerData(templates=[templateData1, templateData2])
     userFingers = [user_pb2.UserFinger(userID=userID, fingers=[fingerData])]
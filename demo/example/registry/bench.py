@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEMO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SERVICE_DIR = os.path.join(DEMO_DIR, 'biostar', 'service')
+
+# The service wrappers imported by example/quick/quick.py
+QUICK_MODULES = [
+  'example.client.client',
+  'example.master.master',
+  'example.connect.connect',
+  'example.connectMaster.connectMaster',
+  'example.login.login',
+  'example.device.device',
+  'example.display.display',
+  'example.finger.finger',
+  'example.face.face',
+  'example.card.card',
+  'example.user.user',
+  'example.event.event',
+  'example.tenant.tenant',
+]
+
+# Runs in a fresh interpreter and prints {importMs, pb2Modules}
+SAMPLE_CODE = '''
+import importlib, json, sys, time
+modules, mode = json.loads(sys.argv[1]), sys.argv[2]
+startTime = time.perf_counter()
+import grpc
+for name in modules:
+  importlib.import_module(name)
+from example.registry import registry
+if mode == 'eager':
+  # What the wrappers cost when every generated module was imported up front
+  for module in list(registry._lazyModules.values()):
+    module.load()
+elif mode == 'firstCall':
+  # A short tool calling a single service
+  from example.user.user import UserSvc
+  UserSvc(grpc.insecure_channel('localhost:1'))
+  registry.getService('User').pb2.GetListRequest(deviceID=1)
+elapsed = time.perf_counter() - startTime
+pb2Modules = [name for name in sys.modules if name.endswith('_pb2') and '.' not in name]
+print(json.dumps({'importMs': elapsed * 1000, 'pb2Modules': len(pb2Modules)}))
+'''
+
+MODES = ['eager', 'lazy', 'firstCall']
+
+
+def runSample(modules, mode):
+  env = dict(os.environ)
+  env['PYTHONPATH'] = os.pathsep.join([DEMO_DIR, SERVICE_DIR, env.get('PYTHONPATH', '')])
+  result = subprocess.run([sys.executable, '-c', SAMPLE_CODE, json.dumps(modules), mode], env=env, cwd=DEMO_DIR,
+                          capture_output=True, text=True, check=True)
+  return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def runBenchmark(modules=QUICK_MODULES, runs=10):
+  """{mode: {medianMs, minMs, pb2Modules}} of importing the modules in fresh interpreters"""
+  # Warm up the bytecode caches
+  runSample(modules, 'eager')
+
+  report = {}
+  for mode in MODES:
+    samples = [runSample(modules, mode) for _ in range(runs)]
+    times = [sample['importMs'] for sample in samples]
+    report[mode] = {
+      'medianMs': round(statistics.median(times), 1),
+      'minMs': round(min(times), 1),
+      'pb2Modules': samples[-1]['pb2Modules'],
+    }
+  return report
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Startup time of the example wrappers with eager and lazy generated modules')
+  parser.add_argument('--runs', type=int, default=10)
+  parser.add_argument('--modules', nargs='*', default=QUICK_MODULES, help='modules to import')
+  args = parser.parse_args()
+
+  print(json.dumps(runBenchmark(args.modules, args.runs), indent=2))
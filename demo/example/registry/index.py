@@ -0,0 +1,46 @@
+# Generated by 'python -m example.registry.registry --build' from biostar/service. Do not edit.
+
+SERVICES = { 'gsdk.access.Access': ('access_pb2', 'access_pb2_grpc', 'AccessStub'),
+  'gsdk.action.TriggerAction': ('action_pb2', 'action_pb2_grpc', 'TriggerActionStub'),
+  'gsdk.admin.Admin': ('admin_pb2', 'admin_pb2_grpc', 'AdminStub'),
+  'gsdk.apb_zone.APBZone': ('apb_zone_pb2', 'apb_zone_pb2_grpc', 'APBZoneStub'),
+  'gsdk.auth.Auth': ('auth_pb2', 'auth_pb2_grpc', 'AuthStub'),
+  'gsdk.card.Card': ('card_pb2', 'card_pb2_grpc', 'CardStub'),
+  'gsdk.cert.Cert': ('cert_pb2', 'cert_pb2_grpc', 'CertStub'),
+  'gsdk.connect.Connect': ('connect_pb2', 'connect_pb2_grpc', 'ConnectStub'),
+  'gsdk.connect_master.ConnectMaster': ('connect_master_pb2', 'connect_master_pb2_grpc', 'ConnectMasterStub'),
+  'gsdk.device.Device': ('device_pb2', 'device_pb2_grpc', 'DeviceStub'),
+  'gsdk.display.Display': ('display_pb2', 'display_pb2_grpc', 'DisplayStub'),
+  'gsdk.door.Door': ('door_pb2', 'door_pb2_grpc', 'DoorStub'),
+  'gsdk.event.Event': ('event_pb2', 'event_pb2_grpc', 'EventStub'),
+  'gsdk.face.Face': ('face_pb2', 'face_pb2_grpc', 'FaceStub'),
+  'gsdk.finger.Finger': ('finger_pb2', 'finger_pb2_grpc', 'FingerStub'),
+  'gsdk.fire_zone.FireAlarmZone': ('fire_zone_pb2', 'fire_zone_pb2_grpc', 'FireAlarmZoneStub'),
+  'gsdk.gateway.Gateway': ('gateway_pb2', 'gateway_pb2_grpc', 'GatewayStub'),
+  'gsdk.input.Input': ('input_pb2', 'input_pb2_grpc', 'InputStub'),
+  'gsdk.interlock_zone.InterlockZone': ('interlock_zone_pb2', 'interlock_zone_pb2_grpc', 'InterlockZoneStub'),
+  'gsdk.intrusion_zone.IntrusionAlarmZone': ('intrusion_zone_pb2', 'intrusion_zone_pb2_grpc', 'IntrusionAlarmZoneStub'),
+  'gsdk.lift.Lift': ('lift_pb2', 'lift_pb2_grpc', 'LiftStub'),
+  'gsdk.lift_zone.LiftZone': ('lift_zone_pb2', 'lift_zone_pb2_grpc', 'LiftZoneStub'),
+  'gsdk.lock_zone.LockZone': ('lock_zone_pb2', 'lock_zone_pb2_grpc', 'LockZoneStub'),
+  'gsdk.login.Login': ('login_pb2', 'login_pb2_grpc', 'LoginStub'),
+  'gsdk.master.Master': ('master_pb2', 'master_pb2_grpc', 'MasterStub'),
+  'gsdk.network.Network': ('network_pb2', 'network_pb2_grpc', 'NetworkStub'),
+  'gsdk.operator.Operator': ('operator_pb2', 'operator_pb2_grpc', 'OperatorStub'),
+  'gsdk.rs485.RS485': ('rs485_pb2', 'rs485_pb2_grpc', 'RS485Stub'),
+  'gsdk.rtsp.RTSP': ('rtsp_pb2', 'rtsp_pb2_grpc', 'RTSPStub'),
+  'gsdk.schedule.Schedule': ('schedule_pb2', 'schedule_pb2_grpc', 'ScheduleStub'),
+  'gsdk.server.Server': ('server_pb2', 'server_pb2_grpc', 'ServerStub'),
+  'gsdk.status.Status': ('status_pb2', 'status_pb2_grpc', 'StatusStub'),
+  'gsdk.system.System': ('system_pb2', 'system_pb2_grpc', 'SystemStub'),
+  'gsdk.tenant.Tenant': ('tenant_pb2', 'tenant_pb2_grpc', 'TenantStub'),
+  'gsdk.test.Test': ('test_pb2', 'test_pb2_grpc', 'TestStub'),
+  'gsdk.thermal.Thermal': ('thermal_pb2', 'thermal_pb2_grpc', 'ThermalStub'),
+  'gsdk.time.Time': ('time_pb2', 'time_pb2_grpc', 'TimeStub'),
+  'gsdk.timed_apb_zone.TimedAPBZone': ('timed_apb_zone_pb2', 'timed_apb_zone_pb2_grpc', 'TimedAPBZoneStub'),
+  'gsdk.tna.TNA': ('tna_pb2', 'tna_pb2_grpc', 'TNAStub'),
+  'gsdk.udp.UDP': ('udp_pb2', 'udp_pb2_grpc', 'UDPStub'),
+  'gsdk.udp_master.UDPMaster': ('udp_master_pb2', 'udp_master_pb2_grpc', 'UDPMasterStub'),
+  'gsdk.user.User': ('user_pb2', 'user_pb2_grpc', 'UserStub'),
+  'gsdk.voip.VOIP': ('voip_pb2', 'voip_pb2_grpc', 'VOIPStub'),
+  'gsdk.wiegand.Wiegand': ('wiegand_pb2', 'wiegand_pb2_grpc', 'WiegandStub')}
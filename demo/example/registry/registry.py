@@ -0,0 +1,182 @@
+import argparse
+import importlib
+import os
+import pprint
+import re
+import sys
+import threading
+
+from example.registry.index import SERVICES
+
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'biostar', 'service')
+INDEX_FILE = os.path.join(os.path.dirname(__file__), 'index.py')
+
+STUB_PATTERN = re.compile(r'^class (\w+)Stub\(', re.MULTILINE)
+METHOD_PATTERN = re.compile(r"'/([\w.]+)/\w+'")
+
+
+class LazyModule:
+  """
+  Stand-in for a generated module which is imported on first attribute access. Importing a
+  *_pb2 module adds its descriptors, and those of its dependencies, to the default pool,
+  so a script only pays for the services it actually calls.
+
+    user_pb2 = lazyImport('user_pb2')
+    request = user_pb2.GetListRequest(deviceID=deviceID)   # user_pb2 is imported here
+  """
+
+  def __init__(self, name):
+    self.__dict__['_name'] = name
+    self.__dict__['_module'] = None
+
+  def load(self):
+    module = self.__dict__['_module']
+    if module is None:
+      # The import lock makes concurrent first accesses import the module only once
+      module = importlib.import_module(self.__dict__['_name'])
+      # Later lookups find the attributes directly instead of going through __getattr__
+      self.__dict__.update(vars(module))
+      self.__dict__['_module'] = module
+    return module
+
+  def isLoaded(self):
+    return self.__dict__['_module'] is not None
+
+  def __getattr__(self, attr):
+    return getattr(self.load(), attr)
+
+  def __setattr__(self, attr, value):
+    setattr(self.load(), attr, value)
+    self.__dict__[attr] = value
+
+  def __repr__(self):
+    state = 'loaded' if self.isLoaded() else 'not loaded'
+    return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+_lazyModules = {}
+_lock = threading.Lock()
+
+
+def lazyImport(name):
+  """The module itself if it is already imported, a shared LazyModule otherwise"""
+  module = sys.modules.get(name)
+  if module is not None:
+    return module
+
+  with _lock:
+    module = _lazyModules.get(name)
+    if module is None:
+      module = LazyModule(name)
+      _lazyModules[name] = module
+    return module
+
+
+class Service:
+  """Generated modules of a gRPC service, imported when first used"""
+
+  def __init__(self, name, pb2Name, grpcName, stubName):
+    self.name = name
+    self.pb2Name = pb2Name
+    self.grpcName = grpcName
+    self.stubName = stubName
+
+  @property
+  def pb2(self):
+    return lazyImport(self.pb2Name)
+
+  @property
+  def grpc(self):
+    return lazyImport(self.grpcName)
+
+  def getStub(self, channel):
+    return getattr(self.grpc, self.stubName)(channel)
+
+  def isLoaded(self):
+    return self.pb2Name in sys.modules
+
+  def __repr__(self):
+    return f'Service({self.name}, {self.pb2Name}, {self.grpcName}.{self.stubName})'
+
+
+_services = {}
+
+
+def getAliases(name):
+  # 'gsdk.connect_master.ConnectMaster' is also found as 'ConnectMaster' and 'connect_master'
+  package, service = name.rsplit('.', 1)
+  return [name, service, package.rsplit('.', 1)[-1]]
+
+
+def getService(name):
+  """
+  Service by full name ('gsdk.user.User'), service name ('User') or proto package ('user'),
+  looked up in the precomputed index without importing any generated module.
+  """
+  with _lock:
+    if len(_services) == 0:
+      for fullName, modules in SERVICES.items():
+        service = Service(fullName, *modules)
+        for alias in getAliases(fullName):
+          _services.setdefault(alias, service)
+
+  service = _services.get(name)
+  if service is None:
+    raise KeyError(f'Unknown service: {name}')
+  return service
+
+
+def getServiceNames():
+  return sorted(SERVICES.keys())
+
+
+def getStub(name, channel):
+  return getService(name).getStub(channel)
+
+
+def buildIndex(serviceDir=SERVICE_DIR):
+  """{service: (pb2 module, grpc module, stub class)} of the *_pb2_grpc.py files, found without importing them"""
+  services = {}
+  for fileName in sorted(os.listdir(serviceDir)):
+    if not fileName.endswith('_pb2_grpc.py'):
+      continue
+
+    with open(os.path.join(serviceDir, fileName)) as f:
+      source = f.read()
+
+    stub = STUB_PATTERN.search(source)
+    method = METHOD_PATTERN.search(source)
+    if stub is None or method is None:
+      continue
+
+    grpcName = fileName[:-len('.py')]
+    services[method.group(1)] = (grpcName[:-len('_grpc')], grpcName, stub.group(1) + 'Stub')
+  return services
+
+
+def writeIndex(services, indexFile=INDEX_FILE):
+  with open(indexFile, 'w') as f:
+    f.write("# Generated by 'python -m example.registry.registry --build' from biostar/service. Do not edit.\n\n")
+    f.write('SERVICES = ')
+    f.write(pprint.pformat(services, indent=2, width=120))
+    f.write('\n')
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Index of the G-SDK services and their generated modules')
+  parser.add_argument('--build', action='store_true', help='rebuild index.py after regenerating biostar/service')
+  parser.add_argument('--check', action='store_true', help='exit with 1 if index.py is out of date')
+  args = parser.parse_args()
+
+  services = buildIndex()
+  if args.build:
+    writeIndex(services)
+    print(f'{len(services)} services written to {INDEX_FILE}')
+  elif args.check:
+    if services != SERVICES:
+      print(f'{INDEX_FILE} is out of date, run with --build')
+      sys.exit(1)
+    print(f'{len(services)} services up to date')
+  else:
+    for name in getServiceNames():
+      print(getService(name))
@@ -1,7 +1,9 @@
 import grpc
 
-import rs485_pb2_grpc
-import rs485_pb2
+from example.registry.registry import lazyImport
+
+rs485_pb2_grpc = lazyImport('rs485_pb2_grpc')
+rs485_pb2 = lazyImport('rs485_pb2')
 
 
 class RS485Svc:
@@ -29,6 +31,14 @@ class RS485Svc:
       print(f'Cannot set the rs485 config: {e}')
       raise
 
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(rs485_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the rs485 config multi: {e}')
+      raise
+
   def searchSlave(self, deviceID):
     try:
       response = self.stub.SearchDevice(rs485_pb2.SearchDeviceRequest(deviceID=deviceID))
@@ -1,7 +1,9 @@
 import grpc
 
-import rtsp_pb2_grpc
-import rtsp_pb2
+from example.registry.registry import lazyImport
+
+rtsp_pb2_grpc = lazyImport('rtsp_pb2_grpc')
+rtsp_pb2 = lazyImport('rtsp_pb2')
 
 
 class RtspSvc:
@@ -28,3 +30,11 @@ class RtspSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the rtsp config: {e}')
       raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(rtsp_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the rtsp config multi: {e}')
+      raise
@@ -1,7 +1,9 @@
 import grpc
 
-import schedule_pb2_grpc
-import schedule_pb2
+from example.registry.registry import lazyImport
+
+schedule_pb2_grpc = lazyImport('schedule_pb2_grpc')
+schedule_pb2 = lazyImport('schedule_pb2')
 
 
 class ScheduleSvc:
@@ -29,6 +31,14 @@ class ScheduleSvc:
       print(f'Cannot add schedules: {e}')
       raise
 
+  def addMulti(self, deviceIDs, schedules):
+    try:
+      response = self.stub.AddMulti(schedule_pb2.AddMultiRequest(deviceIDs=deviceIDs, schedules=schedules))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot add schedules multi: {e}')
+      raise
+
   def delete(self, deviceID, scheduleIDs):
     try:
       self.stub.Delete(schedule_pb2.DeleteRequest(deviceID=deviceID, scheduleIDs=scheduleIDs))
@@ -36,6 +46,14 @@ class ScheduleSvc:
       print(f'Cannot delete schedules: {e}')
       raise
 
+  def deleteMulti(self, deviceIDs, scheduleIDs):
+    try:
+      response = self.stub.DeleteMulti(schedule_pb2.DeleteMultiRequest(deviceIDs=deviceIDs, scheduleIDs=scheduleIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete schedules multi: {e}')
+      raise
+
   def deleteAll(self, deviceID):
     try:
       self.stub.DeleteAll(schedule_pb2.DeleteAllRequest(deviceID=deviceID))
@@ -43,6 +61,14 @@ class ScheduleSvc:
       print(f'Cannot delete all the schedules: {e}')
       raise
 
+  def deleteAllMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllMulti(schedule_pb2.DeleteAllMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all the schedules multi: {e}')
+      raise
+
   def getHolidayList(self, deviceID):
     try:
       response = self.stub.GetHolidayList(schedule_pb2.GetHolidayListRequest(deviceID=deviceID))
@@ -58,6 +84,14 @@ class ScheduleSvc:
       print(f'Cannot add holiday groups: {e}')
       raise
 
+  def addHolidayMulti(self, deviceIDs, groups):
+    try:
+      response = self.stub.AddHolidayMulti(schedule_pb2.AddHolidayMultiRequest(deviceIDs=deviceIDs, groups=groups))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot add holiday groups multi: {e}')
+      raise
+
   def deleteHoliday(self, deviceID, groupIDs):
     try:
       self.stub.DeleteHoliday(schedule_pb2.DeleteHolidayRequest(deviceID=deviceID, groupIDs=groupIDs))
@@ -65,6 +99,14 @@ class ScheduleSvc:
       print(f'Cannot delete holiday groups: {e}')
       raise
 
+  def deleteHolidayMulti(self, deviceIDs, groupIDs):
+    try:
+      response = self.stub.DeleteHolidayMulti(schedule_pb2.DeleteHolidayMultiRequest(deviceIDs=deviceIDs, groupIDs=groupIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete holiday groups multi: {e}')
+      raise
+
   def deleteAllHoliday(self, deviceID):
     try:
       self.stub.DeleteAllHoliday(schedule_pb2.DeleteAllHolidayRequest(deviceID=deviceID))
@@ -72,3 +114,11 @@ class ScheduleSvc:
       print(f'Cannot delete all the holiday groups: {e}')
       raise
 
+  def deleteAllHolidayMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllHolidayMulti(schedule_pb2.DeleteAllHolidayMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all the holiday groups multi: {e}')
+      raise
+
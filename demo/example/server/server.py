@@ -2,8 +2,10 @@ import grpc
 import json
 import sys
 
-import server_pb2_grpc
-import server_pb2
+from example.registry.registry import lazyImport
+
+server_pb2_grpc = lazyImport('server_pb2_grpc')
+server_pb2 = lazyImport('server_pb2')
 
 
 class ServerSvc:
@@ -0,0 +1,149 @@
+import argparse
+import grpc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from contextlib import redirect_stdout
+
+from example.connect.connect import ConnectSvc
+from example.event.event import EventSvc
+from example.user.user import UserSvc
+from example.sync.config import TestConfig
+from example.sync.device import DeviceMgr
+from example.sync.event import EventMgr
+from example.sync.user import UserMgr
+
+from example.simulator.gateway import SimGateway, EventReplayer
+
+FIRST_DEVICE_ID = 540000001
+CONNECT_TIMEOUT = 10
+DRAIN_TIMEOUT = 10
+
+
+def writeSyncConfig(deviceIDs):
+  devInfos = [{'device_id': devID, 'ip_addr': '127.0.0.1', 'port': 51211, 'use_ssl': False, 'last_event_id': 0} for devID in deviceIDs]
+  configData = {'enroll_device': devInfos[0], 'devices': devInfos[1:]}
+
+  fd, configFile = tempfile.mkstemp(prefix='sync_bench_', suffix='.json')
+  with os.fdopen(fd, 'w') as f:
+    f.write(json.dumps(configData, indent='\t'))
+  return configFile
+
+
+def percentile(values, ratio):
+  if len(values) == 0:
+    return 0.0
+  values = sorted(values)
+  return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def waitFor(condition, timeout):
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    if condition():
+      return True
+    time.sleep(0.05)
+  return False
+
+
+def runBenchmark(numOfDevice=10, rate=1000, duration=10, churnInterval=0, handler='sync', recordFile=None, quiet=True):
+  """
+  Runs the sync example (DeviceMgr, EventMgr, UserMgr) against a SimGateway and returns
+  {published, handled, dropped, eventsPerSec, latency p50/p95/p99/max in ms}.
+  handler: 'sync' = UserMgr.syncUser, 'print' = EventMgr.printEvent, 'none' = measure only
+  """
+  deviceIDs = [FIRST_DEVICE_ID + i for i in range(numOfDevice)]
+  gateway = SimGateway(deviceIDs)
+  gateway.start()
+  channel = grpc.insecure_channel(gateway.getAddress())
+  configFile = writeSyncConfig(deviceIDs)
+
+  latencies = []
+  handled = [0]
+  lock = threading.Lock()
+
+  out = open(os.devnull, 'w') if quiet else sys.stdout
+  try:
+    with redirect_stdout(out):
+      connectSvc = ConnectSvc(channel)
+      eventSvc = EventSvc(channel)
+      userSvc = UserSvc(channel)
+      testConfig = TestConfig(configFile)
+
+      deviceMgr = DeviceMgr(connectSvc, testConfig)
+      eventMgr = EventMgr(eventSvc, testConfig)
+      userMgr = UserMgr(userSvc, None, testConfig, deviceMgr, eventMgr)
+
+      callbacks = {'sync': userMgr.syncUser, 'print': eventMgr.printEvent, 'none': None}
+      callback = callbacks[handler]
+
+      def onEvent(event):
+        if callback is not None:
+          callback(event)
+        publishTime = gateway.publishTimes.pop((event.deviceID, event.ID), None)
+        with lock:
+          handled[0] += 1
+          if publishTime is not None:
+            latencies.append(time.monotonic() - publishTime)
+
+      deviceMgr.handleConnection(eventMgr.handleConnection)
+      eventMgr.handleEvent(onEvent)
+      # The status stream is registered when its thread starts reading. Devices connected before that are missed.
+      waitFor(lambda: len(gateway.statusSubscribers) > 0, CONNECT_TIMEOUT)
+      deviceMgr.connectToDevices()
+
+      if not waitFor(lambda: all(dev.monitoring for dev in gateway.devices.values()), CONNECT_TIMEOUT):
+        print('Not all devices are monitored', file=sys.stderr)
+
+      replayer = EventReplayer(gateway, rate, recordFile=recordFile, churnInterval=churnInterval)
+      startTime = time.monotonic()
+      replayer.start(count=int(rate * duration))
+      replayer.wait()
+      replayer.stop()
+
+      waitFor(lambda: handled[0] + gateway.getDroppedEvents() >= gateway.published, DRAIN_TIMEOUT)
+      elapsed = time.monotonic() - startTime
+
+      eventMgr.eventCh.cancel()
+      deviceMgr.statusCh.cancel()
+      userMgr.stop()
+      testConfig.flush()
+  finally:
+    channel.close()
+    gateway.stop(None)
+    os.remove(configFile)
+    if quiet:
+      out.close()
+
+  with lock:
+    return {
+      'published': gateway.published,
+      'handled': handled[0],
+      'dropped': max(0, gateway.published - handled[0]),
+      'droppedByGateway': gateway.getDroppedEvents(),
+      'eventsPerSec': handled[0] / elapsed if elapsed > 0 else 0.0,
+      'latencyMs': {
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p95': percentile(latencies, 0.95) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'max': max(latencies) * 1000 if latencies else 0.0,
+      },
+    }
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark the sync example against a simulated gateway')
+  parser.add_argument('--devices', type=int, default=10)
+  parser.add_argument('--rate', type=float, default=1000, help='events/sec over all devices')
+  parser.add_argument('--duration', type=float, default=10, help='seconds')
+  parser.add_argument('--churn', type=float, default=0, help='disconnect a random device every N seconds')
+  parser.add_argument('--handler', choices=['sync', 'print', 'none'], default='sync')
+  parser.add_argument('--record', default=None, help='JSON lines file of EventLog messages to replay')
+  args = parser.parse_args()
+
+  result = runBenchmark(args.devices, args.rate, args.duration, args.churn, args.handler, args.record)
+  print(json.dumps(result, indent=2))
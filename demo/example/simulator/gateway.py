@@ -0,0 +1,525 @@
+import grpc
+import json
+import queue
+import random
+import threading
+import time
+
+from concurrent import futures
+
+from google.protobuf import any_pb2
+from google.protobuf import json_format
+from google.rpc import code_pb2, status_pb2
+from grpc_status import rpc_status
+
+import auth_pb2
+import auth_pb2_grpc
+import connect_pb2
+import connect_pb2_grpc
+import device_pb2
+import device_pb2_grpc
+import err_pb2
+import event_pb2
+import event_pb2_grpc
+import user_pb2
+import user_pb2_grpc
+
+BS2_EVENT_USER_ENROLL_SUCCESS = 0x2000
+BS2_EVENT_USER_UPDATE_SUCCESS = 0x2200
+BS2_EVENT_USER_DELETE_SUCCESS = 0x2400
+BS2_EVENT_VERIFY_SUCCESS = 0x1000
+
+DEFAULT_QUEUE_SIZE = 16
+POLL_INTERVAL = 0.2
+
+SIM_MAX_USERS = 500000
+SIM_MAX_EVENT_LOGS = 1000000
+
+# Error code used in MultiErrorResponse for devices the simulator does not know
+ERR_NOT_CONNECTED = -100
+# Error code of an injected firmware upgrade failure
+ERR_UPGRADE_FAILED = -101
+
+
+class SimDeviceError(Exception):
+  def __init__(self, code, msg):
+    super().__init__(msg)
+    self.code = code
+    self.msg = msg
+
+
+class SimDevice:
+  deviceID = 0
+  connected = False
+  monitoring = False
+  nextEventID = 1
+  firmwareVersion = '1.0.0'
+  upgradeCount = 0
+
+  def __init__(self, deviceID):
+    self.deviceID = deviceID
+    self.logs = []
+    self.users = {}
+    self.authConfig = auth_pb2.AuthConfig()
+
+
+class Subscriber:
+  def __init__(self, queueSize, deviceIDs=None, eventCodes=None):
+    self.queue = queue.Queue(queueSize)
+    self.deviceIDs = set(deviceIDs or [])
+    self.eventCodes = set(eventCodes or [])
+    self.dropped = 0
+
+  def accepts(self, event):
+    if self.deviceIDs and event.deviceID not in self.deviceIDs:
+      return False
+    if self.eventCodes and event.eventCode not in self.eventCodes:
+      return False
+    return True
+
+  def offer(self, item):
+    # Like the gateway, a subscriber that does not keep up loses events
+    try:
+      self.queue.put_nowait(item)
+    except queue.Full:
+      self.dropped += 1
+
+
+class SimGateway:
+  """
+  In-process stand-in for a G-SDK gateway with simulated devices.
+
+  Serves Event (SubscribeRealtimeLog, GetLog, GetLogWithFilter, Enable/DisableMonitoring),
+  Connect (SubscribeStatus, Add/DeleteAsyncConnection, GetDeviceList), the User
+  Get/Enroll/Update/Delete(Multi), the Device GetInfo/GetCapability(Info)/UpgradeFirmware(Multi)
+  and the Auth Get/SetConfig(Multi) RPCs from the generated *_pb2_grpc servicers, over an
+  insecure local port. Events are generated with addEvent() or an EventReplayer.
+
+  A firmware upgrade takes upgradeDelay seconds per request, and upgradeFailures
+  ({deviceID: count}) makes the next count upgrades of a device fail.
+  """
+
+  server = None
+  port = 0
+
+  def __init__(self, deviceIDs=()):
+    self.lock = threading.RLock()
+    self.devices = {}
+    self.eventSubscribers = []
+    self.statusSubscribers = []
+
+    # (deviceID, eventID) -> time.monotonic() when published, for latency measurements
+    self.publishTimes = {}
+    self.published = 0
+    self.droppedEvents = 0
+
+    self.upgradeDelay = 0.0
+    self.upgradeFailures = {}
+    self.firmwareSizes = []
+    # deviceIDs of every SetConfig(Multi) request
+    self.configWrites = []
+
+    for deviceID in deviceIDs:
+      self.devices[deviceID] = SimDevice(deviceID)
+
+  def start(self, port=0, maxWorkers=32):
+    self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=maxWorkers))
+    event_pb2_grpc.add_EventServicer_to_server(EventServicer(self), self.server)
+    connect_pb2_grpc.add_ConnectServicer_to_server(ConnectServicer(self), self.server)
+    user_pb2_grpc.add_UserServicer_to_server(UserServicer(self), self.server)
+    device_pb2_grpc.add_DeviceServicer_to_server(DeviceServicer(self), self.server)
+    auth_pb2_grpc.add_AuthServicer_to_server(AuthServicer(self), self.server)
+    self.port = self.server.add_insecure_port(f'127.0.0.1:{port}')
+    self.server.start()
+    return self.port
+
+  def stop(self, grace=None):
+    if self.server is not None:
+      self.server.stop(grace)
+
+  def getAddress(self):
+    return f'127.0.0.1:{self.port}'
+
+  def getDevice(self, deviceID):
+    with self.lock:
+      device = self.devices.get(deviceID)
+      if device is None:
+        device = SimDevice(deviceID)
+        self.devices[deviceID] = device
+      return device
+
+  def getDroppedEvents(self):
+    with self.lock:
+      return self.droppedEvents + sum(sub.dropped for sub in self.eventSubscribers)
+
+  # --- Device side ---
+
+  def addEvent(self, deviceID, eventCode, subCode=0, userID=''):
+    with self.lock:
+      device = self.getDevice(deviceID)
+      event = event_pb2.EventLog(ID=device.nextEventID, timestamp=int(time.time()), deviceID=deviceID, userID=userID, eventCode=eventCode, subCode=subCode)
+      device.nextEventID += 1
+      device.logs.append(event)
+
+      if device.connected and device.monitoring:
+        self.published += 1
+        self.publishTimes[(deviceID, event.ID)] = time.monotonic()
+        for sub in self.eventSubscribers:
+          if sub.accepts(event):
+            sub.offer(event)
+      return event
+
+  def setConnected(self, deviceID, connected):
+    with self.lock:
+      device = self.getDevice(deviceID)
+      if device.connected == connected:
+        return
+      device.connected = connected
+      if not connected:
+        device.monitoring = False
+
+      status = connect_pb2.StatusChange(deviceID=deviceID, status=connect_pb2.TCP_CONNECTED if connected else connect_pb2.DISCONNECTED, timestamp=int(time.time()))
+      for sub in self.statusSubscribers:
+        sub.offer(status)
+
+  def enrollUsers(self, deviceID, users, event=True):
+    with self.lock:
+      device = self.getDevice(deviceID)
+      for user in users:
+        exists = user.hdr.ID in device.users
+        device.users[user.hdr.ID] = user
+        if event:
+          self.addEvent(deviceID, BS2_EVENT_USER_UPDATE_SUCCESS if exists else BS2_EVENT_USER_ENROLL_SUCCESS, userID=user.hdr.ID)
+
+  def deleteUsers(self, deviceID, userIDs, event=True):
+    with self.lock:
+      device = self.getDevice(deviceID)
+      for userID in userIDs:
+        if device.users.pop(userID, None) is not None and event:
+          self.addEvent(deviceID, BS2_EVENT_USER_DELETE_SUCCESS, userID=userID)
+
+  # --- Streams ---
+
+  def stream(self, sub, subscribers, context):
+    with self.lock:
+      subscribers.append(sub)
+    try:
+      while context.is_active():
+        try:
+          yield sub.queue.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+          pass
+    finally:
+      with self.lock:
+        subscribers.remove(sub)
+        if subscribers is self.eventSubscribers:
+          self.droppedEvents += sub.dropped
+
+  def upgradeFirmware(self, device, firmwareData):
+    # Called with the lock held
+    remaining = self.upgradeFailures.get(device.deviceID, 0)
+    if remaining > 0:
+      self.upgradeFailures[device.deviceID] = remaining - 1
+      raise SimDeviceError(ERR_UPGRADE_FAILED, 'upgrade failed')
+
+    device.upgradeCount += 1
+    device.firmwareVersion = f'1.0.{device.upgradeCount}'
+
+  def abortMulti(self, context, deviceErrors):
+    # Same error shape as the gateway: INTERNAL with a MultiErrorResponse detail
+    multiError = err_pb2.MultiErrorResponse(deviceErrors=deviceErrors)
+    detail = any_pb2.Any()
+    detail.Pack(multiError)
+    context.abort_with_status(rpc_status.to_status(status_pb2.Status(code=code_pb2.INTERNAL, message='multi error', details=[detail])))
+
+  def checkConnected(self, context, deviceID):
+    with self.lock:
+      device = self.devices.get(deviceID)
+      if device is None or not device.connected:
+        context.abort(grpc.StatusCode.UNAVAILABLE, f'device {deviceID} is not connected')
+      return device
+
+  def forEachConnected(self, context, deviceIDs, action):
+    deviceErrors = []
+    with self.lock:
+      for deviceID in deviceIDs:
+        device = self.devices.get(deviceID)
+        if device is None or not device.connected:
+          deviceErrors.append(err_pb2.ErrorResponse(deviceID=deviceID, code=ERR_NOT_CONNECTED, msg='not connected'))
+          continue
+        try:
+          action(device)
+        except SimDeviceError as e:
+          deviceErrors.append(err_pb2.ErrorResponse(deviceID=deviceID, code=e.code, msg=e.msg))
+    if len(deviceErrors) > 0:
+      self.abortMulti(context, deviceErrors)
+
+
+class EventServicer(event_pb2_grpc.EventServicer):
+  def __init__(self, gateway):
+    self.gateway = gateway
+
+  def SubscribeRealtimeLog(self, request, context):
+    sub = Subscriber(request.queueSize or DEFAULT_QUEUE_SIZE, request.deviceIDs, request.eventCodes)
+    return self.gateway.stream(sub, self.gateway.eventSubscribers, context)
+
+  def EnableMonitoring(self, request, context):
+    self.gateway.checkConnected(context, request.deviceID).monitoring = True
+    return event_pb2.EnableMonitoringResponse()
+
+  def DisableMonitoring(self, request, context):
+    self.gateway.checkConnected(context, request.deviceID).monitoring = False
+    return event_pb2.DisableMonitoringResponse()
+
+  def readLog(self, context, request, match):
+    device = self.gateway.checkConnected(context, request.deviceID)
+    with self.gateway.lock:
+      # Event IDs are dense and start at 1, so the start index is direct
+      start = max(0, request.startEventID - 1)
+      events = []
+      for event in device.logs[start:]:
+        if match(event):
+          events.append(event)
+          if len(events) >= request.maxNumOfLog:
+            break
+      return events
+
+  def GetLog(self, request, context):
+    return event_pb2.GetLogResponse(events=self.readLog(context, request, lambda event: True))
+
+  def GetLogWithFilter(self, request, context):
+    def match(event):
+      for f in request.filters:
+        if f.userID and f.userID != event.userID:
+          continue
+        if f.eventCode and f.eventCode != event.eventCode:
+          continue
+        if f.startTime and event.timestamp < f.startTime:
+          continue
+        if f.endTime and event.timestamp > f.endTime:
+          continue
+        return True
+      return len(request.filters) == 0
+
+    return event_pb2.GetLogWithFilterResponse(events=self.readLog(context, request, match))
+
+
+class ConnectServicer(connect_pb2_grpc.ConnectServicer):
+  def __init__(self, gateway):
+    self.gateway = gateway
+
+  def SubscribeStatus(self, request, context):
+    # Status changes are rare and must not be lost, so this queue is unbounded
+    sub = Subscriber(0)
+    return self.gateway.stream(sub, self.gateway.statusSubscribers, context)
+
+  def AddAsyncConnection(self, request, context):
+    for connInfo in request.connectInfos:
+      self.gateway.setConnected(connInfo.deviceID, True)
+    return connect_pb2.AddAsyncConnectionResponse()
+
+  def DeleteAsyncConnection(self, request, context):
+    for deviceID in request.deviceIDs:
+      self.gateway.setConnected(deviceID, False)
+    return connect_pb2.DeleteAsyncConnectionResponse()
+
+  def GetDeviceList(self, request, context):
+    with self.gateway.lock:
+      devInfos = [connect_pb2.DeviceInfo(deviceID=dev.deviceID, status=connect_pb2.TCP_CONNECTED if dev.connected else connect_pb2.DISCONNECTED) for dev in self.gateway.devices.values()]
+    return connect_pb2.GetDeviceListResponse(deviceInfos=devInfos)
+
+
+class UserServicer(user_pb2_grpc.UserServicer):
+  def __init__(self, gateway):
+    self.gateway = gateway
+
+  def GetList(self, request, context):
+    device = self.gateway.checkConnected(context, request.deviceID)
+    with self.gateway.lock:
+      return user_pb2.GetListResponse(hdrs=[user.hdr for user in device.users.values()])
+
+  def Get(self, request, context):
+    device = self.gateway.checkConnected(context, request.deviceID)
+    with self.gateway.lock:
+      return user_pb2.GetResponse(users=[device.users[userID] for userID in request.userIDs if userID in device.users])
+
+  def Enroll(self, request, context):
+    self.gateway.checkConnected(context, request.deviceID)
+    self.gateway.enrollUsers(request.deviceID, request.users)
+    return user_pb2.EnrollResponse()
+
+  def EnrollMulti(self, request, context):
+    self.gateway.forEachConnected(context, request.deviceIDs, lambda device: self.gateway.enrollUsers(device.deviceID, request.users))
+    return user_pb2.EnrollMultiResponse()
+
+  def Update(self, request, context):
+    self.gateway.checkConnected(context, request.deviceID)
+    self.gateway.enrollUsers(request.deviceID, request.users)
+    return user_pb2.UpdateResponse()
+
+  def UpdateMulti(self, request, context):
+    self.gateway.forEachConnected(context, request.deviceIDs, lambda device: self.gateway.enrollUsers(device.deviceID, request.users))
+    return user_pb2.UpdateMultiResponse()
+
+  def Delete(self, request, context):
+    self.gateway.checkConnected(context, request.deviceID)
+    self.gateway.deleteUsers(request.deviceID, request.userIDs)
+    return user_pb2.DeleteResponse()
+
+  def DeleteMulti(self, request, context):
+    self.gateway.forEachConnected(context, request.deviceIDs, lambda device: self.gateway.deleteUsers(device.deviceID, request.userIDs))
+    return user_pb2.DeleteMultiResponse()
+
+
+class DeviceServicer(device_pb2_grpc.DeviceServicer):
+  def __init__(self, gateway):
+    self.gateway = gateway
+
+  def GetInfo(self, request, context):
+    device = self.gateway.checkConnected(context, request.deviceID)
+    return device_pb2.GetInfoResponse(info=device_pb2.FactoryInfo(modelName='SIM', firmwareVersion=device.firmwareVersion))
+
+  def GetCapability(self, request, context):
+    self.gateway.checkConnected(context, request.deviceID)
+    capability = device_pb2.DeviceCapability(maxUsers=SIM_MAX_USERS, maxEventLogs=SIM_MAX_EVENT_LOGS, cardInputSupported=True, fingerprintInputSupported=True)
+    return device_pb2.GetCapabilityResponse(deviceCapability=capability)
+
+  def GetCapabilityInfo(self, request, context):
+    self.gateway.checkConnected(context, request.deviceID)
+    capInfo = device_pb2.CapabilityInfo(maxNumOfUser=SIM_MAX_USERS, PINSupported=True, cardSupported=True, fingerSupported=True)
+    return device_pb2.GetCapabilityInfoResponse(capInfo=capInfo)
+
+  def UpgradeFirmware(self, request, context):
+    self.receiveFirmware(request)
+    device = self.gateway.checkConnected(context, request.deviceID)
+    try:
+      with self.gateway.lock:
+        self.gateway.upgradeFirmware(device, request.firmwareData)
+    except SimDeviceError as e:
+      context.abort(grpc.StatusCode.INTERNAL, e.msg)
+    return device_pb2.UpgradeFirmwareResponse()
+
+  def UpgradeFirmwareMulti(self, request, context):
+    self.receiveFirmware(request)
+    self.gateway.forEachConnected(context, request.deviceIDs, lambda device: self.gateway.upgradeFirmware(device, request.firmwareData))
+    return device_pb2.UpgradeFirmwareMultiResponse()
+
+  def receiveFirmware(self, request):
+    with self.gateway.lock:
+      self.gateway.firmwareSizes.append(len(request.firmwareData))
+    time.sleep(self.gateway.upgradeDelay)
+
+
+class AuthServicer(auth_pb2_grpc.AuthServicer):
+  def __init__(self, gateway):
+    self.gateway = gateway
+
+  def GetConfig(self, request, context):
+    device = self.gateway.checkConnected(context, request.deviceID)
+    return auth_pb2.GetConfigResponse(config=device.authConfig)
+
+  def SetConfig(self, request, context):
+    device = self.gateway.checkConnected(context, request.deviceID)
+    with self.gateway.lock:
+      self.gateway.configWrites.append([request.deviceID])
+      device.authConfig = auth_pb2.AuthConfig()
+      device.authConfig.CopyFrom(request.config)
+    return auth_pb2.SetConfigResponse()
+
+  def SetConfigMulti(self, request, context):
+    def setConfig(device):
+      device.authConfig = auth_pb2.AuthConfig()
+      device.authConfig.CopyFrom(request.config)
+
+    with self.gateway.lock:
+      self.gateway.configWrites.append(list(request.deviceIDs))
+    self.gateway.forEachConnected(context, request.deviceIDs, setConfig)
+    return auth_pb2.SetConfigMultiResponse()
+
+
+class EventReplayer:
+  """
+  Feeds a SimGateway with events at a fixed rate (events/sec over all devices).
+
+  Events come from a recording (a JSON lines file of EventLog messages, as written by
+  saveRecording()) or are synthetic. With churnInterval set, a random device is
+  disconnected every churnInterval seconds and reconnected churnDowntime seconds later.
+  """
+
+  def __init__(self, gateway, rate, recordFile=None, userEventRatio=0.1, churnInterval=0, churnDowntime=1.0, seed=None):
+    self.gateway = gateway
+    self.rate = rate
+    self.recordFile = recordFile
+    self.userEventRatio = userEventRatio
+    self.churnInterval = churnInterval
+    self.churnDowntime = churnDowntime
+    self.random = random.Random(seed)
+
+    self.stopEvent = threading.Event()
+    self.threads = []
+    self.generated = 0
+
+  def loadRecording(self):
+    with open(self.recordFile) as f:
+      for line in f:
+        if line.strip():
+          yield json_format.Parse(line, event_pb2.EventLog())
+
+  def syntheticEvents(self):
+    userSeq = 0
+    while True:
+      deviceID = self.random.choice(list(self.gateway.devices.keys()))
+      if self.random.random() < self.userEventRatio:
+        userSeq += 1
+        yield event_pb2.EventLog(deviceID=deviceID, eventCode=BS2_EVENT_USER_ENROLL_SUCCESS, userID=str(userSeq))
+      else:
+        yield event_pb2.EventLog(deviceID=deviceID, eventCode=BS2_EVENT_VERIFY_SUCCESS, subCode=self.random.randint(0, 10), userID=str(self.random.randint(1, 1000)))
+
+  def run(self, count):
+    events = self.loadRecording() if self.recordFile else self.syntheticEvents()
+    interval = 1.0 / self.rate
+    nextTime = time.monotonic()
+
+    for event in events:
+      if self.stopEvent.is_set() or (count and self.generated >= count):
+        break
+
+      if event.eventCode == BS2_EVENT_USER_ENROLL_SUCCESS and event.userID:
+        self.gateway.enrollUsers(event.deviceID, [user_pb2.UserInfo(hdr=user_pb2.UserHdr(ID=event.userID))])
+      else:
+        self.gateway.addEvent(event.deviceID, event.eventCode, event.subCode, event.userID)
+      self.generated += 1
+
+      nextTime += interval
+      delay = nextTime - time.monotonic()
+      if delay > 0:
+        time.sleep(delay)
+
+  def churn(self):
+    while not self.stopEvent.wait(self.churnInterval):
+      deviceID = self.random.choice(list(self.gateway.devices.keys()))
+      self.gateway.setConnected(deviceID, False)
+      if self.stopEvent.wait(self.churnDowntime):
+        break
+      self.gateway.setConnected(deviceID, True)
+
+  def start(self, count=0):
+    self.threads = [threading.Thread(target=self.run, args=(count,), daemon=True)]
+    if self.churnInterval > 0:
+      self.threads.append(threading.Thread(target=self.churn, daemon=True))
+    for thread in self.threads:
+      thread.start()
+
+  def wait(self):
+    self.threads[0].join()
+
+  def stop(self):
+    self.stopEvent.set()
+    for thread in self.threads:
+      thread.join()
+
+
+def saveRecording(events, recordFile):
+  with open(recordFile, 'w') as f:
+    for event in events:
+      f.write(json.dumps(json_format.MessageToDict(event)) + '\n')
@@ -1,7 +1,9 @@
 import grpc
 
-import status_pb2_grpc
-import status_pb2
+from example.registry.registry import lazyImport
+
+status_pb2_grpc = lazyImport('status_pb2_grpc')
+status_pb2 = lazyImport('status_pb2')
 
 
 class StatusSvc:
@@ -27,4 +29,12 @@ class StatusSvc:
       self.stub.SetConfig(status_pb2.SetConfigRequest(deviceID=deviceID, config=config))
     except grpc.RpcError as e:
       print(f'Cannot set the status config: {e}')
-      raise
\ No newline at end of file
+      raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(status_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the status config multi: {e}')
+      raise
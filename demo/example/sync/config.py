@@ -1,7 +1,15 @@
 import json
+import os
 import sys
+import tempfile
+import threading
 
-import connect_pb2
+from example.registry.registry import lazyImport
+
+connect_pb2 = lazyImport('connect_pb2')
+
+# updateLastEventID() is written to disk at most once per FLUSH_DELAY seconds
+FLUSH_DELAY = 1.0
 
 def convertToAsyncInfo(devInfo):
   return connect_pb2.AsyncConnectInfo(deviceID=devInfo['device_id'], IPAddr=devInfo['ip_addr'], port=devInfo['port'], useSSL=devInfo['use_ssl'])
@@ -11,51 +19,105 @@ class TestConfig:
   configFile = None
 
   def __init__(self, configFile): 
+    self.devices = {}
+    self.lock = threading.RLock()
+    # Held from serializing to the rename, so an older snapshot never replaces a newer one
+    self.writeLock = threading.Lock()
+    self.dirty = False
+    self.flushTimer = None
+
     try:
       self.configFile = configFile
       with open(configFile) as f:
         self.configData = json.load(f)
+      self.buildIndex()
     except:
       e = sys.exc_info()[0]
       print(f'Cannot init the test config: {e}')    
 
+  def buildIndex(self):
+    self.devices = {self.configData['enroll_device']['device_id']: self.configData['enroll_device']}
+    for dev in self.configData['devices']:
+      self.devices.setdefault(dev['device_id'], dev)
+
   def write(self):
+    # Write to a temporary file in the same directory and rename it over the config,
+    # so a crash never leaves a truncated sync_config.json behind.
     try:
-      f = open(self.configFile, 'w')
-      f.write(json.dumps(self.configData, indent='\t'))
-      f.close()
+      with self.writeLock:
+        with self.lock:
+          data = json.dumps(self.configData, indent='\t')
+          self.dirty = False
+
+        dirName = os.path.dirname(os.path.abspath(self.configFile))
+        fd, tmpFile = tempfile.mkstemp(prefix='.sync_config.', dir=dirName)
+        try:
+          with os.fdopen(fd, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+          if os.path.exists(self.configFile):
+            os.chmod(tmpFile, os.stat(self.configFile).st_mode & 0o777)
+          os.replace(tmpFile, self.configFile)
+        except:
+          os.remove(tmpFile)
+          raise
     except:
       e = sys.exc_info()[0]
       print(f'Cannot write the test config: {e}')    
 
+  def flush(self):
+    with self.lock:
+      if self.flushTimer is not None:
+        self.flushTimer.cancel()
+        self.flushTimer = None
+      dirty = self.dirty
+
+    if dirty:
+      self.write()
+    else:
+      # A timer write may still be in progress; wait for it to reach the disk
+      with self.writeLock:
+        pass
+
+  def scheduleFlush(self):
+    with self.lock:
+      self.dirty = True
+      if self.flushTimer is None:
+        self.flushTimer = threading.Timer(FLUSH_DELAY, self.onFlushTimer)
+        self.flushTimer.daemon = True
+        self.flushTimer.start()
+
+  def onFlushTimer(self):
+    with self.lock:
+      self.flushTimer = None
+    self.write()
+
   def getConfigData(self):
     return self.configData
 
   def getDeviceInfo(self, deviceID):
-    if deviceID == self.configData['enroll_device']['device_id']:
-      return self.configData['enroll_device']
-    else:
-      for dev in self.configData['devices']:
-        if deviceID == dev['device_id']:
-          return dev
-
-    return None
+    return self.devices.get(deviceID)
 
   def updateLastEventID(self, deviceID, lastEventID):
-    updated = False
+    with self.lock:
+      dev = self.devices.get(deviceID)
+      if dev is None:
+        return
+      dev['last_event_id'] = lastEventID
 
-    if deviceID == self.configData['enroll_device']['device_id']:
-      self.configData['enroll_device']['last_event_id'] = lastEventID
-      updated = True
-    else:
-      for dev in self.configData['devices']:
-        if deviceID == dev['device_id']:
-          dev['last_event_id'] = lastEventID
-          updated = True
-          break
-    
-    if updated:
-      self.write()
+    # Coalesce the updates of all devices into one write; call flush() before exiting
+    self.scheduleFlush()
+
+  def updateLastRealtimeID(self, deviceID, lastRealtimeID):
+    # Highest event ID delivered in realtime, skipped by the backfill after a reconnect
+    with self.lock:
+      dev = self.devices.get(deviceID)
+      if dev is None or lastRealtimeID <= dev.get('last_realtime_id', 0):
+        return
+      dev['last_realtime_id'] = lastRealtimeID
+
+    self.scheduleFlush()
 
   def getAsyncConnectInfo(self):
     connInfos = []
@@ -66,12 +128,6 @@ class TestConfig:
     return connInfos
 
   def getTargetDeviceIDs(self, connectedIDs):
-    targetIDs = []
-
-    for devID in connectedIDs:
-      for dev in self.configData['devices']:
-        if devID != dev['device_id']:
-          targetIDs.append(dev['device_id'])
-          break
-
-    return targetIDs
+    # The connected devices of the configuration other than the enrollment device
+    enrollDeviceID = self.configData['enroll_device']['device_id']
+    return [devID for devID in connectedIDs if devID != enrollDeviceID and devID in self.devices]
@@ -1,21 +1,59 @@
 import grpc
 import threading
+import time
+
+from collections import deque
 
 import connect_pb2
 
 QUEUE_SIZE = 16
+MAX_STATUS_HISTORY = 32
+
+CONNECTED_STATUS = (connect_pb2.TCP_CONNECTED, connect_pb2.TLS_CONNECTED)
+
+class DeviceState:
+  status = connect_pb2.DISCONNECTED
+  connectTime = None
+
+  def __init__(self, deviceID):
+    self.deviceID = deviceID
+    self.history = deque(maxlen=MAX_STATUS_HISTORY)
+
+  def update(self, status, timestamp):
+    if status in CONNECTED_STATUS and self.status not in CONNECTED_STATUS:
+      self.connectTime = timestamp
+    elif status not in CONNECTED_STATUS:
+      self.connectTime = None
+
+    self.status = status
+    self.history.append((timestamp, status))
+
 
 class DeviceMgr:
+  """
+  Keeps a registry of the device connections, updated incrementally from the status stream.
+
+  The registry is written only under the lock. Every change publishes new immutable snapshots
+  (connectedIDs, connectedSet, connectedTargets), so readers such as UserMgr just read an
+  attribute and never wait for the status thread or call GetDeviceList.
+  """
+
   connectSvc = None
   testConfig = None
-  connectedIDs = []
+
+  connectedIDs = ()
+  connectedSet = frozenset()
+  connectedTargets = ()
 
   statusCh = None
 
-  def __init__(self, connectSvc, testConfig): 
+  def __init__(self, connectSvc, testConfig):
     self.connectSvc = connectSvc
     self.testConfig = testConfig
 
+    self.lock = threading.Lock()
+    self.devices = {}
+
   def connectToDevices(self):
     connInfos = self.testConfig.getAsyncConnectInfo()
     try:
@@ -26,16 +64,66 @@ class DeviceMgr:
   def getConnectedDevices(self, refreshList):
     try:
       if refreshList:
-        devInfos = self.connectSvc.getDeviceList()
-        self.connectedIDs.clear()        
-
-        for dev in devInfos:
-          if dev.status == connect_pb2.TCP_CONNECTED or dev.status == connect_pb2.TLS_CONNECTED:
-            self.connectedIDs.append(dev.deviceID)        
+        self.refresh()
 
-      return self.connectedIDs
+      return list(self.connectedIDs)
     except grpc.RpcError as e:
-      print(f'Cannot get the connected devices: {e}')      
+      print(f'Cannot get the connected devices: {e}')
+
+  def refresh(self):
+    # Rebuilds the registry from GetDeviceList. Only needed for devices connected before handleConnection().
+    devInfos = self.connectSvc.getDeviceList()
+
+    with self.lock:
+      timestamp = time.time()
+      statuses = {dev.deviceID: dev.status for dev in devInfos}
+      for deviceID in set(self.devices) | set(statuses):
+        status = statuses.get(deviceID, connect_pb2.DISCONNECTED)
+        state = self.getState(deviceID)
+        if state.status != status:
+          state.update(status, timestamp)
+      self.publish()
+
+  def isConnected(self, deviceID):
+    return deviceID in self.connectedSet
+
+  def getConnectedTargets(self):
+    """Connected devices to synchronize, i.e. testConfig.getTargetDeviceIDs() of the connected ones"""
+    return list(self.connectedTargets)
+
+  def getConnectTime(self, deviceID):
+    state = self.devices.get(deviceID)
+    return None if state is None else state.connectTime
+
+  def getStatusHistory(self, deviceID):
+    """[(timestamp, connect_pb2.Status)] of the last MAX_STATUS_HISTORY status changes"""
+    with self.lock:
+      state = self.devices.get(deviceID)
+      return [] if state is None else list(state.history)
+
+  def getState(self, deviceID):
+    state = self.devices.get(deviceID)
+    if state is None:
+      state = DeviceState(deviceID)
+      self.devices[deviceID] = state
+    return state
+
+  def publish(self):
+    # Called with the lock held. Keeps the connection order of the devices.
+    connected = sorted((state for state in self.devices.values() if state.status in CONNECTED_STATUS), key=lambda state: state.connectTime)
+    connectedIDs = tuple(state.deviceID for state in connected)
+
+    self.connectedTargets = tuple(self.testConfig.getTargetDeviceIDs(connectedIDs))
+    self.connectedSet = frozenset(connectedIDs)
+    self.connectedIDs = connectedIDs
+
+  def updateStatus(self, deviceID, status):
+    with self.lock:
+      state = self.getState(deviceID)
+      wasConnected = state.status in CONNECTED_STATUS
+      state.update(status, time.time())
+      if wasConnected != (status in CONNECTED_STATUS):
+        self.publish()
 
   def handleConnection(self, callback):
     try:
@@ -43,40 +131,35 @@ class DeviceMgr:
       statusThread = threading.Thread(target=self.receiveStatus, args=(callback,))
       statusThread.start()
     except grpc.RpcError as e:
-      print(f'Cannot subscribe to the device status channel: {e}')   
+      print(f'Cannot subscribe to the device status channel: {e}')
 
   def deleteConnection(self):
     try:
-      if len(self.connectedIDs) > 0:
-        self.connectSvc.deleteAsyncConnection(self.connectedIDs)
+      connectedIDs = list(self.connectedIDs)
+      if len(connectedIDs) > 0:
+        self.connectSvc.deleteAsyncConnection(connectedIDs)
     except grpc.RpcError as e:
-      print(f'Cannot delete async connection: {e}')   
-
-  def updateConnectedIDs(self, devID):
-    try:
-      self.connectedIDs.index(devID)
-    except ValueError:
-      self.connectedIDs.append(devID)
+      print(f'Cannot delete async connection: {e}')
 
   def receiveStatus(self, callback):
     try:
       for status in self.statusCh:
         if status.status == connect_pb2.DISCONNECTED:
           print(f'[DISCONNECTED] Device {status.deviceID}', flush=True)
-          self.connectedIDs.remove(status.deviceID)
+          self.updateStatus(status.deviceID, status.status)
         elif status.status == connect_pb2.TLS_CONNECTED:
           print(f'[TLS_CONNECTED] Device {status.deviceID}', flush=True)
-          self.updateConnectedIDs(status.deviceID)
+          self.updateStatus(status.deviceID, status.status)
           if not (callback is None):
             callback(status.deviceID)
         elif status.status == connect_pb2.TCP_CONNECTED:
           print(f'[TCP_CONNECTED] Device {status.deviceID}', flush=True)
-          self.updateConnectedIDs(status.deviceID)
+          self.updateStatus(status.deviceID, status.status)
           if not (callback is None):
             callback(status.deviceID)
-    
+
     except grpc.RpcError as e:
       if e.code() == grpc.StatusCode.CANCELLED:
-        print('Subscription is cancelled', flush=True)    
+        print('Subscription is cancelled', flush=True)
       else:
-        print(f'Cannot get the device status: {e}')   
+        print(f'Cannot get the device status: {e}')
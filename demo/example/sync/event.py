@@ -2,30 +2,105 @@ import grpc
 import threading
 import datetime
 
+from concurrent.futures import ThreadPoolExecutor
+
 QUEUE_SIZE = 16
 MAX_NUM_OF_LOG = 16384
 
+class LogReader:
+  """
+  Reads the new event logs of a device page by page.
+
+  pages() is a generator: the next page is fetched in the background while the caller
+  processes the current one, and the last event ID of a page is committed to the test
+  config only after the caller has finished with that page. A crash therefore replays at
+  most one page and never skips one.
+  """
+
+  eventSvc = None
+  testConfig = None
+
+  def __init__(self, eventSvc, testConfig, pageSize=MAX_NUM_OF_LOG):
+    self.eventSvc = eventSvc
+    self.testConfig = testConfig
+    self.pageSize = pageSize
+
+  def pages(self, devInfo, claimPage=None):
+    """
+    Yields lists of EventLog. claimPage is an optional callable taking a fetched page and
+    returning (events the caller takes, last event ID handled, stop); reading stops when stop
+    is true, which is used to hand over to realtime monitoring.
+    """
+    deviceID = devInfo['device_id']
+
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+      nextPage = prefetcher.submit(self.eventSvc.getLog, deviceID, devInfo['last_event_id'] + 1, self.pageSize)
+
+      while True:
+        page = nextPage.result()
+        isLastPage = len(page) < self.pageSize
+
+        events = page
+        lastID = page[len(page) - 1].ID if len(page) > 0 else None
+        if claimPage is not None and len(page) > 0:
+          events, lastID, stop = claimPage(page)
+          isLastPage = isLastPage or stop
+
+        if not isLastPage:
+          nextPage = prefetcher.submit(self.eventSvc.getLog, deviceID, page[len(page) - 1].ID + 1, self.pageSize)
+
+        if len(events) > 0:
+          yield events
+        if lastID is not None:
+          self.testConfig.updateLastEventID(deviceID, lastID)
+
+        if isLastPage:
+          break
+
+
 class EventMgr:
   eventSvc = None
   testConfig = None
+  logReader = None
 
   eventCh = None
+  subscription = None
   
-  def __init__(self, eventSvc, testConfig): 
+  def __init__(self, eventSvc, testConfig, logSink=None): 
     self.eventSvc = eventSvc
     self.testConfig = testConfig
-
-  def handleEvent(self, callback):
+    self.logReader = LogReader(eventSvc, testConfig)
+    self.logSink = logSink
+
+    # deviceID -> {'stopID': ID of the first realtime event received while the backfill is
+    # running, 'claimedID': last event ID taken by the backfill, 'realtimeIDs': IDs delivered
+    # in realtime while the backfill is running, 'realtimeMaxID': the highest of those,
+    # 'watermark': last_realtime_id of the previous sessions}
+    self.backfills = {}
+    # Devices whose backfill finished in this session. Their realtime events are persisted.
+    self.backfilled = set()
+    self.backfillLock = threading.Lock()
+
+  def handleEvent(self, callback, subscription=None):
+    # Set before subscribing, so every realtime event is handled knowing the filter
+    self.subscription = subscription
     try:
-      self.eventCh = self.eventSvc.subscribe(QUEUE_SIZE)
-      statusThread = threading.Thread(target=self.receiveEvent, args=(callback,))
+      if subscription is None:
+        self.eventCh = self.eventSvc.subscribe(QUEUE_SIZE)
+      else:
+        self.eventCh = subscription.subscribe(self.eventSvc, QUEUE_SIZE)
+      statusThread = threading.Thread(target=self.receiveEvent, args=(callback, subscription))
       statusThread.start()
     except grpc.RpcError as e:
       print(f'Cannot subscribe to the event monitoring channel: {e}')   
 
-  def receiveEvent(self, callback):
+  def receiveEvent(self, callback, subscription=None):
     try:
-      for event in self.eventCh:
+      eventCh = self.eventCh if subscription is None else subscription.receive(self.eventCh)
+      for event in eventCh:
+        if not self.acceptRealtimeEvent(event):
+          continue
+
         if not (callback is None):
           callback(event)
         else:
@@ -49,33 +124,108 @@ class EventMgr:
     except grpc.RpcError as e:
       print(f'Cannot read new events: {e}')         
 
+  def acceptRealtimeEvent(self, event):
+    with self.backfillLock:
+      backfill = self.backfills.get(event.deviceID)
+      if backfill is not None:
+        # Already taken by the backfill from a page read before this event arrived
+        if backfill['claimedID'] is not None and event.ID <= backfill['claimedID']:
+          return False
+        if self.subscription is None:
+          # Every later event comes in realtime, so the backfill can stop here
+          if backfill['stopID'] is None or event.ID < backfill['stopID']:
+            backfill['stopID'] = event.ID
+        else:
+          # Only the filtered events come in realtime: the backfill goes on and skips these
+          backfill['realtimeIDs'].add(event.ID)
+        backfill['realtimeMaxID'] = max(backfill['realtimeMaxID'], event.ID)
+        return True
+      persist = event.deviceID in self.backfilled
+
+    # Already delivered by the backfill or in realtime
+    dev = self.testConfig.getDeviceInfo(event.deviceID)
+    if dev is None:
+      return True
+    if event.ID <= max(dev['last_event_id'], dev.get('last_realtime_id', 0)):
+      return False
+
+    if persist:
+      self.testConfig.updateLastRealtimeID(event.deviceID, event.ID)
+    return True
+
+  def isDeliveredInRealtime(self, backfill, event):
+    # Delivered in realtime in an earlier session: below the watermark and passing the filter
+    if event.ID > backfill['watermark']:
+      return False
+    return self.subscription is None or self.subscription.matches(event)
+
+  def claimBackfillPage(self, deviceID, page):
+    """
+    (events, last event ID, stop) of a backfill page: the events not delivered in realtime.
+    The realtime state is checked and the claimed ID is set under the same lock, so every
+    event is delivered by exactly one side.
+    """
+    with self.backfillLock:
+      backfill = self.backfills[deviceID]
+      stop = False
+      if backfill['stopID'] is not None and page[len(page) - 1].ID >= backfill['stopID']:
+        page = [event for event in page if event.ID < backfill['stopID']]
+        stop = True
+      if len(page) == 0:
+        return page, None, stop
+
+      claimedID = page[len(page) - 1].ID
+      backfill['claimedID'] = claimedID
+      realtimeIDs = backfill['realtimeIDs']
+      if len(realtimeIDs) > 0:
+        page = [event for event in page if event.ID not in realtimeIDs]
+      if page[0].ID <= backfill['watermark']:
+        page = [event for event in page if not self.isDeliveredInRealtime(backfill, event)]
+      return page, claimedID, stop
+
   def handleConnection(self, deviceID):
     print(f'***** Device {deviceID} is connected', flush=True)
     try:
       dev = self.testConfig.getDeviceInfo(deviceID)
       if dev is None:
         print(f'!!! Device {deviceID} is not in the configuration file', flush=True)
+        return
+
+      # Enable real-time monitoring first and read the backlog concurrently. Without an event
+      # filter the backfill stops at the first realtime event; with one it reads to the end
+      # and skips the events already delivered in realtime.
+      with self.backfillLock:
+        self.backfilled.discard(deviceID)
+        self.backfills[deviceID] = {'stopID': None, 'claimedID': None, 'realtimeIDs': set(), 'realtimeMaxID': 0,
+                                    'watermark': dev.get('last_realtime_id', 0)}
+      self.eventSvc.enableMonitoring(deviceID)
 
-      eventLogs = []
-
-      while True:
+      numOfLog = 0
+      completed = False
+      try:
         print(f"[{deviceID}] Reading log records starting from {dev['last_event_id']}...", flush=True)
-        newLogs = self.readNewLog(dev, MAX_NUM_OF_LOG)
-        print(f'[{deviceID}] Read {len(newLogs)} events', flush=True)
-        eventLogs.extend(newLogs)
-
-        # check if read the last log
-        if len(newLogs) < MAX_NUM_OF_LOG:
-          break
-
-      # do something with the event logs
-      # ...
-      print(f'[{deviceID}] The total number of new events: {len(eventLogs)}', flush=True)
-
-      # enable real-time monitoring
-      self.eventSvc.enableMonitoring(deviceID)
+        for eventLogs in self.logReader.pages(dev, lambda page: self.claimBackfillPage(deviceID, page)):
+          print(f'[{deviceID}] Read {len(eventLogs)} events', flush=True)
+          numOfLog += len(eventLogs)
+
+          # do something with the event logs
+          if not (self.logSink is None):
+            self.logSink(deviceID, eventLogs)
+        completed = True
+      finally:
+        with self.backfillLock:
+          backfill = self.backfills.pop(deviceID)
+          if completed:
+            self.backfilled.add(deviceID)
+
+        # Only once the backfill has read everything before them, the realtime events are
+        # persisted, so the next backfill does not deliver them again
+        if completed and backfill['realtimeMaxID'] > 0:
+          self.testConfig.updateLastRealtimeID(deviceID, backfill['realtimeMaxID'])
+
+      print(f'[{deviceID}] The total number of new events: {numOfLog}', flush=True)
     except grpc.RpcError as e:
-      print(f'Cannot enable monitoring: {e}')   
+      print(f'Cannot read the new events: {e}')   
 
   def printEvent(self, event):
     print(f'{datetime.datetime.utcfromtimestamp(event.timestamp)}: Device {event.deviceID}, User {event.userID}, {self.eventSvc.getEventString(event.eventCode, event.subCode)}', flush=True)
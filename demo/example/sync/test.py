@@ -43,12 +43,14 @@ def testSync():
 
     deviceMgr.handleConnection(eventMgr.handleConnection)
     deviceMgr.connectToDevices()
-    eventMgr.handleEvent(userMgr.syncUser)
+    eventMgr.handleEvent(userMgr.syncUser, userMgr.getSubscription())
 
     UserInput.pressEnter('\n>>> Press ENTER to show the test menu\n')
     TestMenu(userMgr, deviceMgr, eventMgr, testConfig).show()
 
+    userMgr.stop()
     deviceMgr.deleteConnection()
+    testConfig.flush()
     channel.close()    
 
   except grpc.RpcError as e:
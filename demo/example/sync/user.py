@@ -1,13 +1,27 @@
+import threading
+
 import grpc
 
-import user_pb2
+from example.registry.registry import lazyImport
 from example.err.err import getMultiError
+from example.event.subscription import EventSubscription
+
+user_pb2 = lazyImport('user_pb2')
 
 BS2_EVENT_USER_ENROLL_SUCCESS = 0x2000
 BS2_EVENT_USER_UPDATE_SUCCESS = 0x2200
 BS2_EVENT_USER_DELETE_SUCCESS = 0x2400
 BS2_EVENT_USER_DELETE_ALL_SUCCESS = 0x2600
 
+# User events are collected for SYNC_WINDOW seconds and synchronized together
+SYNC_WINDOW = 0.2
+# Maximum number of users in one Get/EnrollMulti/DeleteMulti request
+MAX_SYNC_BATCH = 128
+
+SYNC_ENROLL = 'enroll'
+SYNC_UPDATE = 'update'
+SYNC_DELETE = 'delete'
+
 class UserMgr:
   userSvc = None
   cardSvc = None
@@ -15,7 +29,7 @@ class UserMgr:
   deviceMgr = None
   eventMgr = None
 
-  enrolledIDs = []
+  enrolledIDs = None
 
   def __init__(self, userSvc, cardSvc, testConfig, deviceMgr, eventMgr): 
     self.userSvc = userSvc
@@ -24,6 +38,17 @@ class UserMgr:
     self.deviceMgr = deviceMgr
     self.eventMgr = eventMgr
 
+    self.enrolledIDs = set()
+    self.pending = {}
+    self.lock = threading.Lock()
+    self.syncLock = threading.Lock()
+    self.syncTimer = None
+
+  def getSubscription(self):
+    # Only the user events of the enrollment device are synchronized
+    enrollDeviceID = self.testConfig.getConfigData()['enroll_device']['device_id']
+    return EventSubscription(deviceIDs=[enrollDeviceID], eventCodes=[BS2_EVENT_USER_ENROLL_SUCCESS, BS2_EVENT_USER_UPDATE_SUCCESS, BS2_EVENT_USER_DELETE_SUCCESS])
+
   def enrollUser(self, userID):
     try:
       enrollDeviceID = self.testConfig.getConfigData()['enroll_device']['device_id']
@@ -54,50 +79,109 @@ class UserMgr:
       print('No new user', flush=True)
       return None
 
-    return self.userSvc.getUser(deviceID, self.enrolledIDs)
+    return self.userSvc.getUser(deviceID, sorted(self.enrolledIDs))
 
   def syncUser(self, eventLog):
-    try:
-      self.eventMgr.printEvent(eventLog)
-
-      # Handle only the events of the enrollment device
-      if eventLog.deviceID != self.testConfig.getConfigData()['enroll_device']['device_id']:
+    """
+    Queues the user event of the enrollment device. The queued users are synchronized
+    SYNC_WINDOW seconds after the first one, so a burst of events becomes one Get and one
+    EnrollMulti/DeleteMulti per MAX_SYNC_BATCH users instead of two RPCs per event.
+    """
+    self.eventMgr.printEvent(eventLog)
+
+    # Handle only the events of the enrollment device
+    if eventLog.deviceID != self.testConfig.getConfigData()['enroll_device']['device_id']:
+      return
+
+    if eventLog.eventCode == BS2_EVENT_USER_ENROLL_SUCCESS:
+      op = SYNC_ENROLL
+    elif eventLog.eventCode == BS2_EVENT_USER_UPDATE_SUCCESS:
+      op = SYNC_UPDATE
+    elif eventLog.eventCode == BS2_EVENT_USER_DELETE_SUCCESS:
+      op = SYNC_DELETE
+    else:
+      return
+
+    with self.lock:
+      self.queueUser(eventLog.userID, op)
+
+      if self.syncTimer is None:
+        self.syncTimer = threading.Timer(SYNC_WINDOW, self.flush)
+        self.syncTimer.daemon = True
+        self.syncTimer.start()
+
+  def queueUser(self, userID, op):
+    # Merge the new event with the one already queued for the same user
+    prevOp = self.pending.get(userID)
+
+    if op == SYNC_DELETE:
+      if prevOp == SYNC_ENROLL and userID not in self.enrolledIDs:
+        # Enrolled and deleted within the window: the target devices never had the user
+        del self.pending[userID]
+      else:
+        self.pending[userID] = SYNC_DELETE
+    elif prevOp == SYNC_ENROLL:
+      pass
+    elif prevOp == SYNC_DELETE or op == SYNC_UPDATE:
+      # The target devices may still have the old user, so it has to be overwritten
+      self.pending[userID] = SYNC_UPDATE
+    else:
+      self.pending[userID] = op
+
+  def flush(self):
+    """Synchronizes the queued users now. Also called by the timer after SYNC_WINDOW."""
+    with self.syncLock:
+      with self.lock:
+        pending = self.pending
+        self.pending = {}
+        self.syncTimer = None
+
+      if len(pending) == 0:
         return
 
-      connectedIDs = self.deviceMgr.getConnectedDevices(False)
-      targetDeviceIDs = self.testConfig.getTargetDeviceIDs(connectedIDs)
+      enrollIDs = [userID for userID, op in pending.items() if op != SYNC_DELETE]
+      deleteIDs = [userID for userID, op in pending.items() if op == SYNC_DELETE]
 
-      if len(targetDeviceIDs) == 0:
-        print('No device to sync', flush=True)
-        return
+      try:
+        targetDeviceIDs = self.deviceMgr.getConnectedTargets()
 
-      if eventLog.eventCode == BS2_EVENT_USER_ENROLL_SUCCESS or eventLog.eventCode == BS2_EVENT_USER_UPDATE_SUCCESS:
-        print(f'Trying to synchronize the enrolled user {eventLog.userID}...', flush=True)
-        newUserInfos = self.userSvc.getUser(eventLog.deviceID, [eventLog.userID])
-        self.userSvc.enrollMulti(targetDeviceIDs, newUserInfos, False)
+        if len(targetDeviceIDs) == 0:
+          print('No device to sync', flush=True)
+          return
 
-        try:
-          self.enrolledIDs.index(eventLog.userID)
-        except ValueError:
-          self.enrolledIDs.append(eventLog.userID)
+        enrollDeviceID = self.testConfig.getConfigData()['enroll_device']['device_id']
 
-        # Generate a MultiErrorResponse 
-        # It should fail since the users are duplicated.   
-        # Depends on grpcio-status       
-        #try:
-        #  self.userSvc.enrollMulti(targetDeviceIDs, newUserInfos, False)
-        #except grpc.RpcError as e:
-        #  multiError = getMultiError(e)
-        #  print(f'Multi error: {multiError}')
+        for i in range(0, len(enrollIDs), MAX_SYNC_BATCH):
+          userIDs = enrollIDs[i:i + MAX_SYNC_BATCH]
+          # Only a batch with an updated user overwrites the users on the target devices
+          overwrite = any(pending[userID] == SYNC_UPDATE for userID in userIDs)
+          print(f'Trying to synchronize {len(userIDs)} enrolled users...', flush=True)
+          newUserInfos = self.userSvc.getUser(enrollDeviceID, userIDs)
+          if len(newUserInfos) > 0:
+            self.syncMulti(lambda: self.userSvc.enrollMulti(targetDeviceIDs, newUserInfos, overwrite))
+          self.enrolledIDs.update(userInfo.hdr.ID for userInfo in newUserInfos)
 
-      elif eventLog.eventCode == BS2_EVENT_USER_DELETE_SUCCESS:
-        print(f'Trying to synchronize the deleted user {eventLog.userID}...', flush=True)
-        self.userSvc.deleteMulti(targetDeviceIDs, [eventLog.userID])
+        for i in range(0, len(deleteIDs), MAX_SYNC_BATCH):
+          userIDs = deleteIDs[i:i + MAX_SYNC_BATCH]
+          print(f'Trying to synchronize {len(userIDs)} deleted users...', flush=True)
+          self.syncMulti(lambda: self.userSvc.deleteMulti(targetDeviceIDs, userIDs))
+          self.enrolledIDs.difference_update(userIDs)
 
-        self.enrolledIDs.remove(eventLog.userID)
+      except grpc.RpcError as e:
+        print(f'Cannot synchronize the users: {e}')
 
+  def syncMulti(self, request):
+    # A MultiErrorResponse only means some of the devices failed, so the batch goes on
+    try:
+      request()
     except grpc.RpcError as e:
-      print(f'Cannot synchronize the user: {e}')  
-    
-
-
+      multiError = getMultiError(e)
+      if multiError is None:
+        raise
+      print(f'Multi error: {multiError}', flush=True)
+
+  def stop(self):
+    with self.lock:
+      if self.syncTimer is not None:
+        self.syncTimer.cancel()
+    self.flush()
@@ -1,7 +1,9 @@
 import grpc
 
-import system_pb2_grpc
-import system_pb2
+from example.registry.registry import lazyImport
+
+system_pb2_grpc = lazyImport('system_pb2_grpc')
+system_pb2 = lazyImport('system_pb2')
 
 
 class SystemSvc:
@@ -28,3 +30,11 @@ class SystemSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the System config: {e}')
       raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(system_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the System config multi: {e}')
+      raise
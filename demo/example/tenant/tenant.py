@@ -1,7 +1,9 @@
 import grpc
 
-import tenant_pb2_grpc
-import tenant_pb2
+from example.registry.registry import lazyImport
+
+tenant_pb2_grpc = lazyImport('tenant_pb2_grpc')
+tenant_pb2 = lazyImport('tenant_pb2')
 
 
 class TenantSvc:
@@ -1,7 +1,9 @@
 import grpc
 
-import thermal_pb2_grpc
-import thermal_pb2
+from example.registry.registry import lazyImport
+
+thermal_pb2_grpc = lazyImport('thermal_pb2_grpc')
+thermal_pb2 = lazyImport('thermal_pb2')
 
 
 class ThermalSvc:
@@ -29,6 +31,14 @@ class ThermalSvc:
       print(f'Cannot set the thermal config: {e}')
       raise
 
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(thermal_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the thermal config multi: {e}')
+      raise
+
   def getTemperatureLog(self, deviceID, startEventID, maxNumOfLog):
     try:
       response = self.stub.GetTemperatureLog(thermal_pb2.GetTemperatureLogRequest(deviceID=deviceID, startEventID=startEventID, maxNumOfLog=maxNumOfLog))
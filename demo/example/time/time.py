@@ -1,7 +1,9 @@
 import grpc
 
-import time_pb2_grpc
-import time_pb2
+from example.registry.registry import lazyImport
+
+time_pb2_grpc = lazyImport('time_pb2_grpc')
+time_pb2 = lazyImport('time_pb2')
 
 
 class TimeSvc:
@@ -29,6 +31,37 @@ class TimeSvc:
       print(f'Cannot set time: {e}')
       raise
 
+  def setTimeMulti(self, deviceIDs, GMTTime):
+    try:
+      response = self.stub.SetMulti(time_pb2.SetMultiRequest(deviceIDs=deviceIDs, GMTTime=GMTTime))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set time multi: {e}')
+      raise
+
+  def getConfig(self, deviceID):
+    try:
+      response = self.stub.GetConfig(time_pb2.GetConfigRequest(deviceID=deviceID))
+      return response.config
+    except grpc.RpcError as e:
+      print(f'Cannot get the time config: {e}')
+      raise
+
+  def setConfig(self, deviceID, config):
+    try:
+      self.stub.SetConfig(time_pb2.SetConfigRequest(deviceID=deviceID, config=config))
+    except grpc.RpcError as e:
+      print(f'Cannot set the time config: {e}')
+      raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(time_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the time config multi: {e}')
+      raise
+
   def getDSTConfig(self, deviceID):
     try:
       response = self.stub.GetDSTConfig(time_pb2.GetDSTConfigRequest(deviceID=deviceID))
@@ -43,3 +76,11 @@ class TimeSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the DST config: {e}')
       raise
+
+  def setDSTConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetDSTConfigMulti(time_pb2.SetDSTConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the DST config multi: {e}')
+      raise
@@ -1,7 +1,9 @@
 import grpc
 
-import tna_pb2_grpc
-import tna_pb2
+from example.registry.registry import lazyImport
+
+tna_pb2_grpc = lazyImport('tna_pb2_grpc')
+tna_pb2 = lazyImport('tna_pb2')
 
 
 class TNASvc:
@@ -29,6 +31,14 @@ class TNASvc:
       print(f'Cannot set the tna config: {e}')
       raise
 
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(tna_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the tna config multi: {e}')
+      raise
+
   def getTNALog(self, deviceID, startEventID, maxNumOfLog):
     try:
       response = self.stub.GetTNALog(tna_pb2.GetTNALogRequest(deviceID=deviceID, startEventID=startEventID, maxNumOfLog=maxNumOfLog))
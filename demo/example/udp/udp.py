@@ -1,7 +1,9 @@
 import grpc
 
-import udp_pb2_grpc
-import udp_pb2
+from example.registry.registry import lazyImport
+
+udp_pb2_grpc = lazyImport('udp_pb2_grpc')
+udp_pb2 = lazyImport('udp_pb2')
 
 
 class UdpSvc:
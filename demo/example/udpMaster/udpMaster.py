@@ -1,7 +1,9 @@
 import grpc
 
-import udp_master_pb2_grpc
-import udp_master_pb2
+from example.registry.registry import lazyImport
+
+udp_master_pb2_grpc = lazyImport('udp_master_pb2_grpc')
+udp_master_pb2 = lazyImport('udp_master_pb2')
 
 
 class UdpMasterSvc:
@@ -0,0 +1,359 @@
+import argparse
+import base64
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from google.protobuf import json_format
+
+from example.multi.multi import callSingle, fanOut
+from example.registry.registry import lazyImport
+
+user_pb2 = lazyImport('user_pb2')
+
+# A chunk is sent when it reaches either limit. Keep CHUNK_BYTES well below the message size
+# limit of the gateway, a chunk goes out in a single EnrollRequest.
+CHUNK_BYTES = 1024 * 1024
+CHUNK_USERS = 256
+# Chunks being enrolled at the same time. Reading stops while this many are in flight.
+MAX_IN_FLIGHT = 4
+# Records sent to a build worker at a time
+BUILD_BATCH = 512
+MAX_BUILD_WORKERS = 4
+PROGRESS_INTERVAL = 5.0
+
+CSV_LIST_SEPARATOR = ';'
+
+
+class InvalidRecord:
+  """A record which could not be read, counted in ProvisionReport.invalid by buildUsers()"""
+
+  def __init__(self, userID, error):
+    self.userID = userID
+    self.error = error
+
+
+def csvRowToRecord(row):
+  """
+  A CSV row in the JSON form of user_pb2.UserInfo. Columns: ID (required), name, startTime,
+  endTime, accessGroupIDs and cards (hex card data), the lists separated by ';'. Users with
+  fingerprint or face templates are given as JSON.
+  """
+  def getList(column):
+    value = (row.get(column) or '').strip()
+    return [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()] if value else []
+
+  record = {'hdr': {'ID': row['ID'].strip()}}
+  if row.get('name'):
+    record['name'] = row['name']
+
+  setting = {column: int(row[column]) for column in ('startTime', 'endTime') if row.get(column)}
+  if setting:
+    record['setting'] = setting
+
+  accessGroupIDs = getList('accessGroupIDs')
+  if accessGroupIDs:
+    record['accessGroupIDs'] = [int(groupID) for groupID in accessGroupIDs]
+
+  cards = getList('cards')
+  if cards:
+    record['cards'] = [{'data': base64.b64encode(bytes.fromhex(card)).decode()} for card in cards]
+
+  return record
+
+
+def readCSV(filename):
+  with open(filename, newline='') as f:
+    reader = csv.DictReader(f)
+    for row in reader:
+      # A bad cell only invalidates its row
+      try:
+        yield csvRowToRecord(row)
+      except (KeyError, ValueError, TypeError, AttributeError) as e:
+        userID = (row.get('ID') or '').strip() or None
+        yield InvalidRecord(userID, f'line {reader.line_num}: {type(e).__name__}: {e}')
+
+
+def readJSON(filename):
+  """Users in the JSON form of user_pb2.UserInfo, as a JSON array or one object per line"""
+  with open(filename) as f:
+    firstChar = f.read(1)
+    while firstChar.isspace():
+      firstChar = f.read(1)
+    f.seek(0)
+
+    if firstChar == '[':
+      yield from json.load(f)
+      return
+
+    for lineNum, line in enumerate(f, 1):
+      if line.strip():
+        try:
+          yield json.loads(line)
+        except ValueError as e:
+          yield InvalidRecord(None, f'line {lineNum}: {e}')
+
+
+def readRecords(filename):
+  if filename.lower().endswith('.csv'):
+    return readCSV(filename)
+  return readJSON(filename)
+
+
+def buildUsers(records):
+  """[(userID, serialized UserInfo or None, error or None)] of the records. Runs in the build workers."""
+  users = []
+  for record in records:
+    if isinstance(record, InvalidRecord):
+      users.append((record.userID, None, record.error))
+      continue
+
+    userID = record.get('hdr', {}).get('ID') if isinstance(record, dict) else None
+    try:
+      userInfo = json_format.ParseDict(record, user_pb2.UserInfo())
+      if not userInfo.hdr.ID:
+        raise ValueError('no user ID')
+      users.append((userInfo.hdr.ID, userInfo.SerializeToString(), None))
+    except (json_format.ParseError, ValueError, TypeError, AttributeError) as e:
+      users.append((userID, None, str(e)))
+  return users
+
+
+def getDefaultBuildWorkers():
+  # One per usable CPU up to MAX_BUILD_WORKERS. With a single CPU the workers only add overhead.
+  if hasattr(os, 'sched_getaffinity'):
+    cpus = len(os.sched_getaffinity(0))
+  else:
+    cpus = os.cpu_count() or 1
+  return 0 if cpus < 2 else min(cpus, MAX_BUILD_WORKERS)
+
+
+def batched(iterable, size):
+  batch = []
+  for item in iterable:
+    batch.append(item)
+    if len(batch) >= size:
+      yield batch
+      batch = []
+  if batch:
+    yield batch
+
+
+class ProvisionReport:
+  """Counters of a provisioning run. Enrolled and failed count users per device."""
+
+  def __init__(self, deviceIDs):
+    self.deviceIDs = list(deviceIDs)
+    self.startTime = time.monotonic()
+    self.endTime = None
+    self.lock = threading.Lock()
+
+    self.read = 0
+    self.invalid = []
+    self.chunks = 0
+    self.chunkErrors = 0
+    self.bytes = 0
+    self.enrolled = {deviceID: 0 for deviceID in self.deviceIDs}
+    self.failed = {deviceID: 0 for deviceID in self.deviceIDs}
+    # (deviceID, first userID, last userID, number of users, error) of every failed chunk
+    self.failures = []
+
+  def addChunk(self, userIDs, size, result):
+    with self.lock:
+      self.chunks += 1
+      self.bytes += size
+      for deviceID in self.deviceIDs:
+        error = result.errors.get(deviceID)
+        if error is None:
+          self.enrolled[deviceID] += len(userIDs)
+        else:
+          self.failed[deviceID] += len(userIDs)
+          self.failures.append((deviceID, userIDs[0], userIDs[-1], len(userIDs), f'{error.code}: {error.msg}'))
+
+  def addChunkError(self, userIDs, error):
+    """A chunk which could not be sent at all: its users failed on every device"""
+    with self.lock:
+      self.chunks += 1
+      self.chunkErrors += 1
+      for deviceID in self.deviceIDs:
+        self.failed[deviceID] += len(userIDs)
+        self.failures.append((deviceID, userIDs[0], userIDs[-1], len(userIDs), str(error)))
+
+  def getElapsed(self):
+    endTime = self.endTime if self.endTime is not None else time.monotonic()
+    return max(endTime - self.startTime, 1e-6)
+
+  def getSummary(self):
+    with self.lock:
+      elapsed = self.getElapsed()
+      enrolled = sum(self.enrolled.values())
+      return {
+        'read': self.read,
+        'invalid': len(self.invalid),
+        'chunks': self.chunks,
+        'chunkErrors': self.chunkErrors,
+        'enrolled': enrolled,
+        'failed': sum(self.failed.values()),
+        'seconds': round(elapsed, 2),
+        'usersPerSec': round(enrolled / elapsed, 1),
+        'MBPerSec': round(self.bytes / elapsed / (1024 * 1024), 2),
+      }
+
+  def __repr__(self):
+    summary = self.getSummary()
+    return f"Enrolled {summary['enrolled']} users ({summary['failed']} failed, {summary['invalid']} invalid) in {summary['chunks']} chunks, " \
+           f"{summary['usersPerSec']} users/s, {summary['MBPerSec']} MB/s"
+
+
+class UserProvisioner:
+  """
+  Enrolls a large number of users read from CSV or JSON to one or more devices.
+
+  The records are turned into UserInfo messages by a pool of buildWorkers processes, then
+  packed into chunks of at most chunkBytes serialized bytes and chunkUsers users. Up to
+  maxInFlight chunks are enrolled at the same time with Enroll, or EnrollMulti for several
+  devices. A device failing in a chunk only fails that chunk: the error, taken from the
+  MultiErrorResponse of the gateway, is kept in the report and the run goes on.
+
+    provisioner = UserProvisioner(UserSvc(channel), deviceIDs)
+    report = provisioner.provision(readRecords('users.csv'))
+    print(report.getSummary(), report.failures)
+  """
+
+  def __init__(self, userSvc, deviceIDs, overwrite=True, chunkBytes=CHUNK_BYTES, chunkUsers=CHUNK_USERS, maxInFlight=MAX_IN_FLIGHT,
+               buildWorkers=None, progressInterval=PROGRESS_INTERVAL, onProgress=None):
+    """buildWorkers: processes building the messages, 0 builds them in this process. See getDefaultBuildWorkers()."""
+    self.userSvc = userSvc
+    self.deviceIDs = list(deviceIDs)
+    self.overwrite = overwrite
+    self.chunkBytes = chunkBytes
+    self.chunkUsers = max(1, chunkUsers)
+    self.maxInFlight = max(1, maxInFlight)
+    self.buildWorkers = getDefaultBuildWorkers() if buildWorkers is None else buildWorkers
+    self.progressInterval = progressInterval
+    self.onProgress = onProgress
+
+    self.lastProgress = 0.0
+
+  def buildAll(self, records):
+    """Yields (userID, serialized UserInfo or None, error or None) in the order of the records"""
+    batches = batched(records, BUILD_BATCH)
+    if self.buildWorkers <= 0:
+      for batch in batches:
+        yield from buildUsers(batch)
+      return
+
+    # Forking a process using gRPC is not safe, so the workers are spawned
+    with ProcessPoolExecutor(max_workers=self.buildWorkers, mp_context=multiprocessing.get_context('spawn')) as executor:
+      # map() submits everything up front; a bounded window keeps memory flat on large files
+      pending = []
+      for batch in batches:
+        pending.append(executor.submit(buildUsers, batch))
+        if len(pending) >= self.buildWorkers * 2:
+          yield from pending.pop(0).result()
+      for future in pending:
+        yield from future.result()
+
+  def makeChunks(self, users, report):
+    """Yields ([userIDs], [serialized UserInfos], size) within the chunk limits"""
+    userIDs, chunk, size = [], [], 0
+    for userID, data, error in users:
+      report.read += 1
+      if error is not None:
+        report.invalid.append((userID, error))
+        continue
+
+      if chunk and (size + len(data) > self.chunkBytes or len(chunk) >= self.chunkUsers):
+        yield userIDs, chunk, size
+        userIDs, chunk, size = [], [], 0
+
+      userIDs.append(userID)
+      chunk.append(data)
+      size += len(data)
+
+    if chunk:
+      yield userIDs, chunk, size
+
+  def enrollChunk(self, userIDs, chunk, size, report):
+    try:
+      users = [user_pb2.UserInfo.FromString(data) for data in chunk]
+      # Enroll for a single device, EnrollMulti for several. Partial failures come back per device.
+      if len(self.deviceIDs) == 1:
+        result = callSingle(self.userSvc, 'enroll', self.deviceIDs, users, self.overwrite, maxWorkers=1)
+      else:
+        result = fanOut(self.userSvc, 'enroll', self.deviceIDs, users, self.overwrite)
+      report.addChunk(userIDs, size, result)
+    except Exception as e:
+      # e.g. a closed channel: nothing of the chunk reached the devices
+      print(f'Cannot enroll users {userIDs[0]}..{userIDs[-1]}: {e}', flush=True)
+      report.addChunkError(userIDs, e)
+    self.reportProgress(report)
+
+  def reportProgress(self, report, force=False):
+    now = time.monotonic()
+    if not force and now - self.lastProgress < self.progressInterval:
+      return
+    self.lastProgress = now
+
+    if self.onProgress is not None:
+      self.onProgress(report)
+    else:
+      print(report, flush=True)
+
+  def provision(self, records):
+    """Enrolls the users of the records (dicts in the JSON form of UserInfo) and returns a ProvisionReport"""
+    report = ProvisionReport(self.deviceIDs)
+    inFlight = threading.BoundedSemaphore(self.maxInFlight)
+
+    def done(future):
+      inFlight.release()
+      if future.exception() is not None:
+        print(f'Cannot enroll a chunk: {future.exception()}', flush=True)
+
+    with ThreadPoolExecutor(max_workers=self.maxInFlight, thread_name_prefix='provision') as executor:
+      for userIDs, chunk, size in self.makeChunks(self.buildAll(records), report):
+        # Flow control: wait for a chunk to complete before reading more
+        inFlight.acquire()
+        executor.submit(self.enrollChunk, userIDs, chunk, size, report).add_done_callback(done)
+
+    report.endTime = time.monotonic()
+    self.reportProgress(report, force=True)
+    return report
+
+
+if __name__ == '__main__':
+  from example.client.client import GatewayClient
+  from example.user.user import UserSvc
+
+  parser = argparse.ArgumentParser(description='Enroll users from a CSV or JSON file')
+  parser.add_argument('file', help='.csv, .json (array) or .jsonl (one UserInfo per line)')
+  parser.add_argument('--devices', type=int, nargs='+', required=True)
+  parser.add_argument('--gateway', default='127.0.0.1:4000', help='ip:port')
+  parser.add_argument('--ca', default=None, help='CA certificate of the gateway, insecure without it')
+  parser.add_argument('--chunk-bytes', type=int, default=CHUNK_BYTES)
+  parser.add_argument('--chunk-users', type=int, default=CHUNK_USERS)
+  parser.add_argument('--in-flight', type=int, default=MAX_IN_FLIGHT)
+  parser.add_argument('--build-workers', type=int, default=None)
+  args = parser.parse_args()
+
+  if args.ca is None:
+    import grpc
+    channel = grpc.insecure_channel(args.gateway)
+  else:
+    ip, port = args.gateway.rsplit(':', 1)
+    channel = GatewayClient(ip, int(port), args.ca).getChannel()
+
+  provisioner = UserProvisioner(UserSvc(channel), args.devices, chunkBytes=args.chunk_bytes, chunkUsers=args.chunk_users,
+                                maxInFlight=args.in_flight, buildWorkers=args.build_workers)
+  report = provisioner.provision(readRecords(args.file))
+  print(json.dumps(report.getSummary(), indent=2))
+  for failure in report.failures[:20]:
+    print(f'Device {failure[0]}: users {failure[1]}..{failure[2]} ({failure[3]}) failed: {failure[4]}', file=sys.stderr)
+  summary = report.getSummary()
+  sys.exit(0 if summary['failed'] == 0 and summary['chunkErrors'] == 0 else 1)
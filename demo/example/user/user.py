@@ -1,7 +1,9 @@
 import grpc
 
-import user_pb2_grpc
-import user_pb2
+from example.registry.registry import lazyImport
+
+user_pb2_grpc = lazyImport('user_pb2_grpc')
+user_pb2 = lazyImport('user_pb2')
 
 
 class UserSvc:
@@ -22,9 +24,9 @@ class UserSvc:
       print(f'Cannot get the user list: {e}')
       raise
 
-  def getUser(self, deviceID, userIDs, mask=user_pb2.USER_MASK_ALL):
+  def getUser(self, deviceID, userIDs, mask=None):
     try:
-      if mask == user_pb2.USER_MASK_ALL:
+      if mask is None or mask == user_pb2.USER_MASK_ALL:
         response = self.stub.Get(user_pb2.GetRequest(deviceID=deviceID, userIDs=userIDs))
       else:
         response = self.stub.GetPartial(user_pb2.GetPartialRequest(deviceID=deviceID, userIDs=userIDs, infoMask=mask))
@@ -42,7 +44,8 @@ class UserSvc:
 
   def enrollMulti(self, deviceIDs, users, overwrite):
     try:
-      self.stub.EnrollMulti(user_pb2.EnrollMultiRequest(deviceIDs=deviceIDs, users=users, overwrite=overwrite))
+      response = self.stub.EnrollMulti(user_pb2.EnrollMultiRequest(deviceIDs=deviceIDs, users=users, overwrite=overwrite))
+      return response.deviceErrors
     except grpc.RpcError as e:
       print(f'Cannot enroll users multi: {e}')
       raise
@@ -56,7 +59,8 @@ class UserSvc:
 
   def updateMulti(self, deviceIDs, users):
     try:
-      self.stub.UpdateMulti(user_pb2.UpdateMultiRequest(deviceIDs=deviceIDs, users=users))
+      response = self.stub.UpdateMulti(user_pb2.UpdateMultiRequest(deviceIDs=deviceIDs, users=users))
+      return response.deviceErrors
     except grpc.RpcError as e:
       print(f'Cannot update users multi: {e}')
       raise
@@ -75,9 +79,18 @@ class UserSvc:
       print(f'Cannot delete all users: {e}')
       raise
 
+  def deleteAllMulti(self, deviceIDs):
+    try:
+      response = self.stub.DeleteAllMulti(user_pb2.DeleteAllMultiRequest(deviceIDs=deviceIDs))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot delete all users multi: {e}')
+      raise
+
   def deleteMulti(self, deviceIDs, userIDs):
     try:
-      self.stub.DeleteMulti(user_pb2.DeleteMultiRequest(deviceIDs=deviceIDs, userIDs=userIDs))
+      response = self.stub.DeleteMulti(user_pb2.DeleteMultiRequest(deviceIDs=deviceIDs, userIDs=userIDs))
+      return response.deviceErrors
     except grpc.RpcError as e:
       print(f'Cannot delete users multi: {e}')
       raise
@@ -89,6 +102,14 @@ class UserSvc:
       print(f'Cannot set user fingers: {e}')
       raise
 
+  def setFingerMulti(self, deviceIDs, userFingers):
+    try:
+      response = self.stub.SetFingerMulti(user_pb2.SetFingerMultiRequest(deviceIDs=deviceIDs, userFingers=userFingers))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set user fingers multi: {e}')
+      raise
+
   def getCard(self, deviceID, userIDs):
     try:
       response = self.stub.GetCard(user_pb2.GetCardRequest(deviceID=deviceID, userIDs=userIDs))
@@ -104,6 +125,14 @@ class UserSvc:
       print(f'Cannot set user cards: {e}')
       raise
 
+  def setCardMulti(self, deviceIDs, userCards):
+    try:
+      response = self.stub.SetCardMulti(user_pb2.SetCardMultiRequest(deviceIDs=deviceIDs, userCards=userCards))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set user cards multi: {e}')
+      raise
+
   def setFace(self, deviceID, userFaces):
     try:
       self.stub.SetFace(user_pb2.SetFaceRequest(deviceID=deviceID, userFaces=userFaces))
@@ -111,6 +140,14 @@ class UserSvc:
       print(f'Cannot set user faces: {e}')
       raise
 
+  def setFaceMulti(self, deviceIDs, userFaces):
+    try:
+      response = self.stub.SetFaceMulti(user_pb2.SetFaceMultiRequest(deviceIDs=deviceIDs, userFaces=userFaces))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set user faces multi: {e}')
+      raise
+
   def hashPIN(self, userPIN):
     try:
       response = self.stub.GetPINHash(user_pb2.GetPINHashRequest(PIN=userPIN))
@@ -126,6 +163,14 @@ class UserSvc:
       print(f'Cannot set user access groups: {e}')
       raise 
 
+  def setAccessGroupMulti(self, deviceIDs, userAccessGroups):
+    try:
+      response = self.stub.SetAccessGroupMulti(user_pb2.SetAccessGroupMultiRequest(deviceIDs=deviceIDs, userAccessGroups=userAccessGroups))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set user access groups multi: {e}')
+      raise 
+
   def getAccessGroup(self, deviceID, userIDs):
     try:
       response = self.stub.GetAccessGroup(user_pb2.GetAccessGroupRequest(deviceID=deviceID, userIDs=userIDs))
@@ -141,6 +186,14 @@ class UserSvc:
       print(f'Cannot set user job codes: {e}')
       raise 
 
+  def setJobCodeMulti(self, deviceIDs, userJobCodes):
+    try:
+      response = self.stub.SetJobCodeMulti(user_pb2.SetJobCodeMultiRequest(deviceIDs=deviceIDs, userJobCodes=userJobCodes))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set user job codes multi: {e}')
+      raise 
+
   def getJobCode(self, deviceID, userIDs):
     try:
       response = self.stub.GetJobCode(user_pb2.GetJobCodeRequest(deviceID=deviceID, userIDs=userIDs))
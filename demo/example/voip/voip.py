@@ -1,7 +1,9 @@
 import grpc
 
-import voip_pb2_grpc
-import voip_pb2
+from example.registry.registry import lazyImport
+
+voip_pb2_grpc = lazyImport('voip_pb2_grpc')
+voip_pb2 = lazyImport('voip_pb2')
 
 
 class VoipSvc:
@@ -28,3 +30,11 @@ class VoipSvc:
     except grpc.RpcError as e:
       print(f'Cannot set the voip config: {e}')
       raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(voip_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the voip config multi: {e}')
+      raise
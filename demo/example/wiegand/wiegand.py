@@ -1,7 +1,9 @@
 import grpc
 
-import wiegand_pb2_grpc
-import wiegand_pb2
+from example.registry.registry import lazyImport
+
+wiegand_pb2_grpc = lazyImport('wiegand_pb2_grpc')
+wiegand_pb2 = lazyImport('wiegand_pb2')
 
 
 class WiegandSvc:
@@ -27,4 +29,12 @@ class WiegandSvc:
       self.stub.SetConfig(wiegand_pb2.SetConfigRequest(deviceID=deviceID, config=config))
     except grpc.RpcError as e:
       print(f'Cannot set the wiegand config: {e}')
-      raise
\ No newline at end of file
+      raise
+
+  def setConfigMulti(self, deviceIDs, config):
+    try:
+      response = self.stub.SetConfigMulti(wiegand_pb2.SetConfigMultiRequest(deviceIDs=deviceIDs, config=config))
+      return response.deviceErrors
+    except grpc.RpcError as e:
+      print(f'Cannot set the wiegand config multi: {e}')
+      raise
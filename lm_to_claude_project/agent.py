@@ -2,7 +2,7 @@ from typing import List, TypedDict, Annotated
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_community.llms import Ollama
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
 import operator
 import os
@@ -10,7 +10,8 @@ import json
 
 # --- Core Tools --- 
 # These are the only functions the agent will call directly.
-from skills.test_case_retriever.functions import get_test_case_details
+from skills.test_case_retriever.functions import get_test_case_details, warm_up_retriever
+from context_assembler import get_context_assembler, SkillContext
 
 # --- Helper Functions for the Agent --- 
 
@@ -30,31 +31,14 @@ def find_relevant_skill_package(query: str) -> str:
         return "/Users/admin/Documents/2025_project/QE_RAG_COMPANY/QE_RAG_2025/lm_to_claude_project/skills/g-sdk_test_assembler"
     return ""
 
-def load_skill_package_and_guides(skill_path: str) -> dict:
-    """Loads all content from a skill package and all G-SDK guides."""
-    context = {}
-    
-    # 1. Load the chosen skill package
-    if os.path.isdir(skill_path):
-        skill_content = []
-        for filename in os.listdir(skill_path):
-            content = _read_file(os.path.join(skill_path, filename))
-            skill_content.append(f"--- START {filename} ---\n{content}\n--- END {filename} ---")
-        context["skill_package"] = "\n".join(skill_content)
-    
-    # 2. Load all G-SDK guides
-    base_guide_path = "/Users/admin/Documents/2025_project/QE_RAG_COMPANY/QE_RAG_2025/gsdk_rag_context"
-    context["workflow_guide"] = _read_file(os.path.join(base_guide_path, "01_WORKFLOW_GUIDE.md"))
-    context["reference_guide"] = _read_file(os.path.join(base_guide_path, "02_REFERENCE_GUIDE.md"))
-    context["test_data_guide"] = _read_file(os.path.join(base_guide_path, "03_TEST_DATA_GUIDE.md")),
-    
-    # 3. Load all G-SDK resources
-    resource_path = os.path.join(base_guide_path, "resources")
-    context["category_map"] = _read_file(os.path.join(resource_path, "category_map.json"))
-    context["event_codes"] = _read_file(os.path.join(resource_path, "event_codes.json"))
-    context["manager_api_index"] = _read_file(os.path.join(resource_path, "manager_api_index.json"))
-
-    return context
+def load_skill_package_and_guides(skill_path: str, test_case_details: str = "") -> dict:
+    """
+    Loads the skill package and the G-SDK guides/resources relevant to the test case.
+    Files are read lazily, deduplicated by content hash and cached across graph runs
+    (see context_assembler.py).
+    """
+    assembler = get_context_assembler()
+    return assembler.select(assembler.load(skill_path), test_case_details)
 
 # --- Agent State Definition --- 
 
@@ -62,6 +46,7 @@ class AgentState(TypedDict):
     original_query: str
     test_case_details: str
     skill_path: str
+    skill_context: SkillContext
     full_context: dict
     final_script: str
     messages: Annotated[List[BaseMessage], operator.add]
@@ -83,9 +68,16 @@ def find_skill_node(state: AgentState):
     return {"skill_path": skill_path}
 
 def load_context_node(state: AgentState):
+    # Runs in parallel with retrieve_test_case: only resolves and caches the files here,
+    # the test-case-specific selection happens in join_context_node.
     print("--- Node: load_context --- ")
     skill_path = state['skill_path']
-    full_context = load_skill_package_and_guides(skill_path)
+    skill_context = get_context_assembler().load(skill_path)
+    return {"skill_context": skill_context}
+
+def join_context_node(state: AgentState):
+    print("--- Node: join_context --- ")
+    full_context = get_context_assembler().select(state['skill_context'], state['test_case_details'])
     return {"full_context": full_context}
 
 def generate_script_node(state: AgentState):
@@ -127,17 +119,44 @@ def generate_script_node(state: AgentState):
 # --- Graph Definition --- 
 
 def create_agent_graph():
+    # Open the test case DB in the background so the first query does not pay for it
+    warm_up_retriever()
+
     workflow = StateGraph(AgentState)
 
     workflow.add_node("retrieve_test_case", retrieve_test_case_node)
     workflow.add_node("find_skill", find_skill_node)
     workflow.add_node("load_context", load_context_node)
+    workflow.add_node("join_context", join_context_node)
     workflow.add_node("generate_script", generate_script_node)
 
-    workflow.set_entry_point("retrieve_test_case")
-    workflow.add_edge("retrieve_test_case", "find_skill")
+    # Fan-out: retrieval and skill/context loading do not depend on each other
+    workflow.add_edge(START, "retrieve_test_case")
+    workflow.add_edge(START, "find_skill")
     workflow.add_edge("find_skill", "load_context")
-    workflow.add_edge("load_context", "generate_script")
+
+    # Fan-in: join_context waits for both branches before generation
+    workflow.add_edge(["retrieve_test_case", "load_context"], "join_context")
+    workflow.add_edge("join_context", "generate_script")
     workflow.add_edge("generate_script", END)
 
     return workflow.compile()
+
+def generate_scripts_batch(test_case_ids: List[str], max_workers: int = 4) -> dict:
+    """
+    Generates scripts for many test cases with one compiled graph.
+    At most max_workers graph runs are in flight at a time; a failing test case
+    does not stop the others.
+    Returns {test_case_id: final_script or {"error": message}}.
+    """
+    graph = create_agent_graph()
+    inputs = [{"original_query": test_case_id, "messages": []} for test_case_id in test_case_ids]
+    outputs = graph.batch(inputs, config={"max_concurrency": max_workers}, return_exceptions=True)
+
+    results = {}
+    for test_case_id, output in zip(test_case_ids, outputs):
+        if isinstance(output, Exception):
+            results[test_case_id] = {"error": str(output)}
+        else:
+            results[test_case_id] = output.get("final_script", "")
+    return results
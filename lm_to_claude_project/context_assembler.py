@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+# Directory layout: <repo>/lm_to_claude_project/context_assembler.py and <repo>/gsdk_rag_context
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+GSDK_CONTEXT_DIR = os.path.join(os.path.dirname(PROJECT_DIR), "gsdk_rag_context")
+RESOURCE_DIR = os.path.join(GSDK_CONTEXT_DIR, "resources")
+
+GUIDE_FILES = {
+    "workflow_guide": "01_WORKFLOW_GUIDE.md",
+    "reference_guide": "02_REFERENCE_GUIDE.md",
+    "test_data_guide": "03_TEST_DATA_GUIDE.md",
+}
+RESOURCE_FILES = {
+    "category_map": "category_map.json",
+    "event_codes": "event_codes.json",
+    "manager_api_index": "manager_api_index.json",
+}
+
+# Categories every generated test touches (same defaults as the test planner skill)
+DEFAULT_CATEGORIES = ("user", "event")
+
+_SECTION_HEADING = re.compile(r"^## ", re.MULTILINE)
+
+
+class _BlobStore:
+    """
+    Content-addressed, process-wide file cache.
+    Each path is read at most once per mtime, and identical contents share one entry,
+    so the same JSON copied into several skill directories is held (and sent) only once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = {}  # path -> (mtime, digest)
+        self._blobs = {}  # digest -> text
+
+    def digest(self, path: str) -> str:
+        """Returns the content hash of a file, reading it only if it changed. Empty string if missing."""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return ""
+
+        with self._lock:
+            cached = self._paths.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            return ""
+
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._paths[path] = (mtime, digest)
+            self._blobs.setdefault(digest, text)
+        return digest
+
+    def text(self, digest: str) -> str:
+        with self._lock:
+            return self._blobs.get(digest, "")
+
+
+_store = _BlobStore()
+
+
+def _split_sections(markdown: str) -> list:
+    """Splits a markdown guide into [preamble, '## ...' section, ...]."""
+    starts = [m.start() for m in _SECTION_HEADING.finditer(markdown)]
+    if not starts:
+        return [markdown]
+    bounds = [0] + starts + [len(markdown)]
+    return [markdown[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+class SkillContext:
+    """
+    Handle returned by ContextAssembler.load().
+    Holds only file digests; the text itself lives in the shared blob store.
+    """
+
+    def __init__(self, skill_path: str, skill_files: list, guides: dict, resources: dict):
+        self.skill_path = skill_path
+        self.skill_files = skill_files  # [(filename, digest)]
+        self.guides = guides            # key -> digest
+        self.resources = resources      # key -> digest
+
+
+class ContextAssembler:
+    """
+    Builds the prompt context for generate_script_node.
+
+    - load() resolves the skill package, guides and resources to content digests.
+      Files are read lazily and memoized across graph runs (invalidated on mtime change).
+    - select() keeps only the parts relevant to the retrieved test case:
+      categories matched from the test case text, the APIs and guide sections for those
+      categories, and skill files that are not duplicates of an already included resource.
+    """
+
+    def __init__(self, guide_dir: str = GSDK_CONTEXT_DIR, resource_dir: str = RESOURCE_DIR):
+        self.guide_dir = guide_dir
+        self.resource_dir = resource_dir
+        self._parsed = {}  # digest -> parsed JSON
+        self._lock = threading.Lock()
+
+    def load(self, skill_path: str) -> SkillContext:
+        skill_files = []
+        if skill_path and os.path.isdir(skill_path):
+            for filename in sorted(os.listdir(skill_path)):
+                digest = _store.digest(os.path.join(skill_path, filename))
+                if digest:
+                    skill_files.append((filename, digest))
+
+        guides = {key: _store.digest(os.path.join(self.guide_dir, name)) for key, name in GUIDE_FILES.items()}
+        resources = {key: _store.digest(os.path.join(self.resource_dir, name)) for key, name in RESOURCE_FILES.items()}
+        return SkillContext(skill_path, skill_files, guides, resources)
+
+    def _json(self, digest: str):
+        if not digest:
+            return None
+        with self._lock:
+            if digest in self._parsed:
+                return self._parsed[digest]
+        try:
+            data = json.loads(_store.text(digest))
+        except json.JSONDecodeError:
+            data = None
+        with self._lock:
+            self._parsed[digest] = data
+        return data
+
+    def match_categories(self, ctx: SkillContext, text: str) -> list:
+        """Returns the category entries whose keywords appear in the given text."""
+        category_map = self._json(ctx.resources["category_map"]) or {}
+        lower_text = (text or "").lower()
+        matched = []
+        for category in category_map.get("categories", []):
+            if category["name"] in DEFAULT_CATEGORIES or any(kw.lower() in lower_text for kw in category.get("keywords", [])):
+                matched.append(category)
+        return matched
+
+    def _select_apis(self, ctx: SkillContext, names: set) -> dict:
+        api_index = self._json(ctx.resources["manager_api_index"]) or {}
+        selected = {}
+        for group_name, group in api_index.items():
+            methods = [m for m in group.get("methods", []) if names.intersection(m.get("categories", []))]
+            if methods:
+                selected[group_name] = {"description": group.get("description", ""), "methods": methods}
+        return selected
+
+    def _select_sections(self, digest: str, keywords: list) -> str:
+        sections = _split_sections(_store.text(digest))
+        if len(sections) <= 1:
+            return sections[0] if sections else ""
+        kept = [sections[0]]
+        for section in sections[1:]:
+            lower_section = section.lower()
+            if any(kw in lower_section for kw in keywords):
+                kept.append(section)
+        return "".join(kept)
+
+    def select(self, ctx: SkillContext, test_case_details: str) -> dict:
+        """Assembles the context dict used by generate_script_node."""
+        categories = self.match_categories(ctx, test_case_details)
+        names = {c["name"] for c in categories}
+        keywords = sorted({kw.lower() for c in categories for kw in c.get("keywords", [])})
+
+        context = {"categories": sorted(names)}
+        # The workflow guide describes the whole 7-phase flow, so it is always sent in full.
+        context["workflow_guide"] = _store.text(ctx.guides["workflow_guide"])
+        context["reference_guide"] = self._select_sections(ctx.guides["reference_guide"], keywords)
+        context["test_data_guide"] = self._select_sections(ctx.guides["test_data_guide"], keywords)
+
+        context["category_map"] = json.dumps({"categories": categories}, ensure_ascii=False)
+        context["manager_api_index"] = json.dumps(self._select_apis(ctx, names), ensure_ascii=False)
+        context["event_codes"] = _store.text(ctx.resources["event_codes"]) if "event" in names else ""
+
+        # Skill files identical to a guide/resource already in the prompt are referenced, not repeated.
+        shared = set(ctx.guides.values()) | set(ctx.resources.values())
+        skill_content = []
+        for filename, digest in ctx.skill_files:
+            if digest in shared:
+                skill_content.append(f"--- {filename}: same content as the G-SDK guides/resources above ---")
+            else:
+                skill_content.append(f"--- START {filename} ---\n{_store.text(digest)}\n--- END {filename} ---")
+        context["skill_package"] = "\n".join(skill_content)
+
+        return context
+
+
+_assembler = None
+_assembler_lock = threading.Lock()
+
+
+def get_context_assembler() -> ContextAssembler:
+    """Returns the process-wide assembler, so its caches survive across graph runs."""
+    global _assembler
+    with _assembler_lock:
+        if _assembler is None:
+            _assembler = ContextAssembler()
+        return _assembler
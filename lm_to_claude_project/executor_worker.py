@@ -0,0 +1,94 @@
+"""
+Warm worker for tools.ExecutorPool.
+
+Started ahead of time by the pool: it applies the memory limit (EXECUTOR_MEMORY_BYTES), so the
+preload counts against it too, pre-imports the G-SDK *_pb2 modules, then blocks on stdin
+waiting for one job. A job is a single JSON header line followed by the source code:
+
+    {"workspace": "/tmp/...", "cwd": "/home/...", "cpu_seconds": 30}\n
+    <python source>
+
+The worker writes the code to main.py in the job's private workspace, applies the CPU limit,
+moves into the caller's working directory and runs the code as __main__. Each worker runs
+exactly one job and exits, so no state leaks between runs.
+"""
+import glob
+import importlib
+import json
+import os
+import runpy
+import sys
+import traceback
+
+
+def preload(module_dirs):
+    """Imports every *_pb2 module found in the given directories (they are on sys.path)."""
+    for module_dir in module_dirs:
+        for path in glob.glob(os.path.join(module_dir, "*_pb2.py")):
+            name = os.path.splitext(os.path.basename(path))[0]
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+
+def apply_memory_limit(memory_bytes):
+    try:
+        import resource
+    except ImportError:
+        return  # Not available on Windows
+
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+
+def apply_cpu_limit(cpu_seconds):
+    try:
+        import resource
+    except ImportError:
+        return
+
+    if cpu_seconds:
+        # RLIMIT_CPU counts the whole process, so add the time already spent warming up
+        used = resource.getrusage(resource.RUSAGE_SELF)
+        spent = int(used.ru_utime + used.ru_stime) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (spent + cpu_seconds, spent + cpu_seconds + 1))
+
+
+def main():
+    apply_memory_limit(int(os.environ.get("EXECUTOR_MEMORY_BYTES") or 0))
+    preload([p for p in os.environ.get("EXECUTOR_PRELOAD_DIRS", "").split(os.pathsep) if p])
+
+    header = sys.stdin.readline()
+    if not header:
+        return 0  # The pool shut down before handing us a job
+    job = json.loads(header)
+    code = sys.stdin.read()
+
+    workspace = job["workspace"]
+    script_path = os.path.join(workspace, "main.py")
+    with open(script_path, "w", encoding="utf-8") as f:
+        f.write(code)
+
+    # Like running "python main.py" from the caller's directory, except that the script
+    # itself lives in the private workspace
+    cwd = job.get("cwd") or workspace
+    os.chdir(cwd)
+    sys.path.insert(0, cwd)
+    apply_cpu_limit(job.get("cpu_seconds"))
+
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    code = main()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    sys.exit(code)
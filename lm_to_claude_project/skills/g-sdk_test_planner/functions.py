@@ -1,18 +1,30 @@
 import json
 import os
-from functools import lru_cache
+import re
+from collections import deque
 
 # Load JSON files from the same directory as this script
 base_dir = os.path.dirname(os.path.abspath(__file__))
 CATEGORY_MAP_PATH = os.path.join(base_dir, 'category_map.json')
 API_INDEX_PATH = os.path.join(base_dir, 'manager_api_index.json')
 
-@lru_cache(maxsize=None)
+_json_cache = {}
+_index_cache = {}
+
+_HANGUL_SPACE = re.compile(r'(?<=[\uac00-\ud7a3])\s+(?=[\uac00-\ud7a3])')
+
+
 def _load_json(file_path):
-    """Loads a JSON file with caching."""
+    """Loads a JSON file, cached until the file's mtime changes."""
     try:
+        mtime = os.path.getmtime(file_path)
+        cached = _json_cache.get(file_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
         with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            data = json.load(f)
+        _json_cache[file_path] = (mtime, data)
+        return data
     except FileNotFoundError:
         print(f"Error: JSON file not found at {file_path}")
         return None
@@ -20,28 +32,114 @@ def _load_json(file_path):
         print(f"Error: Could not decode JSON from {file_path}")
         return None
 
-def get_categories(query: str) -> str:
+
+def _normalize(text):
     """
-    Identifies relevant G-SDK categories from a query and returns them as a JSON list.
+    Lowercases, drops '_'/'-' and the spaces between Hangul syllables, so that English and
+    Korean spelling variants ('user_id'/'userID', 'event-action', '인증 모드'/'인증모드')
+    compare equal without gluing separate English words together.
     """
+    text = re.sub(r'[_\-]+', '', text.lower())
+    return _HANGUL_SPACE.sub('', text)
+
+
+class _KeywordAutomaton:
+    """Aho-Corasick automaton: finds every keyword occurring in a text in a single pass."""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [set()]
+
+        for keyword, value in keywords:
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(set())
+                state = nxt
+            self.out[state].add(value)
+
+        # Breadth-first construction of the failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+    def search(self, text):
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            found |= self.out[state]
+        return found
+
+
+def _category_index():
+    """keyword automaton over category_map.json, rebuilt only when the file changes."""
     category_data = _load_json(CATEGORY_MAP_PATH)
     if not category_data or 'categories' not in category_data:
-        return json.dumps([])
+        return None
+
+    cached = _index_cache.get(CATEGORY_MAP_PATH)
+    if cached and cached[0] is category_data:
+        return cached[1]
 
-    found_categories = set()
-    lower_query = query.lower()
+    keywords = [(_normalize(keyword), category['name'])
+                for category in category_data['categories']
+                for keyword in category.get('keywords', [])]
+    automaton = _KeywordAutomaton(keywords)
+    _index_cache[CATEGORY_MAP_PATH] = (category_data, automaton)
+    return automaton
 
-    for category in category_data['categories']:
-        for keyword in category.get('keywords', []):
-            if keyword.lower() in lower_query:
-                found_categories.add(category['name'])
-                break
+
+def _api_index():
+    """category -> sorted method names over manager_api_index.json, rebuilt only when the file changes."""
+    api_index = _load_json(API_INDEX_PATH)
+    if not api_index:
+        return None
+
+    cached = _index_cache.get(API_INDEX_PATH)
+    if cached and cached[0] is api_index:
+        return cached[1]
+
+    methods_by_category = {}
+    for api_group in api_index.values():
+        for method in api_group.get('methods', []):
+            for category_name in method.get('categories', []):
+                methods_by_category.setdefault(category_name, set()).add(method['name'])
+    index = {name: sorted(methods) for name, methods in methods_by_category.items()}
+    _index_cache[API_INDEX_PATH] = (api_index, index)
+    return index
+
+
+def get_categories(query: str) -> str:
+    """
+    Identifies relevant G-SDK categories from a query and returns them as a JSON list.
+    """
+    automaton = _category_index()
+    if automaton is None:
+        return json.dumps([])
+
+    found_categories = automaton.search(_normalize(query))
     
     # Ensure essential categories are included for most tests
-    if 'user' not in found_categories:
-        found_categories.add('user')
-    if 'event' not in found_categories:
-        found_categories.add('event')
+    found_categories.add('user')
+    found_categories.add('event')
 
     return json.dumps(sorted(list(found_categories)))
 
@@ -56,19 +154,11 @@ def get_apis_for_categories(categories_json: str) -> str:
     except json.JSONDecodeError:
         return json.dumps({"error": "Invalid JSON format for categories."})
 
-    api_index = _load_json(API_INDEX_PATH)
-    if not api_index:
+    methods_by_category = _api_index()
+    if methods_by_category is None:
         return json.dumps({})
 
     # Return a dictionary mapping each category to its list of APIs
-    apis_by_category = {category: [] for category in categories}
-    
-    for category_name in categories:
-        found_apis = set()
-        for api_group in api_index.values():
-            for method in api_group.get('methods', []):
-                if category_name in method.get('categories', []):
-                    found_apis.add(method['name'])
-        apis_by_category[category_name] = sorted(list(found_apis))
+    apis_by_category = {category: list(methods_by_category.get(category, [])) for category in categories}
     
     return json.dumps(apis_by_category, indent=2)
\ No newline at end of file
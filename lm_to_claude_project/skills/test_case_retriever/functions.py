@@ -3,28 +3,126 @@ import json
 import re
 import os
 
+import threading
+
 # Note: This skill requires chromadb, langchain_chroma, and langchain_huggingface to be installed.
 # pip install chromadb langchain_chroma langchain_huggingface sentence_transformers
 
-# These imports are wrapped inside the function to avoid breaking the agent 
+# These imports are wrapped inside the retriever to avoid breaking the agent 
 # if these libraries are not installed, as they are specific to this skill.
 
+# --- Configuration ---
+DB_PATH = "/Users/admin/Documents/2025_project/QE_RAG_COMPANY/QE_RAG_2025/chroma_db"
+COLLECTION_NAME = "jira_test_cases"
+EMBEDDING_MODEL = "intfloat/multilingual-e5-large"
+
+
+class TestCaseRetriever:
+    """
+    Long-lived handle on the test case vectorstore.
+
+    The ChromaDB client and the embedding model are created once, on first use, and
+    shared by every tool call (guarded by a lock). Metadata lookups (`get` with a
+    `where` filter) go straight to the Chroma collection and never load the embedding
+    model; the model is only loaded for similarity search.
+    """
+
+    def __init__(self, db_path=DB_PATH, collection_name=COLLECTION_NAME, embedding_model=EMBEDDING_MODEL):
+        self.db_path = db_path
+        self.collection_name = collection_name
+        self.embedding_model = embedding_model
+        self._lock = threading.RLock()
+        self._collection = None
+        self._vectorstore = None
+
+    def collection(self):
+        """Returns the raw Chroma collection (metadata-only mode, no embedding model)."""
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    import chromadb
+                    client = chromadb.PersistentClient(path=self.db_path)
+                    self._collection = client.get_collection(self.collection_name)
+        return self._collection
+
+    def vectorstore(self):
+        """Returns the langchain Chroma vectorstore, loading the embedding model once."""
+        if self._vectorstore is None:
+            with self._lock:
+                if self._vectorstore is None:
+                    from langchain_chroma import Chroma
+                    from langchain_huggingface import HuggingFaceEmbeddings
+
+                    model_kwargs = {'device': 'cpu', 'trust_remote_code': True}
+                    encode_kwargs = {'normalize_embeddings': True, 'batch_size': 1}
+                    embedding_function = HuggingFaceEmbeddings(
+                        model_name=self.embedding_model,
+                        model_kwargs=model_kwargs,
+                        encode_kwargs=encode_kwargs
+                    )
+                    self._vectorstore = Chroma(
+                        collection_name=self.collection_name,
+                        embedding_function=embedding_function,
+                        persist_directory=self.db_path
+                    )
+        return self._vectorstore
+
+    def get(self, where_filter):
+        """Metadata-only lookup. Same result shape as Chroma.get()."""
+        return self.collection().get(where=where_filter, include=["documents", "metadatas"])
+
+    def search(self, query, k=4, where_filter=None):
+        """Similarity search. This is the only path that needs the embedding model."""
+        return self.vectorstore().similarity_search(query, k=k, filter=where_filter)
+
+    def warm_up(self, load_embeddings=False):
+        """Opens the database (and optionally loads the embedding model) ahead of the first query."""
+        self.collection()
+        if load_embeddings:
+            self.vectorstore()
+
+
+_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever() -> TestCaseRetriever:
+    """Returns the process-wide retriever."""
+    global _retriever
+    with _retriever_lock:
+        if _retriever is None:
+            _retriever = TestCaseRetriever()
+        return _retriever
+
+
+def warm_up_retriever(load_embeddings=False, background=True):
+    """
+    Warm-up hook for agent startup. Runs in a daemon thread by default so startup
+    is not blocked; errors are reported and the retriever retries lazily on first use.
+    """
+    def _warm_up():
+        try:
+            get_retriever().warm_up(load_embeddings)
+        except Exception as e:
+            print(f"Cannot warm up the test case retriever: {e}")
+
+    if background:
+        thread = threading.Thread(target=_warm_up, daemon=True)
+        thread.start()
+        return thread
+    _warm_up()
+    return None
+
+
 def get_test_case_details(test_case_id: str) -> str:
     """
     Retrieves test case details from a ChromaDB database based on an ID string.
     """
     try:
         import chromadb
-        from langchain_chroma import Chroma
-        from langchain_huggingface import HuggingFaceEmbeddings
     except ImportError:
         return json.dumps({"error": "Required libraries (chromadb, langchain) are not installed."})
 
-    # --- Configuration ---
-    db_path = "/Users/admin/Documents/2025_project/QE_RAG_COMPANY/QE_RAG_2025/chroma_db"
-    collection_name = "jira_test_cases"
-    embedding_model = "intfloat/multilingual-e5-large"
-
     # --- 1. Parse the test_case_id string ---
     issue_key_match = re.search(r'(COMMONR-\d+)', test_case_id)
     step_number_match = re.search(r'스텝\s*(\d+)_(\d+)', test_case_id)
@@ -44,24 +142,8 @@ def get_test_case_details(test_case_id: str) -> str:
     elif step_index_match:
         step_index = step_index_match.group(1)
 
-    # --- 2. Connect to ChromaDB and retrieve data ---
+    # --- 2. Query ChromaDB through the shared retriever ---
     try:
-        # Embedding function setup
-        model_kwargs = {'device': 'cpu', 'trust_remote_code': True}
-        encode_kwargs = {'normalize_embeddings': True, 'batch_size': 1}
-        embedding_function = HuggingFaceEmbeddings(
-            model_name=embedding_model,
-            model_kwargs=model_kwargs,
-            encode_kwargs=encode_kwargs
-        )
-
-        # Connect to the vectorstore
-        vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=embedding_function,
-            persist_directory=db_path
-        )
-
         # Construct the metadata filter
         if step_index:
             where_filter = {
@@ -73,8 +155,8 @@ def get_test_case_details(test_case_id: str) -> str:
         else:
             where_filter = {"issue_key": {"$eq": issue_key}}
 
-        # Perform the metadata-based search
-        collection = vectorstore.get(where=where_filter)
+        # Perform the metadata-based search (does not need the embedding model)
+        collection = get_retriever().get(where_filter)
 
         if not collection or not collection.get('ids'):
             return json.dumps({"error": f"No test case found for filter: {where_filter}"})
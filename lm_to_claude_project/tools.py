@@ -1,5 +1,13 @@
+import atexit
+import json
 import os
+import queue
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
 
 def skill_retriever(query: str) -> str:
     """
@@ -37,26 +45,191 @@ def skill_retriever(query: str) -> str:
     
     return skill_content
 
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_SCRIPT = os.path.join(PROJECT_DIR, 'executor_worker.py')
+# The generated scripts import the G-SDK modules from here (see gsdk_rag_context/README.md)
+GSDK_SERVICE_DIR = os.path.join(os.path.dirname(PROJECT_DIR), 'demo', 'biostar', 'service')
+GSDK_DEMO_DIR = os.path.join(os.path.dirname(PROJECT_DIR), 'demo')
+
+EXECUTION_TIMEOUT = 30                      # wall-clock seconds
+EXECUTION_CPU_SECONDS = 30
+EXECUTION_MEMORY_BYTES = 1024 * 1024 * 1024
+
+
+class ExecutionResult:
+    def __init__(self, returncode, stdout, stderr, timed_out, duration):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+        self.duration = duration
+
+
+class ExecutorPool:
+    """
+    Pool of pre-warmed Python workers (see executor_worker.py).
+
+    Each worker has already started the interpreter and imported the *_pb2 modules when a
+    job arrives, so a run only pays for the code itself. Every run keeps its script in its own
+    temporary workspace, runs in the caller's working directory and has CPU/memory limits.
+    Each worker is used once and replaced in the background, so concurrent runs never share
+    interpreter state.
+    """
+
+    def __init__(self, size=2, preload_dirs=None, timeout=EXECUTION_TIMEOUT,
+                 cpu_seconds=EXECUTION_CPU_SECONDS, memory_bytes=EXECUTION_MEMORY_BYTES):
+        self.size = size
+        self.preload_dirs = [d for d in (preload_dirs if preload_dirs is not None else [GSDK_SERVICE_DIR]) if os.path.isdir(d)]
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+
+        self._idle = queue.Queue()
+        self._slots = threading.Semaphore(size)
+        self._closed = False
+
+        for _ in range(size):
+            self._refill()
+
+    def _spawn(self):
+        env = dict(os.environ)
+        env['PYTHONUNBUFFERED'] = '1'
+        env['EXECUTOR_PRELOAD_DIRS'] = os.pathsep.join(self.preload_dirs)
+        env['EXECUTOR_MEMORY_BYTES'] = str(self.memory_bytes or 0)
+        paths = self.preload_dirs + ([GSDK_DEMO_DIR] if os.path.isdir(GSDK_DEMO_DIR) else [])
+        env['PYTHONPATH'] = os.pathsep.join(paths + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+
+        return subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            env=env,
+        )
+
+    def _refill(self):
+        def _start():
+            try:
+                worker = self._spawn()
+            except OSError as e:
+                print(f"Cannot start an executor worker: {e}")
+                return
+            if self._closed:
+                worker.stdin.close()
+            else:
+                self._idle.put(worker)
+
+        threading.Thread(target=_start, daemon=True).start()
+
+    def _acquire(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return self._spawn()  # No warm worker yet: start a cold one
+            if worker.poll() is None:
+                return worker
+
+    def run(self, code: str, timeout=None, on_output=None, cwd=None) -> ExecutionResult:
+        """
+        Runs the code in a warm worker, in cwd (the caller's working directory by default).
+        on_output(stream_name, line) is called for each stdout/stderr line as it is produced.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        cwd = os.path.abspath(cwd if cwd is not None else os.getcwd())
+
+        with self._slots:
+            worker = self._acquire()
+            if not self._closed:
+                self._refill()
+
+            workspace = tempfile.mkdtemp(prefix='gsdk_exec_')
+            stdout, stderr = [], []
+
+            def _pump(stream, name, sink):
+                for line in stream:
+                    sink.append(line)
+                    if on_output is not None:
+                        on_output(name, line)
+
+            readers = [
+                threading.Thread(target=_pump, args=(worker.stdout, 'stdout', stdout), daemon=True),
+                threading.Thread(target=_pump, args=(worker.stderr, 'stderr', stderr), daemon=True),
+            ]
+            def _feed():
+                # A large script fills the pipe buffer until the worker reads it, so this runs
+                # in a thread and the timeout below covers it too
+                try:
+                    header = {'workspace': workspace, 'cwd': cwd, 'cpu_seconds': self.cpu_seconds}
+                    worker.stdin.write(json.dumps(header) + '\n')
+                    worker.stdin.write(code)
+                    worker.stdin.close()
+                except (BrokenPipeError, OSError):
+                    pass  # The worker died or was killed; its exit code tells the rest
+
+            writer = threading.Thread(target=_feed, daemon=True)
+            for thread in readers + [writer]:
+                thread.start()
+
+            started = time.monotonic()
+            timed_out = False
+            try:
+                worker.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                worker.kill()
+                worker.wait()
+            finally:
+                for thread in readers + [writer]:
+                    thread.join(timeout=1)
+                shutil.rmtree(workspace, ignore_errors=True)
+
+            return ExecutionResult(worker.returncode, ''.join(stdout), ''.join(stderr), timed_out, time.monotonic() - started)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.stdin.close()
+            except OSError:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_executor_pool() -> ExecutorPool:
+    """Returns the process-wide executor pool, starting its workers on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExecutorPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
 def python_executor(code: str) -> str:
     """
     Executes a given string of Python code and returns the output.
-    WARNING: This tool executes code on the local machine. It is a security risk
-    and should only be used in a sandboxed environment.
+    The code runs in the current directory in a pre-warmed worker process with
+    CPU/memory limits (see ExecutorPool).
+    WARNING: This tool executes code on the local machine. The limits are not a
+    security boundary; it should only be used in a sandboxed environment.
     """
     try:
-        # It's safer to write to a temporary file and execute it
-        with open("_temp_execution.py", "w", encoding="utf-8") as f:
-            f.write(code)
-        
-        result = subprocess.run(
-            ["python", "_temp_execution.py"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        os.remove("_temp_execution.py")
+        result = get_executor_pool().run(code)
 
+        if result.timed_out:
+            return f"Execution failed:\nTimed out after {EXECUTION_TIMEOUT} seconds\nStderr:\n{result.stderr}"
         if result.returncode == 0:
             return f"Execution successful:\nStdout:\n{result.stdout}"
         else: